@@ -17,6 +17,12 @@ ES_INDEX = os.getenv("ES_INDEX")  # Elasticsearch index name
 # Number of top results to retrieve, defaulting to 10
 TOP_K = int(os.getenv("TOP_K"))
 
+# Retrieval mode: "chunks" searches chunks directly, "two_stage" first picks candidate movies
+# from the movie centroid index and then re-scores only their chunks.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "chunks")
+MOVIE_INDEX = os.getenv("MOVIE_INDEX", "movies-centroid-vector")  # Movie centroid index name
+CANDIDATE_MOVIES = int(os.getenv("CANDIDATE_MOVIES", 100))  # Movies kept by the first stage
+
 # Google Cloud Project and BigQuery configuration
 BQ_PROJECT_ID = os.getenv("BQ_PROJECT_ID")
 BQ_TABLE = os.getenv("BQ_TABLE")  # BigQuery table name
@@ -14,7 +14,10 @@ from config import (
     get_bigquery_client,
     ES_INDEX,
     TOP_K,
-    BQ_TABLE
+    BQ_TABLE,
+    RETRIEVAL_MODE,
+    MOVIE_INDEX,
+    CANDIDATE_MOVIES
 )
 from utils.logger import logger
 
@@ -65,12 +68,14 @@ class MovieRequest(BaseModel):
         selected_genres (Optional[List[str]]): List of genres to filter by.
         filtering_mode (Optional[Literal["strict", "relaxed"]]): Mode for genre filtering.
         num_recs (int): Number of recommendations to return.
+        retrieval_mode (Optional[Literal["chunks", "two_stage"]]): Overrides the configured retrieval mode.
     """
     query: str
     use_genre_filter: bool = False
     selected_genres: Optional[List[str]] = []
     filtering_mode: Optional[Literal["strict", "relaxed"]] = "strict"
     num_recs: int = 5
+    retrieval_mode: Optional[Literal["chunks", "two_stage"]] = None
 
 # === UTILITY ===
 def chunk_sort_key(chunk_id):
@@ -89,6 +94,34 @@ def chunk_sort_key(chunk_id):
     secondary = list(map(int, re.findall(r"\d+", "-".join(parts[2:]))))
     return (type_val, *secondary)
 
+def retrieve_candidate_movies(query_vector, query_filter):
+    """
+    First retrieval stage: kNN search over the movie centroid index.
+
+    Its cost depends on the number of movies rather than the number of chunks.
+
+    Args:
+        query_vector (list): Embedded query.
+        query_filter (list): Elasticsearch filter clauses (e.g. genre terms).
+
+    Returns:
+        list: Candidate movie IDs, or an empty list if the movie index is unavailable.
+    """
+    knn = {
+        "field": "vector",
+        "query_vector": query_vector,
+        "k": CANDIDATE_MOVIES,
+        "num_candidates": max(CANDIDATE_MOVIES * 2, 100)
+    }
+    if query_filter:
+        knn["filter"] = query_filter
+    try:
+        res = es.search(index=MOVIE_INDEX, body={"knn": knn, "size": CANDIDATE_MOVIES, "_source": ["movie_id"]})
+    except Exception as e:
+        logger.info(f"- Movie index search failed, falling back to chunk search: {e}")
+        return []
+    return [hit["_source"]["movie_id"] for hit in res["hits"]["hits"]]
+
 # === ENDPOINT ===
 @app.post("/recommend_movies")
 def recommend_movies(request: MovieRequest):
@@ -108,6 +141,13 @@ def recommend_movies(request: MovieRequest):
     if request.use_genre_filter and request.selected_genres:
         query_filter.append({"terms": {"genres": request.selected_genres}})
 
+    # Two-stage mode: pick candidate movies from their centroids, then re-score only their chunks.
+    chunk_filter = list(query_filter)
+    if (request.retrieval_mode or RETRIEVAL_MODE) == "two_stage":
+        candidate_ids = retrieve_candidate_movies(query_vector, query_filter)
+        if candidate_ids:
+            chunk_filter.append({"terms": {"movie_id": candidate_ids}})
+
     search_body = {
         "size": TOP_K,
         "_source": ["movie_id", "chunk_id", "text", "type", "genres"],
@@ -116,7 +156,7 @@ def recommend_movies(request: MovieRequest):
                 "query": {
                     "bool": {
                         "should": [{"match": {"text": request.query}}],
-                        "filter": query_filter
+                        "filter": chunk_filter
                     }
                 },
                 "script": {
@@ -12,6 +12,15 @@ ES_URL = os.getenv("ELASTICSEARCH_URL")
 # Retrieve the name of the Elasticsearch index to be used from the environment variable `INDEX_NAME`.
 INDEX_NAME = os.getenv("INDEX_NAME")
 
+# Retrieve the name of the movie-level centroid index from the environment variable `MOVIE_INDEX_NAME`.
+MOVIE_INDEX_NAME = os.getenv("MOVIE_INDEX_NAME", "movies-centroid-vector")
+
+# Filename suffix of the movie centroid documents produced by the chunk-and-embed stage.
+MOVIE_FILE_SUFFIX = "-movie.json"
+
+# Name of the manifest of counts and checksums at the root of each chunk archive.
+ARCHIVE_MANIFEST = "archive.manifest"
+
 # Retrieve the dimensionality of the vectors to be processed from the environment variable `VECTOR_DIM`.
 # Convert the value to an integer since environment variables are loaded as strings.
 VECTOR_DIM = int(os.getenv("VECTOR_DIM"))
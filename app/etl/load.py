@@ -1,7 +1,7 @@
 import os
 import time
 import json
-from config import get_elasticsearch, INDEX_NAME, VECTOR_DIM, TO_INSERT_DIR
+from config import get_elasticsearch, INDEX_NAME, MOVIE_INDEX_NAME, MOVIE_FILE_SUFFIX, VECTOR_DIM, TO_INSERT_DIR
 from utils.logger import logger
 
 logger.info("- ETL Launching...")
@@ -63,25 +63,64 @@ def create_index(es):
     else:
         logger.info(f"- Index '{INDEX_NAME}' already exists")
 
+# === CREATE MOVIE INDEX ===
+def create_movie_index(es):
+    """
+    Creates the movie-level centroid index used for first-stage retrieval if it doesn't exist.
+
+    Args:
+        es (Elasticsearch): Elasticsearch client.
+    """
+    if not es.indices.exists(index=MOVIE_INDEX_NAME):
+        es.indices.create(
+            index=MOVIE_INDEX_NAME,
+            mappings={
+                "properties": {
+                    "movie_id": {"type": "keyword"},  # Unique identifier for the movie
+                    "genres": {"type": "keyword"},  # List of genres associated with the movie
+                    "num_chunks": {"type": "integer"},  # Number of chunks aggregated into the vector
+                    "vector": {
+                        "type": "dense_vector",  # Mean of the movie's chunk vectors
+                        "dims": VECTOR_DIM,
+                        "index": True,
+                        "similarity": "cosine"
+                    }
+                }
+            }
+        )
+        logger.info(f"- Created index: {MOVIE_INDEX_NAME}")
+    else:
+        logger.info(f"- Index '{MOVIE_INDEX_NAME}' already exists")
+
 # === UPLOAD JSON FILES ===
 def upload_documents(es):
     """
     Uploads JSON documents from the `TO_INSERT_DIR` to Elasticsearch.
 
+    Chunk documents go to `INDEX_NAME`; movie centroid documents (`*-movie.json`) go to `MOVIE_INDEX_NAME`.
+
     Args:
         es (Elasticsearch): Elasticsearch client.
     """
-    uploaded_count = 0
+    uploaded_count = {INDEX_NAME: 0, MOVIE_INDEX_NAME: 0}
     for filename in os.listdir(TO_INSERT_DIR):
         if filename.endswith(".json"):
             filepath = os.path.join(TO_INSERT_DIR, filename)
+            index = MOVIE_INDEX_NAME if filename.endswith(MOVIE_FILE_SUFFIX) else INDEX_NAME
             try:
                 with open(filepath, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    es.index(index=INDEX_NAME, id=filename, document=data)
-                    uploaded_count += 1
+                    es.index(index=index, id=filename, document=data)
+                    uploaded_count[index] += 1
             except Exception as e:
                 logger.info(f"- Failed to upload {filename}: {e}")
-    logger.info(f"- Uploaded {uploaded_count} JSON file(s) to index '{INDEX_NAME}'")
+    for index, count in uploaded_count.items():
+        logger.info(f"- Uploaded {count} JSON file(s) to index '{index}'")
+
+if __name__ == "__main__":
+    es = connect_to_elasticsearch()
+    create_index(es)
+    create_movie_index(es)
+    upload_documents(es)
 
 logger.info("- ETL Ready! ...")
\ No newline at end of file
@@ -0,0 +1,82 @@
+import sys
+import json
+import hashlib
+import zipfile
+from typing import Any, Dict, Iterable, Tuple
+from config import ARCHIVE_MANIFEST, MOVIE_FILE_SUFFIX
+from utils.logger import logger
+
+# Manifest fields compared against the archive's central directory.
+CHECKED_FIELDS = ("files", "chunk_documents", "movie_documents", "bytes", "digest", "parts")
+
+
+def summarize_members(entries: Iterable[Tuple[str, int, int]]) -> Dict[str, Any]:
+    """
+    Summarizes archive members the way the pipeline does when it writes the manifest
+    (`app/pipeline/chunk_archive.py`).
+
+    Args:
+        entries (Iterable[tuple]): (name, CRC-32, uncompressed size) per member.
+
+    Returns:
+        dict: Number of files, chunk and movie documents, total bytes, digest and per-part
+              file counts and bytes.
+    """
+    digest = hashlib.sha256()
+    summary: Dict[str, Any] = {"files": 0, "chunk_documents": 0, "movie_documents": 0, "bytes": 0, "parts": {}}
+    for name, crc, size in sorted(entries):
+        digest.update(f"{name}\t{crc:08x}\t{size}\n".encode("utf-8"))
+        summary["files"] += 1
+        summary["movie_documents" if name.endswith(MOVIE_FILE_SUFFIX) else "chunk_documents"] += 1
+        summary["bytes"] += size
+        part = summary["parts"].setdefault(name.split("/", 1)[0] if "/" in name else "", {"files": 0, "bytes": 0})
+        part["files"] += 1
+        part["bytes"] += size
+    summary["digest"] = digest.hexdigest()
+    return summary
+
+
+def verify_archive(path: str) -> bool:
+    """
+    Checks a chunk archive against its manifest using only the ZIP central directory.
+
+    Member names, CRC-32s and sizes are read from the central directory, so no member is
+    decompressed; `unzip` then checks each member's data against its CRC while extracting.
+    Archives without a manifest come from older pipeline versions and are accepted.
+
+    Args:
+        path (str): Path to the ZIP archive.
+
+    Returns:
+        bool: True if the archive matches its manifest or has none.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = archive.infolist()
+            if ARCHIVE_MANIFEST not in archive.namelist():
+                logger.info(f"- {path}: no manifest, skipping verification")
+                return True
+            manifest = json.loads(archive.read(ARCHIVE_MANIFEST))
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        logger.info(f"- {path}: unreadable archive: {e}")
+        return False
+
+    actual = summarize_members(
+        (info.filename, info.CRC, info.file_size)
+        for info in infos if not info.is_dir() and info.filename != ARCHIVE_MANIFEST
+    )
+    mismatches = [field for field in CHECKED_FIELDS if manifest.get(field) != actual[field]]
+    if mismatches:
+        for field in mismatches:
+            if field != "parts":
+                logger.info(f"- {path}: {field} is {actual[field]}, manifest says {manifest.get(field)}")
+        logger.info(f"- {path}: does not match its manifest ({', '.join(mismatches)})")
+        return False
+
+    logger.info(f"- Verified {path}: {actual['files']} files ({actual['chunk_documents']} chunks, "
+                f"{actual['movie_documents']} movies) in {len(actual['parts'])} part(s)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_archive(sys.argv[1]) else 1)
@@ -1,12 +1,14 @@
 import io
+import uuid
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from google.cloud import bigquery
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaIoBaseDownload
 import warnings
-from typing import Optional
-from config import SERVICE_ACCOUNT_FILE, MOVIE_METADATA_FILE
+from typing import Dict, List, Optional
+from config import MOVIE_METADATA_FILE
+from split_movie_data import METADATA_COLUMNS, is_excel, read_table
+from google_clients import google_clients
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -27,104 +29,142 @@ warnings.filterwarnings(
     module="google.cloud.bigquery.table"
 )
 
-# Load service account credentials from the specified file and define the required scopes.
-credentials = service_account.Credentials.from_service_account_file(
-    SERVICE_ACCOUNT_FILE,
-    scopes=[
-        "https://www.googleapis.com/auth/drive",  # Access to Google Drive
-        "https://www.googleapis.com/auth/bigquery"  # Access to BigQuery
-    ]
-)
+# Schema of the metadata table: a load sequence number followed by the all-text metadata columns.
+# It is given explicitly so BigQuery never has to infer types from a batch of rows.
+METADATA_TABLE_SCHEMA = [bigquery.SchemaField("staging_raw_id", "INTEGER")] + [
+    bigquery.SchemaField(column, "STRING") for column in METADATA_COLUMNS
+]
+STAGING_PARQUET_SCHEMA = pa.schema([("staging_raw_id", pa.int64())] + [(column, pa.string()) for column in METADATA_COLUMNS])
 
-# Initialize the Google Drive API client using the authenticated credentials.
-drive_service = build("drive", "v3", credentials=credentials)
+# Suffix of the table each run's metadata is loaded into before being merged; a random
+# per-run part is appended so concurrent runs never load into the same staging table
+STAGING_SUFFIX = "_staging"
 
-# Initialize the BigQuery client using the authenticated credentials and project ID.
-bq_client = bigquery.Client(credentials=credentials, project="enduring-brace-451209-q3")
 
-def upload_single_file_to_bigquery(
-    target_file_name: Optional[str] = None,
-    folder_id="1sJcfq2h5NCOO2DNz2RxeIgSq-HYhl9Kg",
-    dataset_id="romance_dataset",
-    table_name="full_data_table"
-) -> Optional[None]:
+def check_table_schema(table_id: str, schema: List[bigquery.SchemaField]) -> None:
     """
-    Uploads a single Excel file from Google Drive to a BigQuery table.
+    Verifies that an existing table has the columns and types of METADATA_TABLE_SCHEMA.
+
+    `create_table(..., exists_ok=True)` leaves an existing table as it is, so a table created by
+    an older version of the pipeline would otherwise only fail halfway through the MERGE.
 
     Args:
-        target_file_name (str): The name of the target Excel file to search for in Google Drive.
-        folder_id (str): The ID of the Google Drive folder containing the file.
-        dataset_id (str): The ID of the BigQuery dataset where the table resides.
-        table_name (str): The name of the BigQuery table to upload data to.
+        table_id (str): Fully qualified table, for the error message.
+        schema (list): The table's current schema.
 
-    Returns:
-        None
+    Raises:
+        ValueError: If a column is missing, unexpected or of another type.
+    """
+    actual = {field.name: field.field_type for field in schema}
+    expected = {field.name: field.field_type for field in METADATA_TABLE_SCHEMA}
+    if actual == expected:
+        return
+    problems = [f"missing {name} {kind}" for name, kind in expected.items() if name not in actual]
+    problems += [f"unexpected {name} {kind}" for name, kind in actual.items() if name not in expected]
+    problems += [f"{name} is {actual[name]}, expected {kind}"
+                 for name, kind in expected.items() if name in actual and actual[name] != kind]
+    raise ValueError(f"BigQuery table {table_id} does not match the metadata schema ({'; '.join(problems)}). "
+                     f"Migrate or drop the table before loading.")
+
+
+def build_merge_query(table_id: str, staging_table_id: str, columns: List[str] = METADATA_COLUMNS) -> str:
     """
-    if target_file_name is None:
-        target_file_name = MOVIE_METADATA_FILE
-
-    # Query Google Drive for the file with the specified name and MIME type in the given folder.
-    query: str = f"'{folder_id}' in parents and name='{target_file_name}' and mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'"
-    results = drive_service.files().list(q=query, fields="files(id, name)").execute()
-    files = results.get('files', [])
-
-    if not files:
-        logger.info(f"- File '{target_file_name}' not found in folder.")
-        return None
-
-    file: dict = files[0]
-    file_id: str = file['id']
-    logger.info(f"- Found file: {file['name']} (ID: {file_id})")
-
-    # Use the Google Drive API to download the file content into a memory buffer.
-    request = drive_service.files().get_media(fileId=file_id)
-    file_stream = io.BytesIO()
-    downloader = MediaIoBaseDownload(file_stream, request)
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-        logger.info(f"- Download {int(status.progress() * 100)}% complete.")
-    file_stream.seek(0)
-
-    # Read the Excel file into a pandas DataFrame and remove duplicate rows based on the "tconst" column.
-    xls = pd.ExcelFile(file_stream)
-    df = xls.parse(xls.sheet_names[0])
-    df = df.drop_duplicates(subset=["tconst"])  # Remove internal duplicates
-
-    # Query the BigQuery table for existing rows and filter them out from the DataFrame.
-    full_table_id = f"{bq_client.project}.{dataset_id}.{table_name}"
-    query = f"SELECT tconst FROM {full_table_id}"
-    existing = bq_client.query(query).to_dataframe()
-    existing_set = set(existing['tconst'])
-
-    original_len = len(df)
-    df = df[~df['tconst'].isin(existing_set)]
-    logger.info(f"- Removed {original_len - len(df)} rows already in BigQuery.")
+    Builds the MERGE statement that upserts the staged metadata into the target table on tconst.
 
-    if df.empty:
-        logger.info("- No new rows to upload.")
-        return None
+    New titles are inserted. Titles already in the table are updated only when one of their
+    columns differs, so unchanged rows cost no writes.
 
-    # Add a "staging_raw_id" column to the DataFrame if it does not already exist.
-    if "staging_raw_id" not in df.columns:
-        df.insert(0, "staging_raw_id", range(1, len(df) + 1))
+    Args:
+        table_id (str): Fully qualified target table.
+        staging_table_id (str): Fully qualified staging table.
+        columns (list): Metadata columns, including tconst.
 
-    # Convert specific columns to string type to ensure compatibility with BigQuery schema.
-    columns_to_stringify = ['movie_year', 'imdb_rating']
+    Returns:
+        str: The MERGE statement.
+    """
+    updated = [column for column in columns if column != "tconst"]
+    changed = " OR ".join(f"T.{column} IS DISTINCT FROM S.{column}" for column in updated)
+    assignments = ", ".join(f"{column} = S.{column}" for column in updated)
+    inserted = ["staging_raw_id"] + columns
+    return (
+        f"MERGE INTO `{table_id}` T\n"
+        f"USING `{staging_table_id}` S\n"
+        f"ON T.tconst = S.tconst\n"
+        f"WHEN MATCHED AND ({changed}) THEN\n"
+        f"  UPDATE SET {assignments}\n"
+        f"WHEN NOT MATCHED THEN\n"
+        f"  INSERT ({', '.join(inserted)}) VALUES ({', '.join(f'S.{column}' for column in inserted)})"
+    )
 
-    for col in columns_to_stringify:
-        if col in df.columns:
-            df[col] = df[col].astype(str)
 
-    # Configure the BigQuery load job to append data to the table and upload the DataFrame.
-    job_config = bigquery.LoadJobConfig(
-        autodetect=True,
-        write_disposition=bigquery.WriteDisposition.WRITE_APPEND  # Append new rows to the table
-    )
+def load_metadata_to_bigquery(
+    file_path: Optional[str] = None,
+    dataset_id: str = "romance_dataset",
+    table_name: str = "full_data_table",
+    client: Optional[bigquery.Client] = None
+) -> Dict[str, int]:
+    """
+    Upserts a local metadata file (Parquet, or Excel from older runs) into a BigQuery table.
+
+    The file is loaded as Parquet into a staging table with the explicit METADATA_TABLE_SCHEMA,
+    then merged into the target table on tconst by a single server-side MERGE, which inserts new
+    titles and updates titles whose metadata changed. The staging table is named per run and
+    dropped afterwards. An existing target table must already have METADATA_TABLE_SCHEMA.
+    Nothing is read back from the target table, so the cost does not grow with its size.
+
+    Args:
+        file_path (str): Path to the metadata file. Defaults to imdb_data/MOVIE_METADATA_FILE.
+        dataset_id (str): The ID of the BigQuery dataset where the table resides.
+        table_name (str): The name of the BigQuery table to upload data to.
+        client (Optional[bigquery.Client]): Client to use, e.g. a local stand-in.
+                                            Defaults to the shared client from `google_clients`.
 
-    load_job = bq_client.load_table_from_dataframe(df, full_table_id, job_config=job_config)
-    load_job.result()  # Wait for the job to complete
+    Returns:
+        dict: Number of rows staged, inserted and updated.
 
-    logger.info(f"- Uploaded {len(df)} new row(s) to BigQuery table {full_table_id}")
-    return None
+    Raises:
+        ValueError: If the target table exists with another schema.
+    """
+    client = client or google_clients.bigquery()
+    if file_path is None:
+        file_path = f"imdb_data/{MOVIE_METADATA_FILE}"
+
+    # Read the file and keep the last row of each title, i.e. its most recent crawl
+    df = read_table(file_path, columns=METADATA_COLUMNS)
+    df = df.drop_duplicates(subset=["tconst"], keep="last")
+    if is_excel(file_path):
+        # Excel turns numeric-looking cells into numbers; Parquet already stores them as text
+        df = df.apply(lambda column: column.map(lambda value: None if pd.isna(value) else str(value)))
+    df.insert(0, "staging_raw_id", range(1, len(df) + 1))
 
+    if df.empty:
+        logger.info("- No rows to upload.")
+        return {"staged": 0, "inserted": 0, "updated": 0}
+
+    table_id = f"{client.project}.{dataset_id}.{table_name}"
+    staging_table_id = f"{table_id}{STAGING_SUFFIX}_{uuid.uuid4().hex}"
+    client.create_table(bigquery.Table(table_id, schema=METADATA_TABLE_SCHEMA), exists_ok=True)
+    check_table_schema(table_id, client.get_table(table_id).schema)
+
+    # Load the rows into this run's staging table, which must not exist yet
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, schema=STAGING_PARQUET_SCHEMA, preserve_index=False), buffer)
+    buffer.seek(0)
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=METADATA_TABLE_SCHEMA,
+        write_disposition=bigquery.WriteDisposition.WRITE_EMPTY
+    )
+    try:
+        client.load_table_from_file(buffer, staging_table_id, job_config=job_config).result()
+        logger.info(f"- Staged {len(df)} row(s) in {staging_table_id}")
+        merge_job = client.query(build_merge_query(table_id, staging_table_id))
+        merge_job.result()  # Wait for the job to complete
+    finally:
+        client.delete_table(staging_table_id, not_found_ok=True)
+
+    stats = merge_job.dml_stats
+    inserted = stats.inserted_row_count if stats else 0
+    updated = stats.updated_row_count if stats else 0
+    logger.info(f"- Merged into BigQuery table {table_id}: {inserted} new row(s), {updated} updated")
+    return {"staged": len(df), "inserted": inserted, "updated": updated}
@@ -1,212 +1,460 @@
 import re
+import ast
 import json
+import hashlib
+import argparse
+import numpy as np
 import pandas as pd
 import shutil
+from datetime import datetime
 from sentence_transformers import SentenceTransformer
-from typing import List, Union
-from config import MOVIE_SYNOPSIS_FILE, JSONS_FOLDER
+from typing import Any, List, Optional
+from config import (MOVIE_SYNOPSIS_FILE, JSONS_FOLDER, CHUNK_SHARD_SIZE, DEDUP_SCOPE, DEDUP_THRESHOLD,
+                    ARCHIVE_CODEC, ARCHIVE_COMPRESSLEVEL)
+from chunking import chunk_text
+from dedup import deduplicate_documents
+from split_movie_data import iter_table
+from chunk_archive import MOVIE_FILE_SUFFIX, ArchiveWriter, build_archive
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.utils.logger import logger
 
-def run_chunk_and_embed_pipeline(
-    input_excel: str = None,
-    output_dir: str = None
-) -> None:
+# Placeholder values written by the crawler when a field could not be scraped.
+NO_SHORT_SYNOPSIS = "No short sum found"
+NO_LONG_SYNOPSIS = "Synopsis not found"
+NO_SUMMARIES = "no summaries found"
+
+# Directory inside the output folder holding one manifest entry per completed shard.
+MANIFEST_DIR = "manifest"
+
+# Version of the documents a shard produces, part of its fingerprint. Bump it whenever their
+# content changes so existing shards are rebuilt; 2 added the movie centroid documents.
+SHARD_FORMAT_VERSION = 2
+
+
+def smart_split_summaries(text: str) -> List[str]:
     """
-    Processes an Excel file containing movie data, chunks text fields, embeds the chunks using a
-    SentenceTransformer model, and saves the results as JSON files.
+    Splits a summary text into individual summaries.
+
+    Used as a fallback for values that are not valid Python list literals.
 
     Args:
-        input_excel (str): Path to the input Excel file containing movie data.
-                           Default is "imdb_data/romance_synopsis_cleaned.xlsx".
-        output_dir (str): Directory where the chunked JSON files will be saved.
-                          Default is "chunked_jsons/romance_chunks_json".
+        text (str): The input summary text.
 
     Returns:
-        None
+        list: A list of cleaned summary strings.
     """
-    if input_excel is None:
-        input_excel = f"imdb_data/{MOVIE_SYNOPSIS_FILE}"
-    if output_dir is None:
-        output_dir = JSONS_FOLDER
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        text = text[1:-1]
+    split_candidates = re.split(r"""(?<!\\)['"]\s*,\s*['"]""", text)
+    cleaned = []
+    for chunk in split_candidates:
+        chunk = chunk.strip().strip('"').strip("'").strip()
+        if chunk and chunk.lower() != NO_SUMMARIES:
+            cleaned.append(chunk)
+    return cleaned
+
+
+def parse_genres(value: Any) -> List[str]:
+    """
+    Safely parses a stringified genre list such as "['Drama', 'Romance']".
+
+    Lists from a fresh crawl are passed through unchanged.
 
-    # Load the SentenceTransformer model for embedding text.
-    model: SentenceTransformer = SentenceTransformer('bert-base-nli-mean-tokens')
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Read the input Excel file into a pandas DataFrame.
-    df: pd.DataFrame = pd.read_excel(input_excel, engine='openpyxl')
-
-    def smart_split_sentences(text: str) -> List[str]:
-        """
-        Splits a text into sentences while preserving abbreviations.
-
-        Args:
-            text (str): The input text to split.
-
-        Returns:
-            list: A list of sentences.
-        """
-        abbreviations = {
-            "Dr.": "DR_ABBR", "Mr.": "MR_ABBR", "Mrs.": "MRS_ABBR", "Ms.": "MS_ABBR",
-            "Jr.": "JR_ABBR", "Sr.": "SR_ABBR", "St.": "ST_ABBR", "Prof.": "PROF_ABBR",
-            "Inc.": "INC_ABBR", "Ltd.": "LTD_ABBR", "vs.": "VS_ABBR",
-            "e.g.": "EG_ABBR", "i.e.": "IE_ABBR"
-        }
-        for abbr, token in abbreviations.items():
-            text = text.replace(abbr, token)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        restored = []
-        for sentence in sentences:
-            for abbr, token in abbreviations.items():
-                sentence = sentence.replace(token, abbr)
-            restored.append(sentence.strip())
-        return restored
-
-    def chunk_text(text: str, min_chunk_size: int = 100, max_chunk_size: int = 275, target_chunk_size: int = 240) -> List[str]:
-        """
-        Splits a text into chunks of specified sizes.
-
-        Args:
-            text (str): The input text to chunk.
-            min_chunk_size (int): Minimum size of a chunk in words. Default is 100.
-            max_chunk_size (int): Maximum size of a chunk in words. Default is 275.
-            target_chunk_size (int): Target size of a chunk in words. Default is 240.
-
-        Returns:
-            list: A list of text chunks.
-        """
-        words = text.split()
-        if len(words) <= target_chunk_size:
-            return [text.strip()]
-        sentences = smart_split_sentences(text)
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        for sentence in sentences:
-            sentence_length = len(sentence.split())
-            if current_length + sentence_length > max_chunk_size:
-                if current_chunk:
-                    chunks.append(" ".join(current_chunk).strip())
-                current_chunk = [sentence]
-                current_length = sentence_length
-            else:
-                current_chunk.append(sentence)
-                current_length += sentence_length
-        if current_chunk:
-            if chunks and len(" ".join(current_chunk).split()) < min_chunk_size:
-                chunks[-1] += " " + " ".join(current_chunk)
-            else:
-                chunks.append(" ".join(current_chunk).strip())
-        return chunks
-
-    def smart_split_summaries(text: str) -> List[str]:
-        """
-        Splits a summary text into individual summaries.
-
-        Args:
-            text (str): The input summary text.
-
-        Returns:
-            list: A list of cleaned summary strings.
-        """
-        text = text.strip()
-        if text.startswith("[") and text.endswith("]"):
-            text = text[1:-1]
-        split_candidates = re.split(r"""(?<!\\)['"]\s*,\s*['"]""", text)
-        cleaned = []
-        for chunk in split_candidates:
-            chunk = chunk.strip().strip('"').strip("'").strip()
-            if chunk and chunk.lower() != "no summaries found":
-                cleaned.append(chunk)
-        return cleaned
-
-    # Initialize lists to store documents and text for embedding.
-    all_documents: List[dict] = []
-    texts_to_embed: List[str] = []
-
-    # Iterate over each row in the DataFrame.
-    for index, row in df.iterrows():
-        movie_id: str = row["tconst"]
+    Args:
+        value (Any): Raw cell value from the genres column.
+
+    Returns:
+        list: The parsed genres, or an empty list if the value is missing or malformed.
+    """
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return []
+    try:
+        genres = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return list(genres) if isinstance(genres, (list, tuple)) else []
+
+
+def parse_summaries(value: Any) -> List[str]:
+    """
+    Safely parses the summaries column into a list of usable summary strings.
+
+    Args:
+        value (Any): Raw cell value from the summaries column.
+
+    Returns:
+        list: Non-empty summaries, with the crawler's placeholder removed.
+    """
+    if isinstance(value, str):
         try:
-            genres: List[str] = eval(row["genres"]) if pd.notna(row["genres"]) and isinstance(row["genres"], str) else []
-        except:
-            genres = []
-        short_synopsis: str = row["short_synopsis"] if pd.notna(row["short_synopsis"]) else ""
-        long_synopsis: str = row["long_synopsis"] if pd.notna(row["long_synopsis"]) else ""
-        summaries: Union[str, List[str]] = row["summaries"]
+            parsed = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            return smart_split_summaries(value)
+        if not isinstance(parsed, (list, tuple)):
+            return smart_split_summaries(value)
+        value = parsed
+    elif not isinstance(value, list):
+        return []
+    return [
+        s for s in value
+        if isinstance(s, str) and s.strip() and s.strip().lower() != NO_SUMMARIES
+    ]
+
+
+def _normalize_text_column(column: pd.Series, placeholder: str) -> List[str]:
+    """
+    Converts a synopsis column to a list of strings, blanking missing values and the crawler placeholder.
+
+    Args:
+        column (pd.Series): The synopsis column.
+        placeholder (str): Placeholder value meaning "not found".
 
+    Returns:
+        list: One string per row; empty when there is no usable text.
+    """
+    text = column.fillna("").astype(str)
+    stripped = text.str.strip()
+    return text.where(stripped != placeholder, "").tolist()
+
+
+def build_documents(df: pd.DataFrame) -> List[dict]:
+    """
+    Builds the chunk documents for every movie in a synopsis DataFrame.
+
+    Each column is parsed and normalized once, then rows are walked as plain Python lists.
+
+    Args:
+        df (pd.DataFrame): Synopsis data with tconst, genres, short_synopsis, summaries and long_synopsis columns.
+
+    Returns:
+        list: Documents with movie_id, genres, type, chunk_id and text keys, in row order.
+    """
+    movie_ids = df["tconst"].tolist()
+    genres_col = [parse_genres(v) for v in df["genres"].tolist()]
+    summaries_col = [parse_summaries(v) for v in df["summaries"].tolist()]
+    short_col = _normalize_text_column(df["short_synopsis"], NO_SHORT_SYNOPSIS)
+    long_col = _normalize_text_column(df["long_synopsis"], NO_LONG_SYNOPSIS)
+
+    documents: List[dict] = []
+    for movie_id, genres, short_synopsis, summaries, long_synopsis in zip(
+        movie_ids, genres_col, short_col, summaries_col, long_col
+    ):
         # Process short synopsis if available.
-        if short_synopsis.strip() and short_synopsis.strip() != "No short sum found":
-            doc = {
+        short_synopsis = short_synopsis.strip()
+        if short_synopsis:
+            documents.append({
                 "movie_id": movie_id,
                 "genres": genres,
                 "type": "short",
                 "chunk_id": f"{movie_id}-sh-1",
-                "text": short_synopsis.strip()
-            }
-            all_documents.append(doc)
-            texts_to_embed.append(doc["text"])
+                "text": short_synopsis
+            })
 
         # Process summaries if available.
-        if pd.notna(summaries):
-            if isinstance(summaries, str):
-                summaries = smart_split_summaries(summaries)
-            elif isinstance(summaries, list):
-                summaries = [s for s in summaries if isinstance(s, str)]
-            else:
-                summaries = []
-        else:
-            summaries = []
-
         for j, summary in enumerate(summaries):
-            if summary.strip():
-                chunks = chunk_text(summary)
-                for i, chunk in enumerate(chunks):
-                    doc = {
-                        "movie_id": movie_id,
-                        "genres": genres,
-                        "type": "summary",
-                        "chunk_id": f"{movie_id}-summary-{j + 1}-{i + 1}",
-                        "text": chunk
-                    }
-                    all_documents.append(doc)
-                    texts_to_embed.append(chunk)
+            for i, chunk in enumerate(chunk_text(summary)):
+                documents.append({
+                    "movie_id": movie_id,
+                    "genres": genres,
+                    "type": "summary",
+                    "chunk_id": f"{movie_id}-summary-{j + 1}-{i + 1}",
+                    "text": chunk
+                })
 
         # Process long synopsis if available.
-        if long_synopsis.strip() and long_synopsis.strip() != "Synopsis not found":
-            long_chunks = chunk_text(long_synopsis)
-            for i, chunk in enumerate(long_chunks):
-                doc = {
+        if long_synopsis.strip():
+            for i, chunk in enumerate(chunk_text(long_synopsis)):
+                documents.append({
                     "movie_id": movie_id,
                     "genres": genres,
                     "type": "long",
                     "chunk_id": f"{movie_id}-lon-{i + 1}",
                     "text": chunk
-                }
-                all_documents.append(doc)
-                texts_to_embed.append(chunk)
+                })
+    return documents
+
+
+def build_movie_vectors(documents: List[dict], vectors: np.ndarray) -> List[dict]:
+    """
+    Aggregates chunk vectors into one centroid document per movie.
+
+    The centroid is the mean of the per-type means (short, summary, long), so a movie with many
+    long-synopsis chunks is not dominated by them.
+
+    Args:
+        documents (list): Embedded chunk documents, in the same order as `vectors`.
+        vectors (np.ndarray): Chunk embeddings, one row per document.
+
+    Returns:
+        list: Movie documents with movie_id, genres, num_chunks and vector keys.
+    """
+    positions = {}
+    for i, doc in enumerate(documents):
+        positions.setdefault(doc["movie_id"], {}).setdefault(doc["type"], []).append(i)
+
+    movie_documents: List[dict] = []
+    for movie_id, by_type in positions.items():
+        type_means = [vectors[indices].mean(axis=0) for indices in by_type.values()]
+        first = documents[next(iter(by_type.values()))[0]]
+        movie_documents.append({
+            "movie_id": movie_id,
+            "genres": first["genres"],
+            "num_chunks": sum(len(indices) for indices in by_type.values()),
+            "vector": np.mean(type_means, axis=0).tolist()
+        })
+    return movie_documents
+
+
+def _shard_fingerprint(shard: pd.DataFrame) -> str:
+    """
+    Computes a content hash of a shard so a rerun can tell whether its output is still valid.
+
+    The output format version and the dedup settings are included, since changing them
+    changes the shard's documents.
+
+    Args:
+        shard (pd.DataFrame): The rows belonging to the shard.
+
+    Returns:
+        str: Hex digest of the shard contents and settings.
+    """
+    row_hashes = pd.util.hash_pandas_object(shard, index=False).values
+    settings = f"{SHARD_FORMAT_VERSION}:{DEDUP_SCOPE}:{DEDUP_THRESHOLD}".encode("utf-8")
+    return hashlib.sha256(row_hashes.tobytes() + settings).hexdigest()
+
+
+def _manifest_path(output_dir: str, part_name: str) -> str:
+    """
+    Returns the path of the manifest entry for an output part.
+
+    Entries use a non-JSON extension so the ETL does not index them as documents.
+
+    Args:
+        output_dir (str): The chunk output directory.
+        part_name (str): Name of the output part, e.g. "part-00003".
+
+    Returns:
+        str: Path to the manifest entry.
+    """
+    return os.path.join(output_dir, MANIFEST_DIR, f"{part_name}.manifest")
+
+
+def _part_path(output_dir: str, part_name: str) -> str:
+    """
+    Returns the path of the archive holding an output part's documents.
+
+    Args:
+        output_dir (str): The chunk output directory.
+        part_name (str): Name of the output part.
+
+    Returns:
+        str: Path to the part archive.
+    """
+    return os.path.join(output_dir, f"{part_name}.zip")
+
+
+def _read_manifest_entry(output_dir: str, part_name: str) -> Optional[dict]:
+    """
+    Reads the manifest entry for an output part, if one was committed.
+
+    Args:
+        output_dir (str): The chunk output directory.
+        part_name (str): Name of the output part.
+
+    Returns:
+        Optional[dict]: The manifest entry, or None if the part has not been completed.
+    """
+    path = _manifest_path(output_dir, part_name)
+    if not os.path.exists(path) or not os.path.isfile(_part_path(output_dir, part_name)):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_shard(documents: List[dict], movie_documents: List[dict], output_dir: str, part_name: str) -> None:
+    """
+    Writes a shard's documents straight into an uncompressed part archive, renamed into place
+    once complete, so a part is either whole or absent and no loose files are created.
+    Members are named `<part_name>/<file>.json`, as in the final archive.
+
+    Args:
+        documents (list): Embedded chunk documents of the shard.
+        movie_documents (list): Movie centroid documents of the shard.
+        output_dir (str): The chunk output directory.
+        part_name (str): Name of the output part.
+    """
+    # Part directories of loose files were written by runs before parts became archives.
+    legacy_dir = os.path.join(output_dir, part_name)
+    if os.path.isdir(legacy_dir):
+        shutil.rmtree(legacy_dir, ignore_errors=True)
+
+    # Parts are only read back by the final archive build, so they are not compressed.
+    with ArchiveWriter(_part_path(output_dir, part_name), codec="stored") as writer:
+        for doc in documents:
+            writer.write_document(f"{part_name}/{doc['chunk_id']}.json", doc)
+        for doc in movie_documents:
+            writer.write_document(f"{part_name}/{doc['movie_id']}{MOVIE_FILE_SUFFIX}", doc)
+
+
+def _record_shard(output_dir: str, part_name: str, entry: dict) -> None:
+    """
+    Atomically writes the manifest entry that marks an output part as complete.
+
+    Args:
+        output_dir (str): The chunk output directory.
+        part_name (str): Name of the output part.
+        entry (dict): Manifest entry contents.
+    """
+    path = _manifest_path(output_dir, part_name)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def run_chunk_and_embed_pipeline(
+    input_file: str = None,
+    output_dir: str = None,
+    shard_size: int = CHUNK_SHARD_SIZE,
+    worker_index: int = 0,
+    num_workers: int = 1,
+    archive_codec: str = ARCHIVE_CODEC,
+    archive_compresslevel: Optional[int] = ARCHIVE_COMPRESSLEVEL
+) -> None:
+    """
+    Processes a synopsis file containing movie data, chunks text fields, embeds the chunks using a
+    SentenceTransformer model, and saves the results as JSON files.
+
+    Movies are processed in shards of `shard_size` rows. Each shard is written atomically as its
+    own `part-NNNNN.zip` archive with a manifest entry, and shards whose entry matches the current
+    input are skipped on rerun. Redundant chunks are removed before embedding according to
+    `DEDUP_SCOPE`; with the "global" scope, duplicates are detected across movies of the same shard.
+    Each part also holds one `<tconst>-movie.json` centroid document per movie for the movie index.
+    Several processes or hosts can share one output directory by giving each a distinct
+    `worker_index`; shard `i` is handled by worker `i % num_workers`.
+    Once every shard is complete, the parts are combined into `<output_dir>.zip`, compressed with
+    `archive_codec`, with an `archive.manifest` of counts and checksums the ETL verifies; with
+    several workers, whichever records the last shard builds it.
+
+    Args:
+        input_file (str): Path to the synopsis Parquet file (or .xlsx workbook) containing movie data.
+                          Default is "imdb_data/<MOVIE_SYNOPSIS_FILE>".
+        output_dir (str): Directory where the chunked JSON files will be saved.
+                          Default is "chunked_jsons/romance_chunks_json".
+        shard_size (int): Number of movies per shard. Default is CHUNK_SHARD_SIZE.
+        worker_index (int): Index of this worker among `num_workers`. Default is 0.
+        num_workers (int): Total number of workers sharing the output directory. Default is 1.
+        archive_codec (str): "deflate" or "stored" for the final archive. Default is ARCHIVE_CODEC.
+        archive_compresslevel (Optional[int]): Deflate level of the final archive. Default is ARCHIVE_COMPRESSLEVEL.
+
+    Returns:
+        None
+    """
+    if input_file is None:
+        input_file = f"imdb_data/{MOVIE_SYNOPSIS_FILE}"
+    if output_dir is None:
+        output_dir = JSONS_FOLDER
+
+    os.makedirs(os.path.join(output_dir, MANIFEST_DIR), exist_ok=True)
+
+    # The model is loaded lazily so a fully completed run does not pay for it.
+    model: Optional[SentenceTransformer] = None
+    # Fingerprint of every shard of the current input, to check the parts of all workers at the end.
+    fingerprints: List[str] = []
+    num_movies = 0
+    # Read the input synopsis file one shard at a time.
+    for shard_index, shard in enumerate(iter_table(input_file, shard_size)):
+        part_name = f"part-{shard_index:05d}"
+        fingerprint = _shard_fingerprint(shard)
+        fingerprints.append(fingerprint)
+        num_movies += len(shard)
+
+        entry = _read_manifest_entry(output_dir, part_name)
+        if entry and entry.get("fingerprint") == fingerprint:
+            continue
+        if shard_index % num_workers != worker_index:
+            continue
+
+        if model is None:
+            model = SentenceTransformer('bert-base-nli-mean-tokens')
+
+        # Build the shard's chunk documents in a single columnar pass.
+        documents: List[dict] = build_documents(shard)
+
+        # Drop exact and near-duplicate chunks before paying for their embeddings.
+        documents, removed = deduplicate_documents(documents, scope=DEDUP_SCOPE, threshold=DEDUP_THRESHOLD)
+        if removed["exact"] or removed["near"]:
+            logger.info(f"- {part_name}: removed {removed['exact']} exact and {removed['near']} near-duplicate chunks")
+        texts_to_embed: List[str] = [doc["text"] for doc in documents]
 
         # Embed the text chunks using the SentenceTransformer model.
-        logger.info(f"- Embedding {len(texts_to_embed)} chunks on GPU...")
+        logger.info(f"- {part_name}: embedding {len(texts_to_embed)} chunks on GPU...")
         vectors = model.encode(texts_to_embed, batch_size=32, show_progress_bar=True)
 
         # Add the embedding vectors to the corresponding documents.
         for i, vector in enumerate(vectors):
-            all_documents[i]["vector"] = vector.tolist()
+            documents[i]["vector"] = vector.tolist()
+
+        # Aggregate one centroid vector per movie for the first-stage movie index.
+        movie_documents = build_movie_vectors(documents, np.asarray(vectors))
+
+        _write_shard(documents, movie_documents, output_dir, part_name)
+        _record_shard(output_dir, part_name, {
+            "part": part_name,
+            "shard_index": shard_index,
+            "fingerprint": fingerprint,
+            "movies": len(shard),
+            "first_tconst": str(shard["tconst"].iloc[0]),
+            "last_tconst": str(shard["tconst"].iloc[-1]),
+            "documents": len(documents),
+            "duplicates_removed": removed,
+            "movie_vectors": len(movie_documents),
+            "completed_at": datetime.now().isoformat()
+        })
+        logger.info(f"- {part_name}: {len(documents)} documents saved to: {output_dir}/{part_name}")
+
+    logger.info(f"- {num_movies} movies split into {len(fingerprints)} shard(s) of up to {shard_size}")
+
+    # Other workers may have recorded their shards meanwhile; the worker that sees them all builds the archive.
+    # Workers finishing together both build it, which is harmless as the archive is renamed into place whole.
+    entries = [_read_manifest_entry(output_dir, f"part-{shard_index:05d}") for shard_index in range(len(fingerprints))]
+    pending = sum(not entry or entry.get("fingerprint") != fingerprint
+                  for entry, fingerprint in zip(entries, fingerprints))
+    if pending:
+        logger.info(f"- {pending} shard(s) still pending on other workers; skipping archive.")
+        return
 
-        # Save each document as a JSON file in the output directory.
-        for doc in all_documents:
-            filename = f"{doc['chunk_id']}.json"
-            path = os.path.join(output_dir, filename)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(doc, f, indent=4)
+    # Combine the current parts into the final archive, leaving out parts of earlier, longer inputs.
+    build_archive([_part_path(output_dir, entry["part"]) for entry in entries], f"{output_dir}.zip",
+                  codec=archive_codec, compresslevel=archive_compresslevel,
+                  movies=sum(entry["movies"] for entry in entries))
+    logger.info(f"- Archive created: {output_dir}.zip")
 
-        logger.info(f"- {len(all_documents)} documents saved to: {output_dir}")
 
-        # Create a ZIP archive of the output directory.
-        shutil.make_archive(output_dir, 'zip', output_dir)
-        logger.info(f"- Archive created: {output_dir}.zip")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunk and embed movie synopses in resumable shards.")
+    parser.add_argument("--input", dest="input_file", default=None, help="Input synopsis Parquet or Excel file.")
+    parser.add_argument("--output-dir", default=None, help="Shared chunk output directory.")
+    parser.add_argument("--shard-size", type=int, default=CHUNK_SHARD_SIZE, help="Movies per shard.")
+    parser.add_argument("--worker-index", type=int, default=0, help="Index of this worker.")
+    parser.add_argument("--num-workers", type=int, default=1, help="Total number of workers.")
+    parser.add_argument("--archive-codec", choices=["deflate", "stored"], default=ARCHIVE_CODEC,
+                        help="Compression of the final archive.")
+    args = parser.parse_args()
+    run_chunk_and_embed_pipeline(
+        input_file=args.input_file,
+        output_dir=args.output_dir,
+        shard_size=args.shard_size,
+        worker_index=args.worker_index,
+        num_workers=args.num_workers,
+        archive_codec=args.archive_codec
+    )
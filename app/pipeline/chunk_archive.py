@@ -0,0 +1,164 @@
+import json
+import uuid
+import hashlib
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import ARCHIVE_CODEC, ARCHIVE_COMPRESSLEVEL
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+# Member names ending in this suffix are movie centroid documents; the ETL routes them to the movie index.
+MOVIE_FILE_SUFFIX = "-movie.json"
+
+# Name of the manifest stored at the root of every archive; not .json, so the ETL does not index it.
+ARCHIVE_MANIFEST = "archive.manifest"
+
+# ZIP compression methods by codec name. Both can be extracted by the ETL's unzip.
+CODECS = {
+    "deflate": zipfile.ZIP_DEFLATED,
+    "stored": zipfile.ZIP_STORED,
+}
+
+
+def summarize_members(entries: Iterable[Tuple[str, int, int]]) -> Dict[str, Any]:
+    """
+    Summarizes archive members into the counts and checksums recorded in the manifest.
+
+    The digest covers each member's name, CRC-32 and size, which the ZIP central directory
+    also holds, so an archive can be checked against its manifest without reading any member.
+
+    Args:
+        entries (Iterable[tuple]): (name, CRC-32, uncompressed size) per member.
+
+    Returns:
+        dict: Number of files, chunk and movie documents, total bytes, digest and per-part
+              file counts and bytes.
+    """
+    digest = hashlib.sha256()
+    summary: Dict[str, Any] = {"files": 0, "chunk_documents": 0, "movie_documents": 0, "bytes": 0, "parts": {}}
+    for name, crc, size in sorted(entries):
+        digest.update(f"{name}\t{crc:08x}\t{size}\n".encode("utf-8"))
+        summary["files"] += 1
+        summary["movie_documents" if name.endswith(MOVIE_FILE_SUFFIX) else "chunk_documents"] += 1
+        summary["bytes"] += size
+        part = summary["parts"].setdefault(name.split("/", 1)[0] if "/" in name else "", {"files": 0, "bytes": 0})
+        part["files"] += 1
+        part["bytes"] += size
+    summary["digest"] = digest.hexdigest()
+    return summary
+
+
+class ArchiveWriter:
+    """
+    Writes documents straight into a ZIP archive and seals it with a manifest.
+
+    The archive is written under a temporary name and renamed into place by `close`, so a
+    reader never sees a partial archive. Leaving a `with` block without calling `close`
+    closes it; leaving it with an exception discards it.
+
+    Attributes:
+        path (str): Final archive path.
+        codec (str): Name of the compression method, a key of CODECS.
+    """
+    def __init__(self, path: str, codec: str = ARCHIVE_CODEC, compresslevel: Optional[int] = ARCHIVE_COMPRESSLEVEL) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"Unknown archive codec '{codec}', expected one of {tuple(CODECS)}")
+        self.path = path
+        self.codec = codec
+        self._tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", compression=CODECS[codec],
+                                    compresslevel=compresslevel if codec == "deflate" else None)
+        self._date_time = datetime.now().timetuple()[:6]
+        self._entries: List[Tuple[str, int, int]] = []
+        self._closed = False
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        elif not self._closed:
+            self.close()
+
+    def write(self, name: str, data: bytes) -> None:
+        """
+        Adds a member to the archive.
+
+        Args:
+            name (str): Member path inside the archive.
+            data (bytes): Member contents.
+        """
+        info = zipfile.ZipInfo(name, date_time=self._date_time)
+        info.compress_type = self._zip.compression
+        info.external_attr = 0o644 << 16
+        # A ZipInfo does not pick up the archive's compression level by itself
+        self._zip.writestr(info, data, compresslevel=self._zip.compresslevel)
+        self._entries.append((name, info.CRC, info.file_size))
+
+    def write_document(self, name: str, document: dict) -> None:
+        """
+        Adds a document as compact JSON.
+
+        Args:
+            name (str): Member path inside the archive.
+            document (dict): The document.
+        """
+        self.write(name, json.dumps(document, separators=(",", ":")).encode("utf-8"))
+
+    def close(self, **fields: Any) -> Dict[str, Any]:
+        """
+        Writes the manifest and moves the archive into place.
+
+        Args:
+            **fields: Extra values recorded in the manifest, e.g. the number of movies.
+
+        Returns:
+            dict: The manifest.
+        """
+        manifest = {"format": 1, "codec": self.codec, "created_at": datetime.now().isoformat(), **fields,
+                    **summarize_members(self._entries)}
+        self._zip.writestr(ARCHIVE_MANIFEST, json.dumps(manifest, indent=4))
+        self._zip.close()
+        os.replace(self._tmp_path, self.path)
+        self._closed = True
+        return manifest
+
+    def abort(self) -> None:
+        """Discards the archive."""
+        self._zip.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._closed = True
+
+
+def build_archive(part_paths: List[str], archive_path: str, codec: str = ARCHIVE_CODEC,
+                  compresslevel: Optional[int] = ARCHIVE_COMPRESSLEVEL, **fields: Any) -> Dict[str, Any]:
+    """
+    Combines part archives into one archive with a manifest covering all of their members.
+
+    Reading the parts checks their CRCs, so a damaged part fails the build instead of being shipped.
+
+    Args:
+        part_paths (list): Part archives written by `ArchiveWriter`, in order.
+        archive_path (str): Path of the combined archive.
+        codec (str): Compression method of the combined archive. Default is ARCHIVE_CODEC.
+        compresslevel (Optional[int]): Deflate level. Default is ARCHIVE_COMPRESSLEVEL.
+        **fields: Extra values recorded in the manifest.
+
+    Returns:
+        dict: The manifest of the combined archive.
+    """
+    with ArchiveWriter(archive_path, codec=codec, compresslevel=compresslevel) as writer:
+        for part_path in part_paths:
+            with zipfile.ZipFile(part_path) as part:
+                for info in part.infolist():
+                    if not info.is_dir() and info.filename != ARCHIVE_MANIFEST:
+                        writer.write(info.filename, part.read(info))
+        manifest = writer.close(**fields)
+    logger.info(f"- Archive {archive_path}: {manifest['files']} files, {manifest['bytes']} bytes before {codec}")
+    return manifest
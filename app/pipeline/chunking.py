@@ -0,0 +1,85 @@
+import re
+from typing import List
+
+# Abbreviations whose trailing period must not be treated as a sentence boundary.
+ABBREVIATIONS = (
+    "Dr.", "Mr.", "Mrs.", "Ms.", "Jr.", "Sr.", "St.", "Prof.",
+    "Inc.", "Ltd.", "vs.", "e.g.", "i.e."
+)
+
+
+def _build_sentence_boundary(abbreviations=ABBREVIATIONS) -> re.Pattern:
+    """
+    Compiles a single regex matching the whitespace after a sentence terminator,
+    unless the terminator is the final period of a known abbreviation.
+
+    Python lookbehinds must be fixed-width, so the abbreviations are grouped by
+    length into one negative lookbehind per width.
+
+    Args:
+        abbreviations (tuple): Abbreviations to protect from splitting.
+
+    Returns:
+        re.Pattern: The compiled sentence boundary pattern.
+    """
+    by_width = {}
+    for abbr in abbreviations:
+        by_width.setdefault(len(abbr), []).append(re.escape(abbr))
+    guards = "".join(f"(?<!{'|'.join(group)})" for _, group in sorted(by_width.items()))
+    return re.compile(rf"(?<=[.!?]){guards}\s+")
+
+
+SENTENCE_BOUNDARY = _build_sentence_boundary()
+
+
+def smart_split_sentences(text: str) -> List[str]:
+    """
+    Splits a text into sentences while preserving abbreviations.
+
+    Args:
+        text (str): The input text to split.
+
+    Returns:
+        list: A list of sentences.
+    """
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text)]
+
+
+def chunk_text(text: str, min_chunk_size: int = 100, max_chunk_size: int = 275, target_chunk_size: int = 240) -> List[str]:
+    """
+    Splits a text into chunks of specified sizes.
+
+    Args:
+        text (str): The input text to chunk.
+        min_chunk_size (int): Minimum size of a chunk in words. Default is 100.
+        max_chunk_size (int): Maximum size of a chunk in words. Default is 275.
+        target_chunk_size (int): Target size of a chunk in words. Default is 240.
+
+    Returns:
+        list: A list of text chunks.
+    """
+    if len(text.split()) <= target_chunk_size:
+        return [text.strip()]
+
+    chunks: List[str] = []
+    current_chunk: List[str] = []
+    current_length = 0
+    for sentence in smart_split_sentences(text):
+        # Count the words of each sentence once; the running total replaces re-splitting joined chunks.
+        sentence_length = len(sentence.split())
+        if current_length + sentence_length > max_chunk_size:
+            if current_chunk:
+                chunks.append(" ".join(current_chunk).strip())
+            current_chunk = [sentence]
+            current_length = sentence_length
+        else:
+            current_chunk.append(sentence)
+            current_length += sentence_length
+
+    if current_chunk:
+        # Merge a short trailing chunk into the previous one.
+        if chunks and current_length < min_chunk_size:
+            chunks[-1] += " " + " ".join(current_chunk)
+        else:
+            chunks.append(" ".join(current_chunk).strip())
+    return chunks
@@ -1,23 +1,181 @@
 import pandas as pd
+import re
 import ast
-from typing import List, Any, Union
-from config import OUTPUT_FILE, CLEANED_OUTPUT_FILE
+import time
+from typing import Any, Dict, List, Optional, Union
+from config import OUTPUT_FILE, CLEANED_OUTPUT_FILE, CLEAN_CHUNK_SIZE
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.utils.logger import logger
 
-def clean_romance_synopsis(input_csv: str = None, output_csv: str = None) -> None:
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+# Placeholder values written by the crawler when a field could not be scraped.
+NO_SHORT_SYNOPSIS = "No short sum found"
+NO_LONG_SYNOPSIS = "Synopsis not found"
+NO_SUMMARIES = "['No summaries found']"
+
+# A Python string literal as written by repr(): single or double quotes, backslash escapes of ASCII
+# characters, no raw line breaks or NUL bytes. The escape loop is unrolled so the regex engine
+# consumes plain runs of text in one step.
+_SINGLE_QUOTED = r"'[^'\\\n\r\x00]*(?:\\[\x01-\x7f][^'\\\n\r\x00]*)*'"
+_DOUBLE_QUOTED = r'"[^"\\\n\r\x00]*(?:\\[\x01-\x7f][^"\\\n\r\x00]*)*"'
+STRING_LITERAL = re.compile(rf"{_SINGLE_QUOTED}|{_DOUBLE_QUOTED}")
+
+
+def clean_summary_list(summary_list: Union[List[str], Any]) -> Union[List[str], Any]:
+    """
+    Cleans a list of summary strings by removing unwanted characters and truncating text.
+
+    Args:
+        summary_list (list or any): A list of summary strings to clean. If not a list, it is returned as-is.
+
+    Returns:
+        list or any: The cleaned list of summaries, or the original input if not a list.
+    """
+    if isinstance(summary_list, list):
+        cleaned: List[str] = []
+        for s in summary_list:
+            if isinstance(s, str):
+                # Remove unwanted characters or truncate text based on specific patterns.
+                if '_x0014_' in s:
+                    s = s.split('_x0014_')[0].strip()
+                if '—' in s:
+                    s = s.rsplit('—', 1)[0].strip()
+            cleaned.append(s)
+        return cleaned
+    return summary_list
+
+
+def remove_backslashes(text: Any) -> Any:
+    """
+    Removes backslashes from a string.
+
+    Args:
+        text (str or any): The input text to process. If not a string, it is returned as-is.
+
+    Returns:
+        str or any: The processed string with backslashes removed, or the original input if not a string.
+    """
+    if isinstance(text, str):
+        return text.replace("\\", "")
+    return text
+
+
+def parse_summary_list(value: str) -> Any:
+    """
+    Safely parses a summaries value written as a Python list literal.
+
+    Lists of plain string literals, which is what the crawler writes, are tokenized with
+    STRING_LITERAL and unescaped by the codec, giving the same result as the much slower
+    `ast.literal_eval`. Anything else falls back to `ast.literal_eval`.
+
+    Args:
+        value (str): Raw summaries cell.
+
+    Returns:
+        any: The parsed value, or the raw string if it is not a valid literal.
+    """
+    tokens = STRING_LITERAL.findall(value)
+    # The value is a plain list of literals exactly when its tokens rebuild it as str(list) would
+    if value == "[" + ", ".join(tokens) + "]":
+        items = []
+        for token in tokens:
+            item = token[1:-1]
+            if "\\" in item:
+                try:
+                    # Non-Latin-1 characters pass through as \uXXXX escapes, decoded back by the codec
+                    item = item.encode("latin-1", "backslashreplace").decode("unicode_escape")
+                except UnicodeDecodeError:
+                    break
+            items.append(item)
+        else:
+            return items
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return value
+
+
+def clean_summaries_value(value: str) -> str:
+    """
+    Cleans one raw summaries cell, giving the text written for it after `clean_summary_list` and
+    `remove_backslashes`.
+
+    Args:
+        value (str): Raw summaries cell.
+
+    Returns:
+        str: The cleaned cell.
+    """
+    return str(remove_backslashes(clean_summary_list(parse_summary_list(value))))
+
+
+def has_no_synopsis(record: Dict[str, Any]) -> bool:
+    """
+    Checks whether every synopsis field of a movie record holds the crawler's "not found" placeholder.
+
+    Args:
+        record (dict): Movie record, freshly crawled or read back from CSV.
+
+    Returns:
+        bool: True if the record has no narrative text and should be dropped.
+    """
+    return (
+        record.get('short_synopsis') == NO_SHORT_SYNOPSIS and
+        record.get('long_synopsis') == NO_LONG_SYNOPSIS and
+        str(record.get('summaries')) == NO_SUMMARIES
+    )
+
+
+def clean_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Applies the same cleaning as `clean_romance_synopsis` to a single movie record.
+
+    Used by the streaming pipeline to clean records as they leave the crawler.
+
+    Args:
+        record (dict): Movie record, freshly crawled or read back from CSV.
+
+    Returns:
+        Optional[dict]: A cleaned copy of the record, or None if it has no synopsis at all.
+    """
+    if has_no_synopsis(record):
+        return None
+    cleaned = dict(record)
+    summaries = cleaned.get('summaries')
+    if isinstance(summaries, str):
+        summaries = parse_summary_list(summaries)
+    cleaned['summaries'] = remove_backslashes(clean_summary_list(summaries))
+    return cleaned
+
+
+def clean_romance_synopsis(input_csv: str = None, output_csv: str = None, chunk_size: int = CLEAN_CHUNK_SIZE) -> None:
     """
     Cleans a CSV file containing romance movie synopses by removing rows with missing data
-    and processing the summaries column. The cleaned data is saved to an Excel file.
+    and processing the summaries column. The cleaned data is saved to a CSV file.
+
+    A recrawl that finds a title changed appends a new row for it, so only the last row of each
+    tconst is kept; older rows would otherwise yield duplicate chunk IDs downstream. Finding the
+    last rows takes a first pass over the tconst column alone.
+
+    The input is read and written in chunks of `chunk_size` rows, so memory stays flat however
+    large the crawl is. Cells are read as text, so every chunk is cleaned the same way regardless
+    of which values it happens to contain. The output is written to a temporary file and renamed
+    into place once complete. Throughput and peak memory are logged at the end.
 
     Args:
         input_csv (str): Path to the input CSV file containing the full movie data.
                          Default is "imdb_data/romance_newbatch.csv".
         output_csv (str): Path to the output CSV file where the cleaned data will be saved.
                             Default is "imdb_data/romance_full_cleaned.csv".
+        chunk_size (int): Number of rows cleaned at a time. Default is CLEAN_CHUNK_SIZE.
 
     Returns:
         None
@@ -28,64 +186,44 @@ def clean_romance_synopsis(input_csv: str = None, output_csv: str = None) -> Non
     if output_csv is None:
         output_csv = f"imdb_data/{CLEANED_OUTPUT_FILE}"
 
-    # Load the input CSV file into a pandas DataFrame.
-    df: pd.DataFrame = pd.read_csv(input_csv)
-
-    # Filter out rows where all synopsis fields are missing or invalid.
-    original_len: int = len(df)
-    condition = (
-        (df['short_synopsis'] == 'No short sum found') &
-        (df['long_synopsis'] == 'Synopsis not found') &
-        (df['summaries'].astype(str) == "['No summaries found']")
-    )
-    df_cleaned: pd.DataFrame = df[~condition].copy()
-    removed_count: int = original_len - len(df_cleaned)
-
-    def clean_summary_list(summary_list: Union[List[str], Any]) -> Union[List[str], Any]:
-        """
-        Cleans a list of summary strings by removing unwanted characters and truncating text.
-
-        Args:
-            summary_list (list or any): A list of summary strings to clean. If not a list, it is returned as-is.
-
-        Returns:
-            list or any: The cleaned list of summaries, or the original input if not a list.
-        """
-        if isinstance(summary_list, list):
-            cleaned: List[str] = []
-            for s in summary_list:
-                if isinstance(s, str):
-                    # Remove unwanted characters or truncate text based on specific patterns.
-                    if '_x0014_' in s:
-                        s = s.split('_x0014_')[0].strip()
-                    if '—' in s:
-                        s = s.rsplit('—', 1)[0].strip()
-                cleaned.append(s)
-            return cleaned
-        return summary_list
-
-    # Parse string representations of lists into actual Python lists and clean them.
-    df_cleaned['summaries'] = df_cleaned['summaries'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
-    df_cleaned['summaries'] = df_cleaned['summaries'].apply(clean_summary_list)
-
-    def remove_backslashes(text: Any) -> Any:
-        """
-        Removes backslashes from a string.
-
-        Args:
-            text (str or any): The input text to process. If not a string, it is returned as-is.
-
-        Returns:
-            str or any: The processed string with backslashes removed, or the original input if not a string.
-        """
-        if isinstance(text, str):
-            return text.replace("\\", "")
-        return text
-
-    # Remove backslashes from the summaries column.
-    df_cleaned['summaries'] = df_cleaned['summaries'].apply(remove_backslashes)
-
-    # Save the cleaned DataFrame to an CSV file.
-    df_cleaned.to_csv(output_csv, index=False)
+    start = time.perf_counter()
+    total_rows: int = 0
+    removed_count: int = 0
+    # Rows superseded by a later row of the same title, by position in the file
+    superseded = pd.read_csv(input_csv, usecols=['tconst'], dtype=str)['tconst'].duplicated(keep='last').to_numpy()
+    tmp_csv = f"{output_csv}.tmp"
+    with open(tmp_csv, "w", newline="", encoding="utf-8") as f:
+        # Stream the input CSV through in fixed-size chunks.
+        for i, df in enumerate(pd.read_csv(input_csv, chunksize=chunk_size, dtype=str)):
+            # Keep only the latest crawl of each title.
+            latest = ~superseded[total_rows:total_rows + len(df)]
+            total_rows += len(df)
+            df = df[latest]
+
+            # Filter out rows where all synopsis fields are missing or invalid.
+            condition = (
+                (df['short_synopsis'] == NO_SHORT_SYNOPSIS) &
+                (df['long_synopsis'] == NO_LONG_SYNOPSIS) &
+                (df['summaries'].astype(str) == NO_SUMMARIES)
+            )
+            df_cleaned: pd.DataFrame = df[~condition].copy()
+            removed_count += len(df) - len(df_cleaned)
+
+            # Parse, truncate and re-serialize the summaries; missing values are left as they are.
+            summaries = df_cleaned['summaries'].dropna()
+            df_cleaned.loc[summaries.index, 'summaries'] = summaries.map(clean_summaries_value)
+
+            # Append the cleaned chunk to the output, with the header only once.
+            df_cleaned.to_csv(f, header=(i == 0), index=False)
+    os.replace(tmp_csv, output_csv)
+
+    elapsed = time.perf_counter() - start
     logger.info(f"- Cleaned synopsis saved to: {output_csv}")
-    logger.info(f"- Rows removed: {removed_count}")
\ No newline at end of file
+    logger.info(f"- Rows removed: {removed_count}")
+    logger.info(f"- Superseded rows removed: {int(superseded.sum())}")
+    logger.info(f"- Cleaned {total_rows} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):.0f} rows/s)")
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+        logger.info(f"- Peak memory: {peak_mb:.0f} MB")
@@ -13,6 +13,15 @@ TSV_FILENAME = os.getenv("TSV_FILENAME")
 # The TSV file containing the tt codes
 PROCESSED_IDS = os.getenv("PROCESSED_IDS")
 
+# SQLite ledger of crawl state per title; a legacy PROCESSED_IDS TSV is imported into it once.
+CRAWL_LEDGER = os.getenv("CRAWL_LEDGER", "crawl_ledger.db")
+
+# SQLite recrawl schedule; kept outside imdb_data so it persists across pipeline runs.
+RECRAWL_STATE = os.getenv("RECRAWL_STATE", "recrawl_schedule.db")
+
+# Maximum number of already crawled titles refreshed per run (0 disables recrawling).
+RECRAWL_BUDGET = int(os.getenv("RECRAWL_BUDGET", 500))
+
 # Retrieve the name of the output file for the scraped data from the environment variables.
 OUTPUT_FILE = os.getenv("OUTPUT_FILE")
 
@@ -25,6 +34,9 @@ MOVIE_METADATA_FILE = os.getenv("MOVIE_METADATA_FILE")
 # Retrieve the name of the synopsis file from the environment variables.
 MOVIE_SYNOPSIS_FILE = os.getenv("MOVIE_SYNOPSIS_FILE")
 
+# Also write .xlsx copies of the metadata and synopsis Parquet files for people to open.
+EXCEL_EXPORT = os.getenv("EXCEL_EXPORT", "false").lower() == "true"
+
 # Retrieve the path to the output file for the processed data from the environment variables.
 OUTPUT_FILE_PATH= os.getenv("OUTPUT_FILE_PATH")
 
@@ -37,15 +49,67 @@ MOVIE_METADATA_PATH=os.getenv("MOVIE_METADATA_PATH")
 # Retrieve the path to the synopsis file from the environment variables.
 MOVIE_SYNOPSIS_PATH=os.getenv("MOVIE_SYNOPSIS_PATH")
 
+# Directory keeping the pipeline's intermediate artifacts and stage state between runs.
+PIPELINE_WORK_DIR = os.getenv("PIPELINE_WORK_DIR", "imdb_data")
+
+# Profiler each pipeline stage runs under: "cprofile", "pyinstrument" or empty for timing only.
+PIPELINE_PROFILER = os.getenv("PIPELINE_PROFILER", "")
+
 # Retrieve the path to the chunks directory from the environment variables.
 CHUNKS_ZIP_PATH=os.getenv("CHUNKS_ZIP_PATH")
 
 # Retrieve the name of the JSON file to be processed from the environment variables.
 JSONS_FOLDER=os.getenv("JSONS_FOLDER")
 
+# Number of crawl CSV rows the cleaning stage reads and writes at a time.
+CLEAN_CHUNK_SIZE = int(os.getenv("CLEAN_CHUNK_SIZE", 50000))
+
+# Number of movies embedded and written per resumable shard of the chunk-and-embed stage.
+CHUNK_SHARD_SIZE = int(os.getenv("CHUNK_SHARD_SIZE", 1000))
+
+# Compression of the chunk archives handed to the ETL: "deflate" or "stored" (no compression, fastest).
+ARCHIVE_CODEC = os.getenv("ARCHIVE_CODEC", "deflate")
+
+# Deflate level of the chunk archives, 1 (fastest) to 9 (smallest).
+ARCHIVE_COMPRESSLEVEL = int(os.getenv("ARCHIVE_COMPRESSLEVEL", 1))
+
+# Scope of duplicate chunk removal before embedding: "movie", "global" (across the movies of one shard
+# or streaming part; a repeat is dropped from the later movie) or "off".
+DEDUP_SCOPE = os.getenv("DEDUP_SCOPE", "movie")
+
+# Estimated Jaccard similarity at or above which two chunks count as near-duplicates.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+
+# Directory where the streaming pipeline writes its chunk parts before publishing them.
+STREAM_OUTPUT_DIR = os.getenv("STREAM_OUTPUT_DIR", "stream_chunks_json")
+
+# Number of movies embedded and published per streaming archive part.
+STREAM_PART_SIZE = int(os.getenv("STREAM_PART_SIZE", 50))
+
+# Seconds a partially filled streaming part may wait before it is published anyway.
+STREAM_FLUSH_SECONDS = float(os.getenv("STREAM_FLUSH_SECONDS", 60))
+
+# Number of crawled movies handed to the streaming pipeline at a time.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 10))
+
+# Number of crawled batches buffered between the crawler and the streaming pipeline.
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 4))
+
+# Directory of the crawler's on-disk HTTP response cache; kept outside imdb_data so it survives cleanup.
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "imdb_cache")
+
+# Re-extract movies purely from the response cache without touching the network.
+CRAWL_REPLAY = os.getenv("CRAWL_REPLAY", "false").lower() == "true"
+
+# CSV a replay writes its re-extracted movies to, rewritten on every replay; the crawl CSV and ledger are left alone.
+REPLAY_OUTPUT_FILE = os.getenv("REPLAY_OUTPUT_FILE", "replayed_movies.csv")
+
 # Retrieve the maximum number of clicks allowed, convert it to an integer, and store it.
 MAX_CLICKS = int(os.getenv("MAX_CLICKS"))
 
+# Run the tt-code scraper's browser without a window; set to false to watch it.
+SCRAPER_HEADLESS = os.getenv("SCRAPER_HEADLESS", "true").lower() == "true"
+
 # Retrieve the scopes for API access from the environment variables and store them as a list.
 SCOPES = [os.getenv("SCOPES")]
 
@@ -53,4 +117,13 @@ SCOPES = [os.getenv("SCOPES")]
 SERVICE_ACCOUNT_FILE = os.getenv("SERVICE_ACCOUNT_FILE")
 
 # Retrieve the folder ID for Google Drive operations from the environment variables.
-FOLDER_ID = os.getenv("FOLDER_ID")
\ No newline at end of file
+FOLDER_ID = os.getenv("FOLDER_ID")
+
+# Bytes sent per request in resumable Drive uploads; must be a multiple of 256 KiB.
+DRIVE_CHUNK_SIZE = int(os.getenv("DRIVE_CHUNK_SIZE", str(8 * 1024 * 1024)))
+
+# Google Cloud project holding the BigQuery metadata table.
+BIGQUERY_PROJECT = os.getenv("BIGQUERY_PROJECT", "enduring-brace-451209-q3")
+
+# Endpoint of a local BigQuery emulator, e.g. http://localhost:9050; empty uses BigQuery itself.
+BIGQUERY_API_ENDPOINT = os.getenv("BIGQUERY_API_ENDPOINT", "")
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+# Crawl states a title moves through.
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class CrawlLedger:
+    """
+    Transactional record of crawl state per title, stored in SQLite in WAL mode.
+
+    Titles are marked done in the same transaction that records the new committed size of the
+    output file. On startup any bytes beyond that size were written by a batch whose commit never
+    happened and are truncated, so the output CSV and the ledger always agree after a crash.
+
+    Attributes:
+        path (Path): Location of the SQLite database.
+        max_attempts (int): Failed titles are retried until they reach this many attempts.
+    """
+    def __init__(self, path: str, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Batches are committed from a worker thread, one at a time
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS titles ("
+                "tconst TEXT PRIMARY KEY, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "updated_at TEXT, error TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS titles_status ON titles (status)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS outputs (path TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+
+    def add(self, tconsts: Iterable[str]) -> None:
+        """
+        Registers titles as pending; titles already in the ledger keep their state.
+
+        Args:
+            tconsts (Iterable[str]): IMDb title IDs.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO titles (tconst, status) VALUES (?, ?)",
+                ((tconst, PENDING) for tconst in tconsts)
+            )
+
+    def reopen(self, tconsts: Iterable[str]) -> None:
+        """
+        Marks titles as pending again so they are recrawled, whatever their current state.
+
+        Args:
+            tconsts (Iterable[str]): IMDb title IDs.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO titles (tconst, status) VALUES (?, ?) "
+                "ON CONFLICT(tconst) DO UPDATE SET status = excluded.status, attempts = 0, error = NULL",
+                ((tconst, PENDING) for tconst in tconsts)
+            )
+
+    def import_processed(self, tconsts: Iterable[str], processed_time: Optional[str] = None) -> None:
+        """
+        Marks titles crawled by an earlier run as done, e.g. from a legacy processed-IDs TSV.
+
+        Args:
+            tconsts (Iterable[str]): IMDb title IDs.
+            processed_time (Optional[str]): Timestamp to record. Defaults to now.
+        """
+        processed_time = processed_time or datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO titles (tconst, status, attempts, updated_at) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(tconst) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at",
+                ((tconst, DONE, processed_time) for tconst in tconsts)
+            )
+
+    def remaining(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Lists titles still to crawl: pending ones and failed ones with attempts left, in insertion order.
+
+        Args:
+            limit (Optional[int]): Maximum number of IDs to return.
+
+        Returns:
+            List[str]: IMDb title IDs.
+        """
+        query = "SELECT tconst FROM titles WHERE status != ? AND attempts < ? ORDER BY rowid"
+        params = [DONE, self.max_attempts]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Counts titles per crawl state.
+
+        Returns:
+            dict: Number of titles per status.
+        """
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM titles GROUP BY status"))
+
+    def recover_output(self, output_file: Path) -> None:
+        """
+        Truncates an output file back to its last committed size, dropping rows of uncommitted batches.
+
+        The first call for a file records its current size as the committed baseline.
+
+        Args:
+            output_file (Path): Output CSV written in batches.
+        """
+        size = output_file.stat().st_size if output_file.exists() else 0
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM outputs WHERE path = ?", (str(output_file),)).fetchone()
+        if row is None:
+            with self._lock, self._conn:
+                self._conn.execute("INSERT INTO outputs (path, size) VALUES (?, ?)", (str(output_file), size))
+        elif size > row[0]:
+            logger.info(f"Dropping {size - row[0]} uncommitted bytes from {output_file}")
+            with open(output_file, "r+b") as f:
+                f.truncate(row[0])
+
+    def commit_batch(self, output_file: Path, done: List[str], failed: Dict[str, str]) -> None:
+        """
+        Records a written batch: marks titles done or failed and stores the new output size atomically.
+
+        Call only after the batch's rows have been flushed to `output_file`.
+
+        Args:
+            output_file (Path): Output CSV the batch was appended to.
+            done (List[str]): Titles whose rows were written.
+            failed (Dict[str, str]): Titles that could not be crawled, with the reason.
+        """
+        now = datetime.now().isoformat()
+        size = output_file.stat().st_size if output_file.exists() else 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE titles SET status = ?, attempts = attempts + 1, updated_at = ?, error = NULL WHERE tconst = ?",
+                ((DONE, now, tconst) for tconst in done)
+            )
+            self._conn.executemany(
+                "UPDATE titles SET status = ?, attempts = attempts + 1, updated_at = ?, error = ? WHERE tconst = ?",
+                ((FAILED, now, error, tconst) for tconst, error in failed.items())
+            )
+            self._conn.execute(
+                "INSERT INTO outputs (path, size) VALUES (?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size",
+                (str(output_file), size)
+            )
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,108 @@
+import time
+import aiohttp
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, Optional
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+
+class CrawlMetrics:
+    """
+    Collects per-request timing for the crawler's HTTP session.
+
+    Connection setup and time-to-first-byte are captured through aiohttp tracing;
+    body download time is reported by the caller once the response has been read.
+
+    Attributes:
+        requests (int): Number of completed requests.
+        new_connections (int): Requests that had to open a new TCP/TLS connection.
+        connect_time (float): Total seconds spent opening connections.
+        ttfb (float): Total seconds from sending a request to receiving response headers.
+        body_time (float): Total seconds spent reading response bodies.
+        statuses (Counter): Response count per HTTP status.
+    """
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+        self.connect_time = 0.0
+        self.ttfb = 0.0
+        self.body_time = 0.0
+        self.statuses: Counter = Counter()
+        self.started = time.monotonic()
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Builds the aiohttp trace config that timestamps connection and header events.
+
+        Timestamps are written into the dict passed as `trace_request_ctx` to the request.
+
+        Returns:
+            aiohttp.TraceConfig: Trace config to pass to `aiohttp.ClientSession`.
+        """
+        def timing(ctx: SimpleNamespace) -> Dict[str, float]:
+            return ctx.trace_request_ctx if isinstance(ctx.trace_request_ctx, dict) else {}
+
+        async def on_request_start(session, ctx, params):
+            timing(ctx)["start"] = time.perf_counter()
+
+        async def on_connection_create_start(session, ctx, params):
+            timing(ctx)["connect_start"] = time.perf_counter()
+
+        async def on_connection_create_end(session, ctx, params):
+            data = timing(ctx)
+            data["connect"] = time.perf_counter() - data.get("connect_start", time.perf_counter())
+
+        async def on_request_end(session, ctx, params):
+            data = timing(ctx)
+            data["ttfb"] = time.perf_counter() - data.get("start", time.perf_counter())
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    def record(self, url: str, status: Optional[int], timing: Dict[str, float]) -> None:
+        """
+        Adds one finished request to the totals.
+
+        Args:
+            url (str): Requested URL.
+            status (Optional[int]): HTTP status, or None if the request failed.
+            timing (dict): Timestamps collected by the trace config plus the "body" duration.
+        """
+        self.requests += 1
+        self.statuses[status] += 1
+        if "connect" in timing:
+            self.new_connections += 1
+            self.connect_time += timing["connect"]
+        self.ttfb += timing.get("ttfb", 0.0)
+        self.body_time += timing.get("body", 0.0)
+        logger.debug(
+            f"{url} status={status} connect={timing.get('connect', 0.0):.3f}s "
+            f"ttfb={timing.get('ttfb', 0.0):.3f}s body={timing.get('body', 0.0):.3f}s"
+        )
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarizes where crawl time went.
+
+        Returns:
+            dict: Request counts, connection reuse and average connect/TTFB/body times in seconds.
+        """
+        count = max(self.requests, 1)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.requests - self.new_connections,
+            "avg_connect": round(self.connect_time / max(self.new_connections, 1), 4),
+            "avg_ttfb": round(self.ttfb / count, 4),
+            "avg_body": round(self.body_time / count, 4),
+            "statuses": dict(self.statuses),
+            "elapsed": round(time.monotonic() - self.started, 2)
+        }
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Pages the crawler can fetch for a title.
+TITLE_PAGE = "title"
+PLOT_PAGE = "plot"
+
+# Fields each page is responsible for.
+PAGE_FIELDS = {
+    TITLE_PAGE: ('movie_title', 'movie_year', 'age_rating', 'duration', 'imdb_rating',
+                 'short_synopsis', 'top_5_actors', 'genres', 'poster_url'),
+    PLOT_PAGE: ('summaries', 'long_synopsis'),
+}
+
+# Values the extractors return when a field could not be found.
+PLACEHOLDERS = {
+    'movie_title': "Title not found",
+    'movie_year': "Year not found",
+    'age_rating': "Rating not found",
+    'duration': "Runtime not found",
+    'imdb_rating': "Rating not found",
+    'short_synopsis': "No short sum found",
+    'top_5_actors': "Actors not found",
+    'genres': "Genres not found",
+    'poster_url': "Poster not found",
+    'summaries': "No summaries found",
+    'long_synopsis': "Synopsis not found",
+}
+
+
+def _has_value(field: str, value: Any) -> bool:
+    """
+    Checks whether a field holds real data rather than a missing value or placeholder.
+
+    Lists may arrive as Python lists (fresh crawl) or their string form (read back from CSV).
+
+    Args:
+        field (str): Field name.
+        value (Any): Field value.
+
+    Returns:
+        bool: True if the value is usable.
+    """
+    if value is None or isinstance(value, float):
+        return False
+    placeholder = PLACEHOLDERS[field]
+    if isinstance(value, list):
+        return bool(value) and value != [placeholder]
+    return value.strip() not in ("", "[]", placeholder, str([placeholder]))
+
+
+class CrawlPlanner:
+    """
+    Decides per title which IMDb pages actually need to be fetched, and counts the requests saved.
+
+    A page is fetched when any of its fields is missing from the known record or the record is
+    older than that page's maximum age. The plot summary page is also skipped when the title
+    page already yielded both summaries and a long synopsis.
+
+    Attributes:
+        max_age (dict): Maximum record age per page before it is refetched.
+        requests_made (int): Page requests planned and issued.
+        requests_saved (int): Page requests skipped.
+    """
+    def __init__(self, title_max_age_days: float = 7, plot_max_age_days: float = 30) -> None:
+        self.max_age = {
+            TITLE_PAGE: timedelta(days=title_max_age_days),
+            PLOT_PAGE: timedelta(days=plot_max_age_days),
+        }
+        self.requests_made = 0
+        self.requests_saved = 0
+
+    def is_complete(self, record: Dict[str, Any], page: str) -> bool:
+        """
+        Checks whether a record already has every field a page provides.
+
+        Args:
+            record (dict): Movie record.
+            page (str): TITLE_PAGE or PLOT_PAGE.
+
+        Returns:
+            bool: True if no field of the page is missing.
+        """
+        return all(_has_value(field, record.get(field)) for field in PAGE_FIELDS[page])
+
+    def is_fresh(self, record: Dict[str, Any], page: str) -> bool:
+        """
+        Checks whether a record is younger than the page's maximum age.
+
+        Args:
+            record (dict): Movie record with a crawl_timestamp.
+            page (str): TITLE_PAGE or PLOT_PAGE.
+
+        Returns:
+            bool: True if the record does not need refreshing for this page.
+        """
+        try:
+            crawled_at = datetime.fromisoformat(str(record.get('crawl_timestamp')))
+        except ValueError:
+            return False
+        return datetime.now() - crawled_at < self.max_age[page]
+
+    def pages_needed(self, known: Optional[Dict[str, Any]] = None, force: bool = False) -> List[str]:
+        """
+        Plans the pages to fetch for a title.
+
+        Args:
+            known (Optional[dict]): Previously crawled record for the title, if any.
+            force (bool): Fetch every page regardless of the known record, e.g. for a
+                scheduled recrawl whose interval is shorter than the freshness windows.
+
+        Returns:
+            list: Pages to fetch, in fetch order.
+        """
+        if not known or force:
+            return [TITLE_PAGE, PLOT_PAGE]
+        return [
+            page for page in (TITLE_PAGE, PLOT_PAGE)
+            if not (self.is_complete(known, page) and self.is_fresh(known, page))
+        ]
+
+    def record(self, fetched: int, skipped: int) -> None:
+        """
+        Adds one title's outcome to the request counters.
+
+        Args:
+            fetched (int): Pages requested for the title.
+            skipped (int): Pages the plan avoided requesting.
+        """
+        self.requests_made += fetched
+        self.requests_saved += skipped
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Summarizes the requests issued and saved in this run.
+
+        Returns:
+            dict: Request counters.
+        """
+        return {"requests_made": self.requests_made, "requests_saved": self.requests_saved}
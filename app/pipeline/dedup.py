@@ -0,0 +1,160 @@
+import re
+import zlib
+import hashlib
+import numpy as np
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Largest prime below 2**32; keeps (a * h + b) within uint64 for 32-bit shingle hashes.
+_HASH_PRIME = np.uint64(4294967291)
+_MAX_HASH = 4294967295
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Supported dedup scopes: per movie, across the movies deduplicated together, or disabled.
+DEDUP_SCOPES = ("movie", "global", "off")
+
+
+def _tokens(text: str) -> List[str]:
+    """
+    Normalizes a text into lowercase word tokens, ignoring punctuation and whitespace differences.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        list: The normalized tokens.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class ChunkDeduplicator:
+    """
+    Detects exact and near-duplicate chunks using hashing plus MinHash with LSH banding.
+
+    Attributes:
+        scope (str): "movie" compares chunks within the same movie, "global" across all movies
+            checked by this deduplicator.
+        threshold (float): Estimated Jaccard similarity at or above which a chunk is a near-duplicate.
+        shingle_size (int): Number of words per shingle.
+        num_perm (int): Number of MinHash permutations.
+        bands (int): Number of LSH bands; must divide `num_perm`.
+    """
+    def __init__(self, scope: str = "movie",
+                 threshold: float = 0.8,
+                 shingle_size: int = 3,
+                 num_perm: int = 64,
+                 bands: int = 16,
+                 seed: int = 1) -> None:
+
+        if scope not in DEDUP_SCOPES:
+            raise ValueError(f"Unknown dedup scope '{scope}', expected one of {DEDUP_SCOPES}")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.scope = scope
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # A fixed seed keeps signatures identical across processes and hosts.
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)[:, None]
+
+        self._current_key: Optional[str] = None
+        self._exact: Set[str] = set()
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        self._signatures: List[np.ndarray] = []
+
+    def _reset(self) -> None:
+        """Forgets every chunk seen so far."""
+        self._exact.clear()
+        self._buckets.clear()
+        self._signatures.clear()
+
+    def _signature(self, tokens: List[str]) -> np.ndarray:
+        """
+        Computes the MinHash signature of a token list.
+
+        Args:
+            tokens (list): Normalized tokens of the chunk.
+
+        Returns:
+            np.ndarray: Signature of length `num_perm`.
+        """
+        k = self.shingle_size
+        shingles = {" ".join(tokens[i:i + k]) for i in range(max(len(tokens) - k + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) % _HASH_PRIME).min(axis=1)
+
+    def check(self, movie_id: str, text: str) -> Optional[str]:
+        """
+        Checks a chunk against every chunk seen in its scope and remembers it if it is new.
+
+        Args:
+            movie_id (str): The movie the chunk belongs to.
+            text (str): The chunk text.
+
+        Returns:
+            Optional[str]: "exact" or "near" if the chunk is redundant, otherwise None.
+        """
+        if self.scope == "off":
+            return None
+        # Within-movie mode only needs state for the movie currently being processed.
+        if self.scope == "movie" and movie_id != self._current_key:
+            self._current_key = movie_id
+            self._reset()
+
+        tokens = _tokens(text)
+        digest = hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest()
+        if digest in self._exact:
+            return "exact"
+
+        signature = self._signature(tokens)
+        band_keys = [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+        candidates = {idx for key in band_keys for idx in self._buckets.get(key, ())}
+        for idx in candidates:
+            if np.mean(self._signatures[idx] == signature) >= self.threshold:
+                return "near"
+
+        self._exact.add(digest)
+        self._signatures.append(signature)
+        for key in band_keys:
+            self._buckets[key].append(len(self._signatures) - 1)
+        return None
+
+
+def deduplicate_documents(documents: List[dict], scope: str = "movie", threshold: float = 0.8) -> Tuple[List[dict], Dict[str, int]]:
+    """
+    Drops redundant chunks before embedding, keeping the first occurrence in document order.
+
+    Documents are ordered short synopsis, summaries, long synopsis per movie, so a summary that
+    repeats the short synopsis is the copy that gets dropped.
+
+    The "global" scope only spans the documents passed in, i.e. one shard of chunk_and_embed or
+    one part of the streaming pipeline, not the whole run. A chunk repeating another movie's chunk
+    is dropped from the later movie, which then loses that text from its chunks and its centroid,
+    and can be left with no documents at all. It suits text shared verbatim across titles, such as
+    a series blurb; "movie" never takes text away from a movie.
+
+    Args:
+        documents (list): Chunk documents with movie_id and text keys.
+        scope (str): "movie", "global" or "off". Default is "movie".
+        threshold (float): Near-duplicate Jaccard threshold. Default is 0.8.
+
+    Returns:
+        tuple: The kept documents and a dict with "exact" and "near" removal counts.
+    """
+    deduplicator = ChunkDeduplicator(scope=scope, threshold=threshold)
+    stats = {"exact": 0, "near": 0}
+    kept: List[dict] = []
+    for doc in documents:
+        reason = deduplicator.check(doc["movie_id"], doc["text"])
+        if reason:
+            stats[reason] += 1
+        else:
+            kept.append(doc)
+    return kept, stats
@@ -1,58 +1,138 @@
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+import hashlib
+from typing import Any, Dict, Optional
 from googleapiclient.http import MediaFileUpload
-from config import SERVICE_ACCOUNT_FILE, SCOPES, FOLDER_ID, MOVIE_METADATA_FILE
+from config import FOLDER_ID, MOVIE_METADATA_FILE, DRIVE_CHUNK_SIZE
+from google_clients import google_clients
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.utils.logger import logger
 
-def upload_metadata_to_drive(file_path: str = None, file_name: str = None) -> str:
+# MIME types of the files the pipeline uploads, by extension.
+MIME_TYPES = {
+    '.parquet': 'application/vnd.apache.parquet',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
 
+# Times a failed chunk is retried; the upload resumes from the last byte Drive acknowledged.
+UPLOAD_RETRIES = 5
+
+
+def mime_type_for(file_name: str) -> str:
+    """
+    Returns the MIME type recorded in Google Drive for a pipeline file.
+
+    Args:
+        file_name (str): File name or path.
+
+    Returns:
+        str: The MIME type, or "application/octet-stream" for unknown extensions.
+    """
+    return MIME_TYPES.get(os.path.splitext(file_name)[1].lower(), 'application/octet-stream')
+
+
+def file_md5(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Computes the MD5 of a file, the checksum Google Drive reports as md5Checksum.
+
+    Args:
+        file_path (str): Path to the file.
+        block_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: MD5 hex digest.
     """
-    Uploads a metadata file to Google Drive.
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_drive_file(service: Any, file_name: str, folder_id: str = FOLDER_ID) -> Optional[Dict[str, Any]]:
+    """
+    Finds the most recently modified file with a given name in a Drive folder.
+
+    Args:
+        service (Any): Google Drive v3 service.
+        file_name (str): Name of the file in Google Drive.
+        folder_id (str): ID of the Drive folder. Default is FOLDER_ID.
+
+    Returns:
+        Optional[dict]: The file's id, name and md5Checksum, or None if there is no such file.
+    """
+    query = f"'{folder_id}' in parents and name='{file_name}' and trashed=false"
+    files = service.files().list(q=query, fields="files(id, name, md5Checksum, modifiedTime)",
+                                 orderBy="modifiedTime desc").execute().get('files', [])
+    if len(files) > 1:
+        logger.info(f"- Found {len(files)} copies of '{file_name}', updating the newest")
+    return files[0] if files else None
+
+
+def upload_metadata_to_drive(file_path: str = None, file_name: str = None,
+                             chunk_size: int = DRIVE_CHUNK_SIZE, service: Optional[Any] = None) -> str:
+
+    """
+    Uploads a metadata file to Google Drive, replacing the previous upload in place.
+
+    If the folder already holds a file with the same name, its content is updated so the folder
+    keeps a single copy; if that copy's checksum matches the local file, nothing is uploaded.
+    Otherwise the file is sent as a resumable upload in chunks of `chunk_size` bytes, and a chunk
+    that fails is retried from the last byte Drive acknowledged rather than from the start.
 
     Args:
         file_path (str): The local path to the file to be uploaded.
-                         Default is "imdb_data/romance_metadata.xlsx".
+                         Default is "imdb_data/<MOVIE_METADATA_FILE>".
         file_name (str): The name of the file as it will appear in Google Drive.
-                         Default is "romance_metadata.xlsx".
+                         Default is MOVIE_METADATA_FILE.
+        chunk_size (int): Bytes per upload request, a multiple of 256 KiB. Default is DRIVE_CHUNK_SIZE.
+        service (Optional[Any]): Google Drive v3 service, e.g. a local fake. Defaults to the
+                                 calling thread's service from `google_clients`.
 
     Returns:
-        str: The ID of the uploaded file in Google Drive.
+        str: The ID of the file in Google Drive.
     """
     if file_path is None:
         file_path = f"imdb_data/{MOVIE_METADATA_FILE}"
     if file_name is None:
         file_name = MOVIE_METADATA_FILE
 
-    # Define the MIME type for an Excel file.
-    mime_type: str = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    # Define the MIME type from the file extension (Parquet, or Excel for older configurations).
+    mime_type: str = mime_type_for(file_name)
+
+    service = service or google_clients.drive()
 
-    # Authenticate using the service account credentials and the specified scopes.
-    credentials = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-    service = build('drive', 'v3', credentials=credentials)
+    # Skip the upload when Drive already holds the same content.
+    checksum = file_md5(file_path)
+    existing = find_drive_file(service, file_name)
+    if existing is not None and existing.get('md5Checksum') == checksum:
+        logger.info(f"- '{file_name}' is unchanged in Drive (file ID: {existing['id']}), skipping upload")
+        return existing['id']
 
-    # Define the metadata for the file to be uploaded, including its name and parent folder ID.
-    file_metadata: dict = {
-        'name': file_name,
-        'parents': [FOLDER_ID]
-    }
+    # Create a resumable MediaFileUpload object that sends the file in chunks.
+    media = MediaFileUpload(file_path, mimetype=mime_type, chunksize=chunk_size, resumable=True)
 
-    # Create a MediaFileUpload object to handle the file upload.
-    media = MediaFileUpload(file_path, mimetype=mime_type)
+    if existing is not None:
+        # Replace the content of the existing file, keeping its ID.
+        request = service.files().update(fileId=existing['id'], media_body=media, fields='id')
+    else:
+        # Define the metadata for the new file, including its name and parent folder ID.
+        file_metadata: dict = {
+            'name': file_name,
+            'parents': [FOLDER_ID]
+        }
+        request = service.files().create(body=file_metadata, media_body=media, fields='id')
 
-    # Upload the file to Google Drive and retrieve the response containing the file ID.
-    response: dict = service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields='id'
-    ).execute()
+    # Send the chunks until Drive returns the response containing the file ID.
+    response = None
+    while response is None:
+        status, response = request.next_chunk(num_retries=UPLOAD_RETRIES)
+        if status is not None:
+            logger.info(f"- Upload {int(status.progress() * 100)}% complete.")
 
     # Extract the file ID from the response and log the upload success.
     file_id: str = response.get("id")
-    logger.info(f"- Uploaded '{file_name}' with file ID: {file_id}")
+    action = "Updated" if existing is not None else "Uploaded"
+    logger.info(f"- {action} '{file_name}' with file ID: {file_id}")
     return file_id
-
@@ -1,40 +1,91 @@
 import asyncio
 import aiohttp
+import queue
 import ssl
 import certifi
-from typing import Union
-from bs4.element import Tag
-from bs4 import BeautifulSoup
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import random
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import pandas as pd
-from config import TSV_FILENAME, PROCESSED_IDS, OUTPUT_FILE
+from config import (TSV_FILENAME, PROCESSED_IDS, OUTPUT_FILE, RESPONSE_CACHE_DIR, CRAWL_REPLAY, REPLAY_OUTPUT_FILE,
+                    CRAWL_LEDGER, RECRAWL_STATE, RECRAWL_BUDGET)
+from crawl_metrics import CrawlMetrics
+from rate_limiter import AdaptiveRateLimiter, THROTTLE_STATUSES, parse_retry_after
+from page_parser import parse_title_page, parse_plot_page, resolve_backend, TITLE_FIELDS
+from crawl_planner import CrawlPlanner, PAGE_FIELDS, PLACEHOLDERS, TITLE_PAGE, PLOT_PAGE
+from response_cache import ResponseCache
+from crawl_ledger import CrawlLedger
+from recrawl_scheduler import RecrawlScheduler
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.utils.logger import logger
 
+# Columns of the crawl CSV, in order; every batch is appended with exactly these.
+OUTPUT_COLUMNS = ('tconst', 'crawl_timestamp') + TITLE_FIELDS
+
+# What the plot page parser returns when it finds nothing, used when the page could not be fetched.
+MISSING_PLOT_FIELDS = {'summaries': [PLACEHOLDERS['summaries']], 'long_synopsis': PLACEHOLDERS['long_synopsis']}
+
 class IMDbCrawler:
     """
     An asynchronous web crawler for scraping IMDb movie metadata and synopses.
 
     Attributes:
         output_dir (Path): Directory to store output files.
-        min_delay (float): Minimum delay between requests (for rate limiting).
+        min_delay (float): Minimum delay between requests; also the base of the retry backoff.
         max_delay (float): Maximum delay between requests.
         max_retries (int): Number of retry attempts for failed requests.
-        concurrent_requests (int): Maximum number of concurrent requests.
+        concurrent_requests (int): Maximum number of concurrent requests; also the number of crawl workers.
+        batch_size (int): Number of movies buffered by the writer before each CSV flush.
+        max_rate (float): Upper bound in requests per second for the adaptive rate limiter.
+        base_url (str): Site root, overridable to point the crawler at a local fixture server.
+        keep_alive (bool): Reuse pooled connections instead of closing them after each request.
+        connect_timeout (float): Seconds allowed to establish a connection.
+        read_timeout (float): Seconds allowed between reads of a response.
+        request_timeout (float): Total seconds allowed per request.
+        dns_cache_ttl (int): Seconds to cache DNS lookups.
+        parser_backend (str): HTML parser backend, "lxml" (default) or "bs4".
+        parser_workers (int): Size of the process pool used for HTML parsing; 0 parses on the event loop.
+        cache (Optional[ResponseCache]): On-disk response cache used for conditional requests and replay.
+        replay (bool): Serve every page from the cache without any network access, re-extracting
+            every title in the TSV, including those the ledger lists as done.
+        output_file (Path): CSV the crawled movies are appended to; REPLAY_OUTPUT_FILE in replay mode,
+            so a replay never duplicates rows of the crawl CSV.
         headers (dict): HTTP headers to mimic browser behavior.
         session (aiohttp.ClientSession): Reusable HTTP session for requests.
+        metrics (CrawlMetrics): Per-request connect/TTFB/body timings.
+        planner (CrawlPlanner): Decides which pages each title needs and counts requests saved.
+        ledger (CrawlLedger): Crash-safe crawl state per title, committed with each output batch.
+        scheduler (Optional[RecrawlScheduler]): Adds titles due for a refresh to each run and
+            filters unchanged records out of the output.
+        sink (Optional[queue.Queue]): Bounded queue that receives every written batch for the
+            streaming pipeline; a full queue makes the crawler wait.
     """
     def __init__(self, output_dir: str = "imdb_data",
                  min_delay: float = 2.0,
                  max_delay: float = 4.0,
                  max_retries: int = 3,
-                 concurrent_requests: int = 3) -> None:
+                 concurrent_requests: int = 3,
+                 batch_size: int = 100,
+                 max_rate: float = 10.0,
+                 base_url: str = "https://www.imdb.com",
+                 keep_alive: bool = True,
+                 connect_timeout: float = 10.0,
+                 read_timeout: float = 30.0,
+                 request_timeout: float = 60.0,
+                 dns_cache_ttl: int = 300,
+                 parser_backend: str = "lxml",
+                 parser_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None,
+                 replay: bool = False,
+                 scheduler: Optional[RecrawlScheduler] = None,
+                 sink: Optional[queue.Queue] = None) -> None:
 
         # Initialize directory structure
         self.output_dir = Path(output_dir)
@@ -45,6 +96,27 @@ class IMDbCrawler:
         self.max_delay = max_delay
         self.max_retries = max_retries
         self.concurrent_requests = concurrent_requests
+        self.batch_size = batch_size
+        self.base_url = base_url.rstrip("/")
+
+        # Configure connection pooling and timeouts
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.request_timeout = request_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        # Configure HTML parsing, offloaded to worker processes so it does not block the event loop
+        self.parser_backend = resolve_backend(parser_backend)
+        self.parser_workers = (os.cpu_count() or 1) if parser_workers is None else parser_workers
+        self.parser_pool: Optional[ProcessPoolExecutor] = None
+
+        # Configure the response cache; replaying needs one to read from
+        if replay and not cache_dir:
+            raise ValueError("Replay mode requires a cache_dir")
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.replay = replay
+        self.output_file = self.output_dir / (REPLAY_OUTPUT_FILE if replay else OUTPUT_FILE)
 
         # Configure request headers to mimic browser
         self.headers = {
@@ -57,397 +129,338 @@ class IMDbCrawler:
         }
 
         self.session = None
+        self.metrics = CrawlMetrics()
+        self.planner = CrawlPlanner()
+        self.ledger = CrawlLedger(self.output_dir / CRAWL_LEDGER, max_attempts=max_retries)
+        self.scheduler = scheduler
+        self.sink = sink
+        # Titles whose record was reused without fetching anything; nothing new to write or observe
+        self.unfetched: set = set()
+
+        # Start at the rate the fixed random sleeps used to allow, then adapt to the server.
+        average_delay = (min_delay + max_delay) / 2
+        initial_rate = concurrent_requests / average_delay if average_delay > 0 else max_rate
+        self.rate_limiter = AdaptiveRateLimiter(initial_rate=min(initial_rate, max_rate), max_rate=max_rate)
 
     async def init_session(self) -> None:
-        """Initializes the aiohttp session with SSL context."""
+        """
+        Initializes the aiohttp session with SSL context.
+
+        In keep-alive mode connections are pooled and reused, capped per host at
+        `concurrent_requests`, so each page no longer pays a fresh TCP and TLS handshake.
+        aiohttp speaks HTTP/1.1 only; all session setup lives here so an HTTP/2 client can be swapped in.
+        """
         if not self.session:
             # Create SSL context with proper certificate verification
             ssl_context = ssl.create_default_context(cafile=certifi.where())
-            # Configure TCP connector with SSL settings
+            # Configure TCP connector with SSL, pooling and DNS caching
             connector = aiohttp.TCPConnector(
                 ssl=ssl_context,
-                verify_ssl=True,
-                force_close=True  # Ensure connections are closed after use
+                force_close=not self.keep_alive,
+                limit=self.concurrent_requests * 2,
+                limit_per_host=self.concurrent_requests,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.request_timeout,
+                connect=self.connect_timeout,
+                sock_read=self.read_timeout
             )
             # Create the client session
             self.session = aiohttp.ClientSession(
                 headers=self.headers,
-                connector=connector
-            )
-
-    async def get_movies_from_tsv(self, tsv_file: str = TSV_FILENAME) -> List[str]:
-        """
-        Reads movie IDs from a TSV file and filters out already processed IDs.
-
-        Args:
-            tsv_file (str): Path to the input TSV file.
-
-        Returns:
-            List[str]: List of IMDb movie IDs to process.
-        """
-        try:
-            # Read the input TSV file
-            df = pd.read_csv(tsv_file, sep='\t')
-            # Check for and handle already processed movies
-            processed_file = self.output_dir / PROCESSED_IDS
-            if processed_file.exists():
-                processed_df = pd.read_csv(processed_file, sep='\t')
-                processed_ids = set(processed_df['tconst'].tolist())
-                # Remove already processed movies from the queue
-                df = df[~df['tconst'].isin(processed_ids)]
-            logger.info(f"Found {len(df)} movies to process")
-            return df['tconst'].tolist()
-        except Exception as e:
-            logger.info(f"Error reading TSV file: {e}")
-            return []
-
-    async def record_processed_id(self, tconst: str) -> None:
-        """
-        Records a processed IMDb ID into a TSV log with timestamp.
-
-        Args:
-            tconst (str): IMDb title ID.
-        """
-        processed_file = self.output_dir / PROCESSED_IDS
-        try:
-            # Create DataFrame with movie ID and timestamp
-            df = pd.DataFrame({
-                'tconst': [tconst],
-                'processed_time': [datetime.now().isoformat()]
-            })
-            # Append or create the processed IDs file
-            if processed_file.exists():
-                df.to_csv(processed_file, mode='a', header=False, index=False, sep='\t')
-            else:
-                df.to_csv(processed_file, index=False, sep='\t')
-        except Exception as e:
-            logger.info(f"Error recording processed ID: {e}")
-
-    async def extract_movie_data(self, tconst: str) -> Dict[str, Union[str, List[str], None]]:
-        """
-        Extracts full metadata and synopsis info from IMDb for a single title.
-
-        Args:
-            tconst (str): IMDb title ID.
-
-        Returns:
-            Dict: Extracted movie data.
-        """
-        # Initialize movie data structure with metadata
-        movie_data = {
-            'tconst': tconst,
-            'crawl_timestamp': datetime.now().isoformat()
-        }
-        # Construct main movie page URL
-        if not tconst.startswith('/title/'):
-            main_url = f"https://www.imdb.com/title/{tconst}/"
-        else:
-            main_url = f"https://www.imdb.com{tconst}"
-        logger.info(f"Fetching movie data from: {main_url}")
-        try:
-            # Fetch and process main page
-            async with self.session.get(main_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    # Extract all available data points
-                    movie_data.update({
-                        'movie_title': self._extract_title(soup),
-                        'movie_year': self._extract_year(soup, tconst),
-                        'age_rating': self._extract_age_rating(soup, tconst),
-                        'duration': self._extract_runtime(soup),
-                        'imdb_rating': self._extract_imdb_rating(soup),
-                        'short_synopsis': self._extract_short_synopsis(soup),
-                        'top_5_actors': self._extract_top_actors(soup),
-                        'genres': self._extract_genres(soup),
-                        'poster_url': self._extract_poster_url(soup),
-                        'summaries': self._extract_summaries(soup),
-                        'long_synopsis': self._extract_long_synopsis(soup),
-                    })
-                    # Implement rate limiting
-                    await asyncio.sleep(random.uniform(self.min_delay, self.max_delay))
-                else:
-                    logger.info(f"Failed to get movie {tconst}: Status {response.status}")
-        except Exception as e:
-            logger.info(f"Error extracting main data for {tconst}: {str(e)}")
-        # Fetch and process plot summary page
-        plot_url = f"https://www.imdb.com/title/{tconst}/plotsummary/"
-        try:
-            async with self.session.get(plot_url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    movie_data['long_synopsis'] = self._extract_long_synopsis(soup)
-                    movie_data['summaries'] = self._extract_summaries(soup)
-                    await asyncio.sleep(random.uniform(self.min_delay, self.max_delay))
-        except Exception as e:
-            logger.info(f"Error extracting plot data for {tconst}: {str(e)}")
-        return movie_data
-
-    def _extract_title(self, soup: BeautifulSoup) -> Optional[str]:
-        """
-        Extracts the movie title from the given HTML soup.
-
-        Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
-
-        Returns:
-            Optional[str]: Extracted movie title or default fallback.
-        """
-        try:
-            # IMDb page structures can change, so we use multiple selector strategies
-            title_tag = soup.find("span", {"data-testid": "hero__primary-text"})
-            # Extract and return the title if found
-            return title_tag.get_text(strip=True) if title_tag else "Title not found"
-        except Exception as e:
-            logger.info(f"Error extracting title: {e}")
-            return None
-
-    def _extract_long_synopsis(self, soup: BeautifulSoup) -> Optional[str]:
-        """
-        Extracts the long synopsis from the movie's IMDb plot page.
-
-        Args:
-            soup (BeautifulSoup): Parsed IMDb plot page HTML.
-
-        Returns:
-            Optional[str]: Full synopsis text or fallback message.
-        """
-        try:
-            # Locate the full synopsis section
-            synopsis_section = soup.find("div", {"data-testid": "sub-section-synopsis"})
-            # Extract the full synopsis text if available
-            movie_synopsis = (
-                synopsis_section.find("div", {"class": "ipc-html-content-inner-div", "role": "presentation"}).get_text(
-                    strip=True)
-                if synopsis_section else "Synopsis not found"
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[self.metrics.trace_config()]
             )
-            return movie_synopsis
-        except Exception as e:
-            logger.info(f"Error extracting long synopsis: {e}")
-            return None
 
-    def _extract_year(self, soup: BeautifulSoup, tconst: str) -> Optional[str]:
+    async def _parse(self, parser, html: str, tconst: str) -> Dict[str, Union[str, List[str], None]]:
         """
-        Extracts the movie release year using the IMDb releaseinfo URL.
+        Runs a page parser in the process pool, or inline when no pool is configured.
 
         Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+            parser (callable): `parse_title_page` or `parse_plot_page`.
+            html (str): Page HTML.
             tconst (str): IMDb title ID.
 
         Returns:
-            Optional[str]: Release year or fallback message.
+            Dict: Extracted fields.
         """
-        try:
-            # Generate the release info URL dynamically based on tconst
-            release_info_href = f"/title/{tconst}/releaseinfo"
-            # Find the anchor tag that links to the release info page
-            year_tag = soup.find("a", {"class": "ipc-link ipc-link--baseAlt ipc-link--inherit-color"},
-                                 href=lambda x: x and release_info_href in x)
-            # Extract and return the year if found
-            return year_tag.get_text(strip=True) if year_tag else "Year not found"
-        except Exception as e:
-            logger.info(f"Error extracting year for {tconst}: {e}")
-            return None
+        if not self.parser_workers:
+            return parser(html, tconst, self.parser_backend)
+        if self.parser_pool is None:
+            # Spawn, so workers do not fork the event loop thread and whatever locks it holds
+            self.parser_pool = ProcessPoolExecutor(max_workers=self.parser_workers,
+                                                   mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parser_pool, parser, html, tconst, self.parser_backend)
 
-    def _extract_age_rating(self, soup: BeautifulSoup, tconst: str) -> Optional[str]:
+    async def _fetch(self, url: str) -> Tuple[Optional[int], Optional[str]]:
         """
-        Extracts the parental age rating.
+        Fetches a page through the shared rate limiter, retrying throttled or failed requests.
 
-        Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
-            tconst (str): IMDb title ID.
-
-        Returns:
-            Optional[str]: Age rating or fallback message.
-        """
-        try:
-            # Generate the parental guide URL dynamically based on tconst
-            parental_guide_href = f"/title/{tconst}/parentalguide"
-            # Find the anchor tag that links to the parental guide page
-            rating_tag = soup.find("a", {"class": "ipc-link ipc-link--baseAlt ipc-link--inherit-color"},
-                                   href=lambda x: x and parental_guide_href in x)
-            # Extract and return the age rating if found
-            return rating_tag.get_text(strip=True) if rating_tag else "Rating not found"
-        except Exception as e:
-            logger.info(f"Error extracting age rating for {tconst}: {e}")
-            return None
+        Each attempt records its connect, time-to-first-byte and body timings. Retries honour
+        Retry-After (through the limiter) and otherwise back off exponentially from `min_delay`.
 
-    def _extract_runtime(self, soup: BeautifulSoup) -> Optional[str]:
-        """
-        Extracts the movie runtime.
+        With a response cache, cached pages are revalidated with If-None-Match / If-Modified-Since
+        and a 304 is served from the cache as a 200. In replay mode the cache is the only source.
+        Cache reads and writes (gzip and file I/O) run in a thread so they do not block the event loop.
 
         Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+            url (str): URL to fetch.
 
         Returns:
-            Optional[str]: Runtime string or fallback.
-        """
-        try:
-            # Locate the runtime metadata section
-            runtime_tag = soup.find("li", {"role": "presentation", "class": "ipc-metadata-list__item",
-                                           "data-testid": "title-techspec_runtime"})
-            # Extract runtime from the correct div container
-            if runtime_tag:
-                runtime_span = runtime_tag.find("div", {"class": "ipc-metadata-list-item__content-container"})
-                return runtime_span.get_text(strip=True) if runtime_span else "Runtime not found"
-            return "Runtime not found"
-        except Exception as e:
-            logger.info(f"Error extracting runtime: {e}")
-            return None
-
-    def _extract_imdb_rating(self, soup: BeautifulSoup) -> Optional[str]:
-        """
-        Extracts the IMDb rating of the movie.
-
-        Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+            Tuple[Optional[int], Optional[str]]: HTTP status and the page HTML (None unless the status
+                is 200). The status is None when a replay finds no cached page.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If every attempt failed without a response.
+        """
+        if self.replay:
+            html = await asyncio.to_thread(self.cache.get, url)
+            if html is None:
+                logger.info(f"Not in response cache: {url}")
+                return None, None
+            return 200, html
+
+        conditional = await asyncio.to_thread(self.cache.conditional_headers, url) if self.cache else {}
+        status, html, error = None, None, None
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            timing: Dict[str, float] = {}
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url, headers=conditional, trace_request_ctx=timing) as response:
+                    status, error = response.status, None
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    body_start = time.perf_counter()
+                    html = await response.text() if status == 200 else None
+                    timing["body"] = time.perf_counter() - body_start
+                    if self.cache and status == 200:
+                        await asyncio.to_thread(self.cache.put, url, html, response.headers.get("ETag"),
+                                                response.headers.get("Last-Modified"))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, html, error = None, None, e
+            finally:
+                self.rate_limiter.record(status, time.perf_counter() - start, retry_after)
+                self.metrics.record(url, status, timing)
+
+            if status == 304 and conditional:
+                self.cache.revalidated += 1
+                html = await asyncio.to_thread(self.cache.get, url)
+                return (200, html) if html is not None else (status, None)
+            if status is not None and status not in THROTTLE_STATUSES and status < 500:
+                return status, html
+            if attempt < self.max_retries:
+                logger.info(f"Retrying {url} (attempt {attempt + 2}/{self.max_retries + 1}, status {status})")
+                # A Retry-After pause is enforced by the limiter for every request.
+                if retry_after is None:
+                    await asyncio.sleep(max(self.min_delay, 1.0) * 2 ** attempt * random.uniform(0.5, 1.5))
+        if error is not None:
+            raise error
+        return status, html
 
-        Returns:
-            Optional[str]: IMDb rating or fallback.
+    async def get_movies_from_tsv(self, tsv_file: str = TSV_FILENAME) -> List[str]:
         """
-        try:
-            # Locate the IMDb rating section
-            rating_tag = soup.find("div", {"data-testid": "hero-rating-bar__aggregate-rating__score",
-                                           "class": "sc-d541859f-2 kxphVf"})
-            # Extract rating from the correct span container
-            if rating_tag:
-                rating_span = rating_tag.find("span", {"class": "sc-d541859f-1 imUuxf"})
-                return rating_span.get_text(strip=True) if rating_span else "Rating not found"
-            return "Rating not found"
-        except Exception as e:
-            logger.info(f"Error extracting IMDb rating: {e}")
-            return None
+        Reads movie IDs from a TSV file and keeps those the ledger does not list as done.
 
-    def _extract_top_actors(self, soup: BeautifulSoup) -> List[str]:
-        """
-        Extracts the top 5 actors listed in the cast section.
+        In replay mode every ID is kept, since the point is to re-extract titles already crawled,
+        and the ledger is not touched.
 
         Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+            tsv_file (str): Path to the input TSV file.
 
         Returns:
-            List[str]: Actor names or fallback.
+            List[str]: List of IMDb movie IDs to process.
         """
         try:
-            # Locate the actors section
-            actors_section = soup.find("div",
-                                       {"class": "ipc-shoveler ipc-shoveler--base ipc-shoveler--page0 title-cast__grid",
-                                        "role": "group", "data-testid": "shoveler"})
-            # Extract all actor items
-            actors = []
-            if actors_section:
-                actor_items = actors_section.find_all("a", {"data-testid": "title-cast-item__actor"})
-                actors = [actor.get_text(strip=True) for actor in actor_items[:5]]  # Extract top 5 actors
-            return actors if actors else ["Actors not found"]
+            # Read the input TSV file
+            df = pd.read_csv(tsv_file, sep='\t')
+            if self.replay:
+                logger.info(f"Found {len(df)} movies to replay")
+                return df['tconst'].tolist()
+            # Carry over a processed-IDs TSV written before the ledger existed
+            processed_file = self.output_dir / PROCESSED_IDS if PROCESSED_IDS else None
+            if processed_file and processed_file.exists() and not self.ledger.counts():
+                processed_df = pd.read_csv(processed_file, sep='\t')
+                self.ledger.import_processed(processed_df['tconst'].tolist())
+                logger.info(f"Imported {len(processed_df)} processed IDs from {processed_file}")
+            # Register new movies and keep the ones still left to crawl
+            self.ledger.add(df['tconst'].tolist())
+            remaining = set(self.ledger.remaining())
+            movie_ids = [tconst for tconst in df['tconst'].tolist() if tconst in remaining]
+            logger.info(f"Found {len(movie_ids)} movies to process")
+            return movie_ids
         except Exception as e:
-            logger.info(f"Error extracting actors: {e}")
-            return ["Actors not found"]
+            logger.info(f"Error reading TSV file: {e}")
+            return []
 
-    def _extract_genres(self, soup: BeautifulSoup) -> List[str]:
+    def load_known_records(self, tconsts: List[str]) -> Dict[str, Dict[str, str]]:
         """
-        Extracts the list of genres from the IMDb movie page.
-
-        Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+        Reads the latest crawled record of the given titles from the output CSV.
 
-        Returns:
-            List[str]: Genres or fallback.
-        """
-        try:
-            # Locate the genre section
-            genre_section = soup.find("div", {"class": "ipc-chip-list__scroller"})
-            # Extract all genre items
-            genres = []
-            if genre_section:
-                genre_items = genre_section.find_all("span")  # Adjust based on structure
-                genres = [genre.get_text(strip=True) for genre in genre_items]
-            return genres if genres else ["Genres not found"]
-        except Exception as e:
-            logger.info(f"Error extracting genres: {e}")
-            return ["Genres not found"]
-
-    def _extract_poster_url(self, soup: BeautifulSoup) -> Optional[str]:
-        """
-        Extracts the movie poster image URL.
+        Values are read as text, the form in which list fields were written, so a known record
+        hashes like a fresh crawl of the same data. A recrawl appends a new row, so the last row
+        of a title wins.
 
         Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+            tconsts (List[str]): IMDb title IDs.
 
         Returns:
-            Optional[str]: Poster URL or fallback.
+            Dict: Known record per title; titles never written are absent.
         """
-        try:
-            # Locate the poster container
-            poster_container = soup.find("div", {
-                "class": "ipc-media ipc-media--poster-27x40 ipc-image-media-ratio--poster-27x40 ipc-media--media-radius ipc-media--baseAlt ipc-media--poster-l ipc-poster__poster-image ipc-media__img"})
-            # Extract image tag and its URL
-            if poster_container:
-                img_tag = poster_container.find("img")
-                return img_tag['src'] if img_tag and img_tag.has_attr('src') else "Poster not found"
-            return "Poster not found"
-        except Exception as e:
-            logger.info(f"Error extracting poster URL: {e}")
-            return None
+        csv_file = self.output_dir / OUTPUT_FILE
+        wanted = set(tconsts)
+        known: Dict[str, Dict[str, str]] = {}
+        if not wanted or not csv_file.exists() or csv_file.stat().st_size == 0:
+            return known
+        for chunk in pd.read_csv(csv_file, dtype=str, keep_default_na=False, chunksize=10000):
+            for record in chunk[chunk['tconst'].isin(wanted)].to_dict('records'):
+                known[record['tconst']] = record
+        return known
 
-    def _extract_short_synopsis(self, soup: BeautifulSoup) -> Optional[str]:
+    async def extract_movie_data(self, tconst: str, known: Optional[Dict] = None,
+                                 refresh: bool = False) -> Dict[str, Union[str, List[str], None]]:
         """
-        Extracts the short synopsis (1-line summary).
-
-        Args:
-            soup (BeautifulSoup): Parsed IMDb movie page.
+        Extracts full metadata and synopsis info from IMDb for a single title.
 
-        Returns:
-            Optional[str]: Short synopsis or fallback.
-        """
-        try:
-            # Locate the short synopsis section
-            synopsis_tag = soup.find("span", {"role": "presentation", "data-testid": "plot-l", "class":"sc-191592d9-1 kBRZRe"})
-            # Extract and return the short synopsis
-            return synopsis_tag.get_text(strip=True) if synopsis_tag else "No short sum found"
-        except Exception as e:
-            logger.info(f"Error extracting short synopsis: {e}")
-            return None
+        Only the pages the planner deems necessary are fetched: fields that are complete and
+        fresh in `known` are reused, and the plot summary page is skipped when the title page
+        already provided summaries and a long synopsis. If the plot page cannot be fetched, its
+        fields keep their known values, or the parser's "not found" values for a new title.
 
-    def _extract_summaries(self, soup: BeautifulSoup) -> List[str]:
-        """
-        Extracts a list of user-submitted plot summaries.
+        The crawl timestamp only moves forward when the title page was fetched and no page failed,
+        so reused or failed pages never look fresher than their data. A record without a title
+        page is not kept by `write_batch`, so the plot page is not requested after the title page failed.
+        A title for which nothing was fetched is added to `unfetched`.
 
         Args:
-            soup (BeautifulSoup): Parsed IMDb plot summary page.
+            tconst (str): IMDb title ID.
+            known (Optional[Dict]): Previously crawled record for the title, if any.
+            refresh (bool): Fetch every page even if `known` is fresh, for titles the recrawl
+                scheduler picked; `known` is then only a fallback for pages that fail.
 
         Returns:
-            List[str]: Plot summaries or fallback.
-        """
-        try:
-            summaries_section = soup.find("div", {"data-testid": "sub-section-summaries"})
-
-            summaries = []
-            if summaries_section:
-                summary_items = summaries_section.find_all("li")  # Adjust based on IMDb structure
-                summaries = [summary.get_text(strip=True) for summary in summary_items]
-
-            return summaries if summaries else ["No summaries found"]
-        except Exception as e:
-            logger.info(f"Error extracting summaries: {e}")
-            return ["No summaries found"]
-
-    def _extract_text(self, element: Optional[Tag]) -> Optional[str]:
+            Dict: Extracted movie data.
         """
-        Extracts text from a BeautifulSoup element.
+        # Initialize movie data structure with metadata
+        movie_data = {
+            'tconst': tconst,
+            'crawl_timestamp': (known or {}).get('crawl_timestamp') or datetime.now().isoformat()
+        }
+        pages = self.planner.pages_needed(known, force=refresh)
+        # Reuse the fields of pages that do not need refetching
+        for page in (TITLE_PAGE, PLOT_PAGE):
+            if page not in pages:
+                movie_data.update({field: known[field] for field in PAGE_FIELDS[page]})
+        fetched = 0
+        title_fetched = plot_failed = False
+
+        if TITLE_PAGE in pages:
+            # Construct main movie page URL
+            if not tconst.startswith('/title/'):
+                main_url = f"{self.base_url}/title/{tconst}/"
+            else:
+                main_url = f"{self.base_url}{tconst}"
+            logger.info(f"Fetching movie data from: {main_url}")
+            fetched += 1
+            try:
+                # Fetch and process main page
+                status, html = await self._fetch(main_url)
+                if status == 200:
+                    # Extract all available data points
+                    fields = await self._parse(parse_title_page, html, tconst)
+                    if PLOT_PAGE not in pages:
+                        fields = {k: v for k, v in fields.items() if k not in PAGE_FIELDS[PLOT_PAGE]}
+                    movie_data.update(fields)
+                    title_fetched = True
+                else:
+                    logger.info(f"Failed to get movie {tconst}: Status {status}")
+            except Exception as e:
+                logger.info(f"Error extracting main data for {tconst}: {str(e)}")
+
+        # Fetch and process plot summary page unless its fields are already known
+        title_missing = TITLE_PAGE in pages and not title_fetched
+        if PLOT_PAGE in pages and not title_missing and not self.planner.is_complete(movie_data, PLOT_PAGE):
+            plot_url = f"{self.base_url}/title/{tconst}/plotsummary/"
+            fetched += 1
+            plot_failed = True
+            try:
+                status, html = await self._fetch(plot_url)
+                if status == 200:
+                    movie_data.update(await self._parse(parse_plot_page, html, tconst))
+                    plot_failed = False
+                else:
+                    logger.info(f"Failed to get plot of {tconst}: Status {status}")
+            except Exception as e:
+                logger.info(f"Error extracting plot data for {tconst}: {str(e)}")
+            if plot_failed:
+                # Fill the columns the title page did not provide, so the row keeps its shape
+                for field in PAGE_FIELDS[PLOT_PAGE]:
+                    movie_data.setdefault(field, (known or {}).get(field, MISSING_PLOT_FIELDS[field]))
+
+        if title_fetched and not plot_failed:
+            movie_data['crawl_timestamp'] = datetime.now().isoformat()
+        self.planner.record(fetched=fetched, skipped=2 - fetched)
+        if not fetched:
+            self.unfetched.add(tconst)
+        # Keep the output column order stable regardless of which pages were fetched
+        return {key: movie_data[key] for key in OUTPUT_COLUMNS if key in movie_data}
+
+    def write_batch(self, batch: List[Dict[str, Union[str, List[str], None]]]) -> None:
+        """
+        Appends a batch of movies to `output_file` and commits their state to the ledger.
+
+        Rows are flushed to disk before the ledger commit, and `crawl_movies` truncates rows whose
+        commit never happened, so a crash neither loses titles nor writes them twice. Titles whose
+        main page could not be crawled are not written and are marked failed for a later retry.
+        Reused records for which nothing was fetched are only committed, never written again or
+        reported to the scheduler as unchanged. With a recrawl scheduler, only new or changed
+        records are written downstream. With a sink, the written rows are then handed to it,
+        blocking while it is full so a slow consumer throttles the crawl instead of buffering
+        without bound. A replay only writes its rows: titles missing from the cache are skipped,
+        not marked failed, since the ledger tracks the live crawl.
 
         Args:
-            element (Tag): A BeautifulSoup element.
-
-        Returns:
-            Optional[str]: Cleaned text or None.
-        """
-        return element.get_text(strip=True) if element else None
+            batch (List[Dict]): Extracted movie records.
+        """
+        csv_file = self.output_file
+        crawled = [movie for movie in batch if 'movie_title' in movie]
+        failed = {movie['tconst']: "title page not crawled" for movie in batch if 'movie_title' not in movie}
+        reused = {movie['tconst'] for movie in crawled} & self.unfetched
+        self.unfetched.difference_update(reused)
+        fetched = [movie for movie in crawled if movie['tconst'] not in reused]
+        rows = [movie for movie in fetched if self.scheduler.is_changed(movie)] if self.scheduler else fetched
+        if rows:
+            # Only write the header when creating the file
+            write_header = not csv_file.exists() or csv_file.stat().st_size == 0
+            with open(csv_file, 'a', newline='', encoding='utf-8') as f:
+                # Appended rows carry no header, so they must always have the same columns in the same order
+                pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_csv(f, header=write_header, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+        if self.replay:
+            if failed:
+                logger.info(f"Skipped {len(failed)} movies whose title page is not in the response cache")
+        else:
+            self.ledger.commit_batch(csv_file, [movie['tconst'] for movie in crawled], failed)
+        # Reschedule only once the batch is committed, so a crash never hides a change
+        if self.scheduler:
+            self.scheduler.observe(fetched)
+        if self.sink is not None and rows:
+            self.sink.put(rows)
 
     async def crawl_movies(self, num_movies: Optional[int] = None) -> None:
         """
         Orchestrates crawling multiple IMDb movies concurrently and writes results to CSV in batches.
 
+        A producer feeds movie IDs into a bounded queue consumed by `concurrent_requests` workers,
+        which pass their results through a second bounded queue to a single writer task. Only a
+        fixed number of movies is in flight or buffered at any time, and CSV writes run in a thread
+        so they do not block the event loop.
+
         Args:
             num_movies (int, optional): Maximum number of movies to crawl. Defaults to all.
         """
@@ -455,64 +468,119 @@ class IMDbCrawler:
             await self.init_session()
             logger.info(f"Reading movie IDs from TSV...")
             movie_ids = await self.get_movies_from_tsv()
+            refresh_ids = []
+            if self.scheduler:
+                # Top up the run with already crawled titles that are due for a refresh
+                refresh_ids = self.scheduler.due(exclude=movie_ids)
+                self.ledger.reopen(refresh_ids)
+                movie_ids += refresh_ids
+                logger.info(f"Scheduled {len(refresh_ids)} titles for a refresh")
             if not movie_ids:
                 logger.info("No movies found in TSV!")
                 return
             # Apply optional movie limit
             if num_movies:
                 movie_ids = movie_ids[:num_movies]
-            logger.info(f"Found {len(movie_ids)} movies to crawl")
-            # Set up concurrency control
-            semaphore = asyncio.Semaphore(self.concurrent_requests)
-            all_movie_data = []  # Temporary storage for batch processing
-            csv_file = self.output_dir / OUTPUT_FILE
-            # Track CSV file existence for header management
-            self.csv_exists = csv_file.exists()
-
-            async def crawl_with_semaphore(tcont):
-                nonlocal all_movie_data
-                async with semaphore:
-                    movie_data = await self.extract_movie_data(tcont)
-                    if movie_data:
-                        all_movie_data.append(movie_data)
-                        await self.record_processed_id(tcont)
-                        # Batch write to CSV every 100 movies
-                        if len(all_movie_data) >= 100:
-                            df = pd.DataFrame(all_movie_data)
-                            if self.csv_exists:
-                                df.to_csv(csv_file, mode='a', header=False, index=False)
-                            else:
-                                df.to_csv(csv_file, index=False)
-                                self.csv_exists = True
-                            all_movie_data.clear()
-                            logger.info(f"Wrote batch of {len(df)} movies to CSV")
-            # Create and execute crawling tasks
-            tasks = [crawl_with_semaphore(tcont) for tcont in movie_ids]
-            # Monitor progress
-            for i, task in enumerate(asyncio.as_completed(tasks)):
-                await task
-                logger.info(f"Progress: {i + 1}/{len(movie_ids)} movies processed")
-            # Handle any remaining movies in the batch
-            if all_movie_data:
-                df = pd.DataFrame(all_movie_data)
-                if self.csv_exists:
-                    df.to_csv(csv_file, mode='a', header=False, index=False)
-                else:
-                    df.to_csv(csv_file, index=False)
-                logger.info(f"Wrote final batch of {len(df)} movies to CSV")
+            total = len(movie_ids)
+            logger.info(f"Found {total} movies to crawl")
+            if self.replay:
+                # Each replay re-extracts every title, so it starts from an empty file
+                self.output_file.unlink(missing_ok=True)
+            else:
+                # Drop rows of a batch that was written but never committed before a crash
+                self.ledger.recover_output(self.output_file)
+            # Earlier records let the planner skip pages that are still complete and fresh; a replay
+            # re-extracts every page from the cache instead
+            known = {} if self.replay else self.load_known_records(movie_ids)
+            logger.info(f"Loaded {len(known)} previously crawled records")
+            refresh = set(refresh_ids)
+            # Bounded queues keep memory flat however many IDs there are
+            id_queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrent_requests * 2)
+            result_queue: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+            processed = 0
+
+            async def produce():
+                for tconst in movie_ids:
+                    await id_queue.put(tconst)
+                # One stop signal per worker
+                for _ in range(self.concurrent_requests):
+                    await id_queue.put(None)
+
+            async def work():
+                nonlocal processed
+                while (tconst := await id_queue.get()) is not None:
+                    try:
+                        movie_data = await self.extract_movie_data(tconst, known.pop(tconst, None),
+                                                                   refresh=tconst in refresh)
+                        if movie_data:
+                            await result_queue.put(movie_data)
+                    except Exception as e:
+                        logger.info(f"Error crawling {tconst}: {e}")
+                    # Monitor progress
+                    processed += 1
+                    logger.info(f"Progress: {processed}/{total} movies processed")
+                    if processed % 50 == 0:
+                        logger.info(f"Crawl rate: {self.rate_limiter.summary()}")
+
+            async def flush(batch, label):
+                # The writer must keep draining the queue even if a write fails, or workers would block
+                try:
+                    await asyncio.to_thread(self.write_batch, batch)
+                    logger.info(f"Wrote {label} of {len(batch)} movies to CSV")
+                except Exception as e:
+                    logger.info(f"Error writing {label} to CSV: {e}")
+
+            async def write():
+                batch = []
+                while (movie_data := await result_queue.get()) is not None:
+                    batch.append(movie_data)
+                    # Batch write to CSV every `batch_size` movies
+                    if len(batch) >= self.batch_size:
+                        await flush(batch, "batch")
+                        batch = []
+                # Handle any remaining movies in the batch
+                if batch:
+                    await flush(batch, "final batch")
+
+            writer = asyncio.create_task(write())
+            try:
+                await asyncio.gather(produce(), *(work() for _ in range(self.concurrent_requests)))
+            finally:
+                # Let the writer flush whatever was crawled, even if a worker failed
+                await result_queue.put(None)
+                await writer
         except Exception as e:
             logger.info(f"Error during crawling: {str(e)}")
         finally:
             await self.close_session()
 
     async def close_session(self) -> None:
+        """Closes the HTTP session and parser pool, and logs the request timing summary."""
+        if self.parser_pool:
+            self.parser_pool.shutdown()
+            self.parser_pool = None
         if self.session:
             await self.session.close()
             self.session = None
+            logger.info(f"Request timings: {self.metrics.summary()}")
+            logger.info(f"Crawl rate: {self.rate_limiter.summary()}")
+            logger.info(f"Crawl plan: {self.planner.summary()}")
+            logger.info(f"Crawl ledger: {self.ledger.counts()}")
+            if self.scheduler:
+                logger.info(f"Recrawl schedule: {self.scheduler.summary()}")
+            if self.cache:
+                logger.info(f"Response cache: {self.cache.summary()}")
             logger.info("Session closed.")
 
 
-async def run_crawler(output_dir: str = "imdb_data", tsv_file: Optional[str] = None, num_movies: int = 0) -> None:
+async def run_crawler(output_dir: str = "imdb_data",
+                      tsv_file: Optional[str] = None,
+                      num_movies: int = 0,
+                      cache_dir: Optional[str] = RESPONSE_CACHE_DIR,
+                      replay: bool = CRAWL_REPLAY,
+                      recrawl_budget: int = RECRAWL_BUDGET,
+                      batch_size: int = 100,
+                      sink: Optional[queue.Queue] = None) -> None:
     """
     Entrypoint to run the IMDbCrawler with optional input and batch limits.
 
@@ -520,13 +588,25 @@ async def run_crawler(output_dir: str = "imdb_data", tsv_file: Optional[str] = N
         output_dir (str): Output directory path.
         tsv_file (str, optional): Path to custom TSV file of movie IDs.
         num_movies (int): Number of movies to crawl (0 = all).
+        cache_dir (str, optional): Response cache directory; None disables caching.
+        replay (bool): Re-extract every movie from the response cache without network access into
+            REPLAY_OUTPUT_FILE. The recrawl schedule and ledger are not used, so every re-extracted
+            record is written.
+        recrawl_budget (int): Maximum number of known titles refreshed in this run (0 = none).
+        batch_size (int): Number of movies written per batch.
+        sink (Optional[queue.Queue]): Queue receiving each written batch, for the streaming pipeline.
     """
     try:
         crawler = IMDbCrawler(
             output_dir=output_dir,
             min_delay=2.0,
             max_delay=4.0,
-            concurrent_requests=3
+            concurrent_requests=3,
+            batch_size=batch_size,
+            cache_dir=cache_dir,
+            replay=replay,
+            scheduler=RecrawlScheduler(RECRAWL_STATE, budget=recrawl_budget) if recrawl_budget and not replay else None,
+            sink=sink
         )
         if tsv_file:
             crawler.tsv_file = tsv_file  # Optional override
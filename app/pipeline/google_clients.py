@@ -0,0 +1,118 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional
+from config import SERVICE_ACCOUNT_FILE, SCOPES, BIGQUERY_PROJECT, BIGQUERY_API_ENDPOINT
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+# Scope needed by the BigQuery stage, on top of the Drive scopes configured in SCOPES.
+BIGQUERY_SCOPE = "https://www.googleapis.com/auth/bigquery"
+
+
+class GoogleClients:
+    """
+    Lazily created Google API clients shared by the pipeline stages.
+
+    Nothing is loaded on construction: the service account file, the Google client libraries
+    and each client are only touched the first time a stage asks for them, so stages that never
+    reach GCP pay nothing. The credentials and the BigQuery client, which is thread-safe, are
+    shared by all threads. Drive services are not, so each thread gets its own, reusing its
+    authorized HTTP connection across calls; they are all built from one copy of the Drive
+    discovery document bundled with the client library, without a network fetch.
+
+    Attributes:
+        service_account_file (str): Path to the service account key file.
+        scopes (List[str]): OAuth scopes requested for the credentials.
+        project (str): Google Cloud project of the BigQuery client.
+        api_endpoint (str): BigQuery emulator endpoint; empty uses BigQuery itself.
+    """
+    def __init__(self, service_account_file: Optional[str] = SERVICE_ACCOUNT_FILE,
+                 scopes: Optional[List[str]] = None,
+                 project: str = BIGQUERY_PROJECT,
+                 api_endpoint: str = BIGQUERY_API_ENDPOINT) -> None:
+
+        self.service_account_file = service_account_file
+        if scopes is None:
+            scopes = [scope for scope in SCOPES if scope] + [BIGQUERY_SCOPE]
+        self.scopes = list(dict.fromkeys(scopes))
+        self.project = project
+        self.api_endpoint = api_endpoint
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._credentials: Optional[Any] = None
+        self._bigquery: Optional[Any] = None
+        self._discovery: Dict[str, Dict[str, Any]] = {}
+
+    def credentials(self) -> Any:
+        """
+        Returns the service account credentials, loading the key file on the first call.
+
+        Returns:
+            google.oauth2.service_account.Credentials: Credentials with all pipeline scopes.
+        """
+        with self._lock:
+            if self._credentials is None:
+                from google.oauth2 import service_account
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    self.service_account_file, scopes=self.scopes)
+            return self._credentials
+
+    def bigquery(self) -> Any:
+        """
+        Returns the shared BigQuery client, pointed at the emulator when `api_endpoint` is set.
+
+        Returns:
+            google.cloud.bigquery.Client: The client.
+        """
+        credentials = None if self.api_endpoint else self.credentials()
+        with self._lock:
+            if self._bigquery is None:
+                from google.cloud import bigquery
+                if self.api_endpoint:
+                    # A local emulator accepts any project and needs no credentials
+                    from google.auth.credentials import AnonymousCredentials
+                    from google.api_core.client_options import ClientOptions
+                    self._bigquery = bigquery.Client(project=self.project, credentials=AnonymousCredentials(),
+                                                     client_options=ClientOptions(api_endpoint=self.api_endpoint))
+                else:
+                    self._bigquery = bigquery.Client(credentials=credentials, project=self.project)
+                logger.info(f"- Created BigQuery client for project {self.project}")
+            return self._bigquery
+
+    def drive(self) -> Any:
+        """
+        Returns the calling thread's Google Drive v3 service, creating it on the thread's first call.
+
+        Returns:
+            googleapiclient.discovery.Resource: The Drive service.
+        """
+        service = getattr(self._local, "drive", None)
+        if service is None:
+            from googleapiclient.discovery import build_from_document
+            service = build_from_document(self._discovery_document("drive", "v3"), credentials=self.credentials())
+            self._local.drive = service
+        return service
+
+    def _discovery_document(self, name: str, version: str) -> Dict[str, Any]:
+        """Parses a discovery document bundled with the client library, once per API."""
+        with self._lock:
+            key = f"{name}.{version}"
+            if key not in self._discovery:
+                from googleapiclient.discovery_cache import get_static_doc
+                self._discovery[key] = json.loads(get_static_doc(name, version))
+            return self._discovery[key]
+
+    def reset(self) -> None:
+        """Drops the cached credentials and clients, e.g. after the service account key changed."""
+        with self._lock:
+            self._credentials = None
+            self._bigquery = None
+            self._local = threading.local()
+
+
+# Registry used by the pipeline stages
+google_clients = GoogleClients()
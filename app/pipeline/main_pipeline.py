@@ -1,13 +1,17 @@
 import asyncio
+import argparse
 import shutil
+from typing import Dict, Iterable, List, Optional
 from scrape_tt_codes import run_scraper
 from extract_movie_data import run_crawler
 from split_movie_data import split_movie_xlsx
-from drive_upload import upload_metadata_to_drive
-from bigquery_upload import upload_single_file_to_bigquery
 from clean_synopsis import clean_romance_synopsis
 from chunk_and_embed import run_chunk_and_embed_pipeline
-from config import JSONS_FOLDER, TSV_FILENAME
+from stage_runner import Stage, StageRunner
+from streaming_pipeline import run_streaming_pipeline
+from config import (JSONS_FOLDER, TSV_FILENAME, URL, MAX_CLICKS, OUTPUT_FILE, CLEANED_OUTPUT_FILE,
+                    MOVIE_METADATA_FILE, MOVIE_SYNOPSIS_FILE, PIPELINE_WORK_DIR, PIPELINE_PROFILER,
+                    CHUNK_SHARD_SIZE, DEDUP_SCOPE, DEDUP_THRESHOLD, ARCHIVE_CODEC, ARCHIVE_COMPRESSLEVEL)
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -17,90 +21,201 @@ from app.utils.logger import logger
 # === MAIN EXECUTION ===
 logger.info("- Pipeline Launching...")
 
-def run_pipeline():
+# Directory the ETL loads chunk archives from.
+ETL_JSONS_DIR = "../etl/data/jsons"
+
+
+def publish_archive(src_zip: str, dst_zip: str) -> None:
     """
-    Executes the main pipeline for processing IMDb movie data. The pipeline consists of the following steps:
-    1. Scrape IMDb tt codes.
-    2. Scrape movie metadata and synopsis.
-    3. Split combined CSV into metadata and synopsis files.
-    4. Upload metadata to Google Drive.
-    5. Upload metadata from Google Drive to BigQuery.
-    6. Clean synopsis data.
-    7. Chunk and embed synopsis data.
-    8. Move the resulting ZIP file to the `etl/data/jsons/` directory.
+    Copies the chunk archive into the ETL data directory, keeping the original for stage caching.
+
+    Args:
+        src_zip (str): Archive produced by the chunk-and-embed stage.
+        dst_zip (str): Destination path under the ETL data directory.
     """
-    # Step 1: Scrape tt codes
-    logger.info("- Step 1: Scraping tt codes from IMDb...")
-    run_scraper()
-
-    # Step 2: Scrape movie metadata and synopsis
-    logger.info("- Step 2: Scraping movie metadata and synopsis...")
-    asyncio.run(run_crawler(
-        output_dir="imdb_data",
-        num_movies=0
-    ))
-
-    # Step 3: Clean full data
-    logger.info("- Step 3: Cleaning synopsis data...")
-    clean_romance_synopsis(
-        input_csv=None,
-        output_csv=None
-    )
-
-    # Step 4: Split combined XLSX into metadata + synopsis
-    logger.info("- Step 4: Splitting movie data into metadata and synopsis files...")
-    metadata_path, synopsis_path = split_movie_xlsx()
-
-    # Step 5: Upload metadata to Google Drive
-    logger.info("- Step 5: Uploading metadata Excel to Google Drive...")
-    upload_metadata_to_drive(file_path=None, file_name=None)
-
-    # Step 6: Upload metadata from Drive to BigQuery
-    logger.info("- Step 6: Uploading metadata from Drive to BigQuery...")
-    upload_single_file_to_bigquery(
-        target_file_name=None,
-        dataset_id="romance_dataset",
-        table_name="full_data_table"
-    )
-
-    # Step 7: Chunk and embed
-    logger.info("- Step 7: Chunking and embedding synopsis...")
-    run_chunk_and_embed_pipeline(
-        input_excel=None,
-        output_dir=None
-    )
-
-    # Step 7.5: Move ZIP to etl/data/jsons/
-    src_zip = f"{JSONS_FOLDER}.zip"
-    dst_zip = "../etl/data/jsons/" + src_zip
+    # Ensure the destination directory exists and copy the ZIP file into place
+    os.makedirs(os.path.dirname(dst_zip), exist_ok=True)
+    tmp_zip = f"{dst_zip}.tmp"
+    shutil.copyfile(src_zip, tmp_zip)
+    os.replace(tmp_zip, dst_zip)
+    logger.info(f"- Published ZIP to: {dst_zip}")
+
+
+def crawl_movies(output_dir: str) -> None:
+    """
+    Runs the asynchronous IMDb crawler to completion.
+
+    Args:
+        output_dir (str): Directory for the crawl output and ledger.
+    """
+    asyncio.run(run_crawler(output_dir=output_dir, num_movies=0))
 
-    # Ensure the destination directory exists and move the ZIP file
-    os.makedirs("../etl/data/jsons", exist_ok=True)
-    shutil.move(src_zip, dst_zip)
-    logger.info(f"- Moved ZIP to: {dst_zip}")
 
-    # === CLEANUP ===
-    try:
-        # Delete romance_newbatch.tsv
-        if os.path.exists(TSV_FILENAME):
-            os.remove(TSV_FILENAME)
-            logger.info(f"- Removed file: {TSV_FILENAME}")
+def upload_to_drive(file_path: str, file_name: Optional[str] = None) -> str:
+    """
+    Uploads the metadata file to Google Drive.
 
-        # Delete imdb_data/ folder
-        if os.path.exists("imdb_data"):
-            shutil.rmtree("imdb_data")
-            logger.info("- Removed folder: imdb_data/")
+    The Drive upload module, and with it the Google API client library, is only imported once the
+    stage actually runs, so runs that skip it do not pay for the import.
 
-        # Delete romance_chunks_json/ folder
-        if os.path.exists(JSONS_FOLDER):
-            shutil.rmtree(JSONS_FOLDER)
-            logger.info(f"- Removed folder: {JSONS_FOLDER}/")
+    Args:
+        file_path (str): Metadata file to upload.
+        file_name (Optional[str]): Name of the file in Drive. Default is the local file name.
 
-    except Exception as e:
-        logger.warning(f"- Cleanup issue: {e}")
+    Returns:
+        str: The Drive file ID.
+    """
+    from drive_upload import upload_metadata_to_drive
+    return upload_metadata_to_drive(file_path=file_path, file_name=file_name)
+
+
+def load_to_bigquery(file_path: str, dataset_id: str, table_name: str) -> Dict[str, int]:
+    """
+    Merges the metadata file into BigQuery, importing the BigQuery client library only when the stage runs.
+
+    Args:
+        file_path (str): Metadata file to load.
+        dataset_id (str): BigQuery dataset.
+        table_name (str): Target table.
+
+    Returns:
+        dict: Staged, inserted and updated row counts.
+    """
+    from bigquery_upload import load_metadata_to_bigquery
+    return load_metadata_to_bigquery(file_path=file_path, dataset_id=dataset_id, table_name=table_name)
+
+
+def build_stages(work_dir: str = PIPELINE_WORK_DIR) -> List[Stage]:
+    """
+    Declares the pipeline stages with the files they read and write.
+
+    After the split, the metadata branch (Drive and BigQuery uploads, I/O-bound) and the synopsis
+    branch (chunking and embedding in a separate process, then publishing) run concurrently.
+
+    Args:
+        work_dir (str): Directory for intermediate artifacts. Default is PIPELINE_WORK_DIR.
+
+    Returns:
+        list: The pipeline stages.
+    """
+    crawl_csv = f"{work_dir}/{OUTPUT_FILE}"
+    cleaned_csv = f"{work_dir}/{CLEANED_OUTPUT_FILE}"
+    metadata_path = f"{work_dir}/{MOVIE_METADATA_FILE}"
+    synopsis_path = f"{work_dir}/{MOVIE_SYNOPSIS_FILE}"
+    src_zip = f"{JSONS_FOLDER}.zip"
+    dst_zip = f"{ETL_JSONS_DIR}/{src_zip}"
+
+    return [
+        # Step 1: Scrape tt codes
+        Stage("scrape", run_scraper,
+              outputs=[TSV_FILENAME],
+              params={"url": URL, "max_clicks": MAX_CLICKS}),
+        # Step 2: Scrape movie metadata and synopsis, and refresh titles due for a recrawl. Always
+        # runs: the crawler itself finds pending and due titles, and leaves the CSV untouched if none
+        Stage("crawl", crawl_movies,
+              kwargs={"output_dir": work_dir},
+              inputs=[TSV_FILENAME],
+              outputs=[crawl_csv],
+              always_run=True),
+        # Step 3: Clean full data
+        Stage("clean", clean_romance_synopsis,
+              kwargs={"input_csv": crawl_csv, "output_csv": cleaned_csv},
+              inputs=[crawl_csv],
+              outputs=[cleaned_csv],
+              sources=["clean_synopsis.py"]),
+        # Step 4: Split cleaned data into metadata + synopsis
+        Stage("split", split_movie_xlsx,
+              kwargs={"input_csv": cleaned_csv, "output_dir": work_dir},
+              inputs=[cleaned_csv],
+              outputs=[metadata_path, synopsis_path],
+              sources=["split_movie_data.py"]),
+        # Step 5: Upload metadata to Google Drive
+        Stage("drive_upload", upload_to_drive,
+              kwargs={"file_path": metadata_path, "file_name": None},
+              inputs=[metadata_path],
+              branch="metadata"),
+        # Step 6: Merge metadata into BigQuery, straight from the local file
+        Stage("bigquery", load_to_bigquery,
+              kwargs={"file_path": metadata_path, "dataset_id": "romance_dataset", "table_name": "full_data_table"},
+              inputs=[metadata_path],
+              branch="metadata"),
+        # Step 7: Chunk and embed, CPU-bound, so in its own process
+        Stage("chunk_embed", run_chunk_and_embed_pipeline,
+              kwargs={"input_file": synopsis_path, "output_dir": None},
+              inputs=[synopsis_path],
+              outputs=[src_zip],
+              params={"shard_size": CHUNK_SHARD_SIZE, "dedup_scope": DEDUP_SCOPE, "dedup_threshold": DEDUP_THRESHOLD,
+                      "archive_codec": ARCHIVE_CODEC, "archive_compresslevel": ARCHIVE_COMPRESSLEVEL},
+              sources=["chunking.py", "dedup.py", "chunk_archive.py", "chunk_and_embed.py"],
+              executor="process",
+              branch="synopsis"),
+        # Step 8: Copy the ZIP to etl/data/jsons/
+        Stage("publish", publish_archive,
+              kwargs={"src_zip": src_zip, "dst_zip": dst_zip},
+              inputs=[src_zip],
+              outputs=[dst_zip],
+              branch="synopsis"),
+    ]
+
+
+def run_pipeline(only: Optional[List[str]] = None, refresh: Iterable[str] = (),
+                 profiler: Optional[str] = PIPELINE_PROFILER) -> Dict[str, str]:
+    """
+    Executes the main pipeline for processing IMDb movie data. The pipeline consists of the following stages:
+    1. scrape: Scrape IMDb tt codes.
+    2. crawl: Scrape movie metadata and synopsis.
+    3. clean: Clean synopsis data.
+    4. split: Split the cleaned CSV into metadata and synopsis files.
+    5. drive_upload: Upload metadata to Google Drive.
+    6. bigquery: Merge metadata into BigQuery on tconst.
+    7. chunk_embed: Chunk and embed synopsis data.
+    8. publish: Copy the resulting ZIP file to the `etl/data/jsons/` directory.
+
+    Stages start as soon as their dependencies finish, so the metadata upload branch (5-6) and
+    the synopsis branch (7-8) overlap; per-branch and critical-path timings are logged at the end.
+    Stages are skipped when their inputs, parameters and code are unchanged since their last
+    successful run, so e.g. changing only the chunking settings reruns chunk_embed and publish
+    without touching IMDb. Intermediate artifacts are kept in PIPELINE_WORK_DIR. Scraping and
+    crawling depend on IMDb itself, so fresh data is fetched by listing them in `refresh`; the
+    crawl stage runs every time and only fetches titles that are new, failed before or due for
+    a recrawl, so the stages after it rerun only when it wrote something.
+    Each run writes a JSON report with per-stage time, memory and throughput to
+    PIPELINE_WORK_DIR/reports.
+
+    Args:
+        only (Optional[list]): Run only these stages. Default is all stages.
+        refresh (Iterable[str]): Stages to rerun even if up to date, e.g. ["scrape", "crawl"].
+        profiler (Optional[str]): "cprofile" or "pyinstrument" to profile each stage that runs.
+                                  Default is PIPELINE_PROFILER.
+
+    Returns:
+        dict: "ran", "skipped" or "blocked" per stage.
+    """
+    runner = StageRunner(build_stages(), work_dir=PIPELINE_WORK_DIR, profiler=profiler)
+    results = runner.run(only=only, refresh=refresh)
 
     # Log pipeline completion
+    logger.info(f"- Stage results: {results}")
     logger.info("- Pipeline execution complete!")
+    return results
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the IMDb pipeline, skipping stages whose inputs are unchanged.")
+    parser.add_argument("--stage", action="append", dest="stages", default=None,
+                        help="Run only this stage; repeatable.")
+    parser.add_argument("--refresh", action="append", default=[],
+                        help="Rerun this stage even if it is up to date; repeatable, e.g. --refresh scrape.")
+    parser.add_argument("--list", action="store_true", help="Show whether each stage is up to date and exit.")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], default=PIPELINE_PROFILER or None,
+                        help="Profile every stage that runs; profiles are saved next to the run report.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Scrape if needed, then crawl and index movies as they are crawled, publishing rolling archive parts.")
+    args = parser.parse_args()
+    if args.list:
+        for name, status in StageRunner(build_stages(), work_dir=PIPELINE_WORK_DIR).status().items():
+            print(f"{name}: {status}")
+    elif args.stream:
+        run_pipeline(only=["scrape"], refresh=args.refresh)
+        logger.info(f"- Stream results: {run_streaming_pipeline(publish_dir=ETL_JSONS_DIR)}")
+    else:
+        run_pipeline(only=args.stages, refresh=args.refresh, profiler=args.profile)
\ No newline at end of file
@@ -0,0 +1,546 @@
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+from typing import Dict, List, Optional, Union
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional; the BeautifulSoup backend is always available
+    lxml = None
+
+# Available HTML parser backends: "lxml" (single-pass extraction) and "bs4" (html.parser reference).
+PARSER_BACKENDS = ("lxml", "bs4")
+
+# Class attribute values the extractors match on.
+_LINK_CLASS = "ipc-link ipc-link--baseAlt ipc-link--inherit-color"
+_RATING_CLASS = "sc-d541859f-2 kxphVf"
+_RATING_SPAN_CLASS = "sc-d541859f-1 imUuxf"
+_SHORT_SYNOPSIS_CLASS = "sc-191592d9-1 kBRZRe"
+_CAST_CLASS = "ipc-shoveler ipc-shoveler--base ipc-shoveler--page0 title-cast__grid"
+_POSTER_CLASS = "ipc-media ipc-media--poster-27x40 ipc-image-media-ratio--poster-27x40 ipc-media--media-radius ipc-media--baseAlt ipc-media--poster-l ipc-poster__poster-image ipc-media__img"
+
+# Elements whose contents BeautifulSoup stores as non-text strings, which get_text leaves out.
+_NON_TEXT_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+
+PageFields = Dict[str, Union[str, List[str], None]]
+
+# Output columns of a title page, in the order the crawler writes them.
+TITLE_FIELDS = (
+    'movie_title', 'movie_year', 'age_rating', 'duration', 'imdb_rating', 'short_synopsis',
+    'top_5_actors', 'genres', 'poster_url', 'summaries', 'long_synopsis'
+)
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    Validates a parser backend name, falling back to "bs4" when lxml is not installed.
+
+    Args:
+        backend (str): Requested backend.
+
+    Returns:
+        str: The backend that will actually be used.
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+    if backend == "lxml" and lxml is None:
+        logger.info("lxml is not installed, falling back to the BeautifulSoup parser.")
+        return "bs4"
+    return backend
+
+
+def parse_title_page(html: str, tconst: str, backend: str = "lxml") -> PageFields:
+    """
+    Extracts every field of an IMDb title page.
+
+    Module-level so it can run in a process pool.
+
+    Args:
+        html (str): Title page HTML.
+        tconst (str): IMDb title ID.
+        backend (str): Parser backend. Default is "lxml".
+
+    Returns:
+        dict: Movie fields keyed like the crawler's output columns.
+    """
+    if backend == "lxml" and lxml is not None:
+        try:
+            return _lxml_fields(html, tconst)
+        except Exception as e:
+            logger.info(f"lxml parsing failed for {tconst}, retrying with BeautifulSoup: {e}")
+    soup = BeautifulSoup(html, 'html.parser')
+    return {
+        'movie_title': _extract_title(soup),
+        'movie_year': _extract_year(soup, tconst),
+        'age_rating': _extract_age_rating(soup, tconst),
+        'duration': _extract_runtime(soup),
+        'imdb_rating': _extract_imdb_rating(soup),
+        'short_synopsis': _extract_short_synopsis(soup),
+        'top_5_actors': _extract_top_actors(soup),
+        'genres': _extract_genres(soup),
+        'poster_url': _extract_poster_url(soup),
+        'summaries': _extract_summaries(soup),
+        'long_synopsis': _extract_long_synopsis(soup),
+    }
+
+
+def parse_plot_page(html: str, tconst: str, backend: str = "lxml") -> PageFields:
+    """
+    Extracts the long synopsis and user summaries from an IMDb plot summary page.
+
+    Args:
+        html (str): Plot summary page HTML.
+        tconst (str): IMDb title ID.
+        backend (str): Parser backend. Default is "lxml".
+
+    Returns:
+        dict: The long_synopsis and summaries fields.
+    """
+    if backend == "lxml" and lxml is not None:
+        try:
+            fields = _lxml_fields(html, tconst)
+            return {'long_synopsis': fields['long_synopsis'], 'summaries': fields['summaries']}
+        except Exception as e:
+            logger.info(f"lxml parsing failed for {tconst} plot page, retrying with BeautifulSoup: {e}")
+    soup = BeautifulSoup(html, 'html.parser')
+    return {'long_synopsis': _extract_long_synopsis(soup), 'summaries': _extract_summaries(soup)}
+
+
+# === lxml backend ===
+def _has_class(element, value: str) -> bool:
+    """
+    Matches a class attribute the way BeautifulSoup does: a single class name matches any
+    of the element's classes, a space-separated value must equal the whole attribute.
+
+    Args:
+        element: lxml element.
+        value (str): Class value to match.
+
+    Returns:
+        bool: Whether the element matches.
+    """
+    classes = element.get("class")
+    if not classes:
+        return False
+    if " " in value:
+        return " ".join(classes.split()) == value
+    return value in classes.split()
+
+
+def _text(element) -> str:
+    """
+    Returns the element's text like BeautifulSoup's get_text(strip=True).
+
+    Args:
+        element: lxml element.
+
+    Returns:
+        str: Concatenated, stripped text of the element's descendants.
+    """
+    return "".join(part.strip() for part in _strings(element))
+
+
+def _strings(element):
+    """
+    Yields the text of an element and its descendants in document order, leaving out comments and
+    the contents of _NON_TEXT_TAGS elements but keeping the text that follows them.
+
+    Args:
+        element: lxml element.
+
+    Yields:
+        str: Text and tail strings.
+    """
+    # Comments and processing instructions have a non-string tag
+    if not isinstance(element.tag, str) or element.tag in _NON_TEXT_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _first_descendant(element, tag: str, predicate):
+    """
+    Returns the first descendant with the given tag that satisfies `predicate`.
+
+    Args:
+        element: lxml element to search under.
+        tag (str): Tag name of the descendant.
+        predicate (callable): Test applied to each candidate.
+
+    Returns:
+        The matching element, or None.
+    """
+    return next((child for child in element.iterdescendants(tag) if predicate(child)), None)
+
+
+def _lxml_fields(html: str, tconst: str) -> PageFields:
+    """
+    Collects every title and plot page field in a single traversal of the lxml tree.
+
+    Each field keeps the same selector, fallback value and first-match semantics as the
+    BeautifulSoup extractors.
+
+    Args:
+        html (str): Page HTML.
+        tconst (str): IMDb title ID.
+
+    Returns:
+        dict: Movie fields keyed like the crawler's output columns.
+    """
+    root = lxml.html.document_fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    release_info_href = f"/title/{tconst}/releaseinfo"
+    parental_guide_href = f"/title/{tconst}/parentalguide"
+
+    found = {}
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue  # Comments and processing instructions
+        testid = element.get("data-testid")
+        if tag == "span":
+            if testid == "hero__primary-text":
+                found.setdefault("title", element)
+            elif testid == "plot-l" and element.get("role") == "presentation" and _has_class(element, _SHORT_SYNOPSIS_CLASS):
+                found.setdefault("short", element)
+        elif tag == "a":
+            if _has_class(element, _LINK_CLASS):
+                href = element.get("href") or ""
+                if release_info_href in href:
+                    found.setdefault("year", element)
+                if parental_guide_href in href:
+                    found.setdefault("age", element)
+        elif tag == "li":
+            if (testid == "title-techspec_runtime" and element.get("role") == "presentation"
+                    and _has_class(element, "ipc-metadata-list__item")):
+                found.setdefault("runtime", element)
+        elif tag == "div":
+            if testid == "hero-rating-bar__aggregate-rating__score" and _has_class(element, _RATING_CLASS):
+                found.setdefault("rating", element)
+            elif testid == "shoveler" and element.get("role") == "group" and _has_class(element, _CAST_CLASS):
+                found.setdefault("actors", element)
+            elif testid == "sub-section-summaries":
+                found.setdefault("summaries", element)
+            elif testid == "sub-section-synopsis":
+                found.setdefault("synopsis", element)
+            if _has_class(element, "ipc-chip-list__scroller"):
+                found.setdefault("genres", element)
+            if _has_class(element, _POSTER_CLASS):
+                found.setdefault("poster", element)
+
+    fields: PageFields = {
+        'movie_title': _text(found["title"]) if "title" in found else "Title not found",
+        'movie_year': _text(found["year"]) if "year" in found else "Year not found",
+        'age_rating': _text(found["age"]) if "age" in found else "Rating not found",
+        'short_synopsis': _text(found["short"]) if "short" in found else "No short sum found",
+    }
+
+    runtime = "Runtime not found"
+    if "runtime" in found:
+        container = _first_descendant(found["runtime"], "div", lambda e: _has_class(e, "ipc-metadata-list-item__content-container"))
+        runtime = _text(container) if container is not None else "Runtime not found"
+    fields['duration'] = runtime
+
+    rating = "Rating not found"
+    if "rating" in found:
+        span = _first_descendant(found["rating"], "span", lambda e: _has_class(e, _RATING_SPAN_CLASS))
+        rating = _text(span) if span is not None else "Rating not found"
+    fields['imdb_rating'] = rating
+
+    actors = []
+    if "actors" in found:
+        items = [a for a in found["actors"].iterdescendants("a") if a.get("data-testid") == "title-cast-item__actor"]
+        actors = [_text(a) for a in items[:5]]
+    fields['top_5_actors'] = actors if actors else ["Actors not found"]
+
+    genres = [_text(span) for span in found["genres"].iterdescendants("span")] if "genres" in found else []
+    fields['genres'] = genres if genres else ["Genres not found"]
+
+    poster = "Poster not found"
+    if "poster" in found:
+        img = next(found["poster"].iterdescendants("img"), None)
+        poster = img.get("src") if img is not None and img.get("src") is not None else "Poster not found"
+    fields['poster_url'] = poster
+
+    summaries = [_text(li) for li in found["summaries"].iterdescendants("li")] if "summaries" in found else []
+    fields['summaries'] = summaries if summaries else ["No summaries found"]
+
+    long_synopsis = "Synopsis not found"
+    if "synopsis" in found:
+        inner = _first_descendant(
+            found["synopsis"], "div",
+            lambda e: _has_class(e, "ipc-html-content-inner-div") and e.get("role") == "presentation"
+        )
+        # Mirrors the BeautifulSoup extractor, which fails (returning None) when the inner div is missing.
+        long_synopsis = _text(inner) if inner is not None else None
+    fields['long_synopsis'] = long_synopsis
+    return {key: fields[key] for key in TITLE_FIELDS}
+
+
+# === BeautifulSoup backend ===
+def _extract_title(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts the movie title from the given HTML soup.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        Optional[str]: Extracted movie title or default fallback.
+    """
+    try:
+        # IMDb page structures can change, so we use multiple selector strategies
+        title_tag = soup.find("span", {"data-testid": "hero__primary-text"})
+        # Extract and return the title if found
+        return title_tag.get_text(strip=True) if title_tag else "Title not found"
+    except Exception as e:
+        logger.info(f"Error extracting title: {e}")
+        return None
+
+def _extract_long_synopsis(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts the long synopsis from the movie's IMDb plot page.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb plot page HTML.
+
+    Returns:
+        Optional[str]: Full synopsis text or fallback message.
+    """
+    try:
+        # Locate the full synopsis section
+        synopsis_section = soup.find("div", {"data-testid": "sub-section-synopsis"})
+        # Extract the full synopsis text if available
+        movie_synopsis = (
+            synopsis_section.find("div", {"class": "ipc-html-content-inner-div", "role": "presentation"}).get_text(
+                strip=True)
+            if synopsis_section else "Synopsis not found"
+        )
+        return movie_synopsis
+    except Exception as e:
+        logger.info(f"Error extracting long synopsis: {e}")
+        return None
+
+def _extract_year(soup: BeautifulSoup, tconst: str) -> Optional[str]:
+    """
+    Extracts the movie release year using the IMDb releaseinfo URL.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+        tconst (str): IMDb title ID.
+
+    Returns:
+        Optional[str]: Release year or fallback message.
+    """
+    try:
+        # Generate the release info URL dynamically based on tconst
+        release_info_href = f"/title/{tconst}/releaseinfo"
+        # Find the anchor tag that links to the release info page
+        year_tag = soup.find("a", {"class": "ipc-link ipc-link--baseAlt ipc-link--inherit-color"},
+                             href=lambda x: x and release_info_href in x)
+        # Extract and return the year if found
+        return year_tag.get_text(strip=True) if year_tag else "Year not found"
+    except Exception as e:
+        logger.info(f"Error extracting year for {tconst}: {e}")
+        return None
+
+def _extract_age_rating(soup: BeautifulSoup, tconst: str) -> Optional[str]:
+    """
+    Extracts the parental age rating.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+        tconst (str): IMDb title ID.
+
+    Returns:
+        Optional[str]: Age rating or fallback message.
+    """
+    try:
+        # Generate the parental guide URL dynamically based on tconst
+        parental_guide_href = f"/title/{tconst}/parentalguide"
+        # Find the anchor tag that links to the parental guide page
+        rating_tag = soup.find("a", {"class": "ipc-link ipc-link--baseAlt ipc-link--inherit-color"},
+                               href=lambda x: x and parental_guide_href in x)
+        # Extract and return the age rating if found
+        return rating_tag.get_text(strip=True) if rating_tag else "Rating not found"
+    except Exception as e:
+        logger.info(f"Error extracting age rating for {tconst}: {e}")
+        return None
+
+def _extract_runtime(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts the movie runtime.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        Optional[str]: Runtime string or fallback.
+    """
+    try:
+        # Locate the runtime metadata section
+        runtime_tag = soup.find("li", {"role": "presentation", "class": "ipc-metadata-list__item",
+                                       "data-testid": "title-techspec_runtime"})
+        # Extract runtime from the correct div container
+        if runtime_tag:
+            runtime_span = runtime_tag.find("div", {"class": "ipc-metadata-list-item__content-container"})
+            return runtime_span.get_text(strip=True) if runtime_span else "Runtime not found"
+        return "Runtime not found"
+    except Exception as e:
+        logger.info(f"Error extracting runtime: {e}")
+        return None
+
+def _extract_imdb_rating(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts the IMDb rating of the movie.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        Optional[str]: IMDb rating or fallback.
+    """
+    try:
+        # Locate the IMDb rating section
+        rating_tag = soup.find("div", {"data-testid": "hero-rating-bar__aggregate-rating__score",
+                                       "class": "sc-d541859f-2 kxphVf"})
+        # Extract rating from the correct span container
+        if rating_tag:
+            rating_span = rating_tag.find("span", {"class": "sc-d541859f-1 imUuxf"})
+            return rating_span.get_text(strip=True) if rating_span else "Rating not found"
+        return "Rating not found"
+    except Exception as e:
+        logger.info(f"Error extracting IMDb rating: {e}")
+        return None
+
+def _extract_top_actors(soup: BeautifulSoup) -> List[str]:
+    """
+    Extracts the top 5 actors listed in the cast section.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        List[str]: Actor names or fallback.
+    """
+    try:
+        # Locate the actors section
+        actors_section = soup.find("div",
+                                   {"class": "ipc-shoveler ipc-shoveler--base ipc-shoveler--page0 title-cast__grid",
+                                    "role": "group", "data-testid": "shoveler"})
+        # Extract all actor items
+        actors = []
+        if actors_section:
+            actor_items = actors_section.find_all("a", {"data-testid": "title-cast-item__actor"})
+            actors = [actor.get_text(strip=True) for actor in actor_items[:5]]  # Extract top 5 actors
+        return actors if actors else ["Actors not found"]
+    except Exception as e:
+        logger.info(f"Error extracting actors: {e}")
+        return ["Actors not found"]
+
+def _extract_genres(soup: BeautifulSoup) -> List[str]:
+    """
+    Extracts the list of genres from the IMDb movie page.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        List[str]: Genres or fallback.
+    """
+    try:
+        # Locate the genre section
+        genre_section = soup.find("div", {"class": "ipc-chip-list__scroller"})
+        # Extract all genre items
+        genres = []
+        if genre_section:
+            genre_items = genre_section.find_all("span")  # Adjust based on structure
+            genres = [genre.get_text(strip=True) for genre in genre_items]
+        return genres if genres else ["Genres not found"]
+    except Exception as e:
+        logger.info(f"Error extracting genres: {e}")
+        return ["Genres not found"]
+
+def _extract_poster_url(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts the movie poster image URL.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        Optional[str]: Poster URL or fallback.
+    """
+    try:
+        # Locate the poster container
+        poster_container = soup.find("div", {
+            "class": "ipc-media ipc-media--poster-27x40 ipc-image-media-ratio--poster-27x40 ipc-media--media-radius ipc-media--baseAlt ipc-media--poster-l ipc-poster__poster-image ipc-media__img"})
+        # Extract image tag and its URL
+        if poster_container:
+            img_tag = poster_container.find("img")
+            return img_tag['src'] if img_tag and img_tag.has_attr('src') else "Poster not found"
+        return "Poster not found"
+    except Exception as e:
+        logger.info(f"Error extracting poster URL: {e}")
+        return None
+
+def _extract_short_synopsis(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extracts the short synopsis (1-line summary).
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb movie page.
+
+    Returns:
+        Optional[str]: Short synopsis or fallback.
+    """
+    try:
+        # Locate the short synopsis section
+        synopsis_tag = soup.find("span", {"role": "presentation", "data-testid": "plot-l", "class":"sc-191592d9-1 kBRZRe"})
+        # Extract and return the short synopsis
+        return synopsis_tag.get_text(strip=True) if synopsis_tag else "No short sum found"
+    except Exception as e:
+        logger.info(f"Error extracting short synopsis: {e}")
+        return None
+
+def _extract_summaries(soup: BeautifulSoup) -> List[str]:
+    """
+    Extracts a list of user-submitted plot summaries.
+
+    Args:
+        soup (BeautifulSoup): Parsed IMDb plot summary page.
+
+    Returns:
+        List[str]: Plot summaries or fallback.
+    """
+    try:
+        summaries_section = soup.find("div", {"data-testid": "sub-section-summaries"})
+
+        summaries = []
+        if summaries_section:
+            summary_items = summaries_section.find_all("li")  # Adjust based on IMDb structure
+            summaries = [summary.get_text(strip=True) for summary in summary_items]
+
+        return summaries if summaries else ["No summaries found"]
+    except Exception as e:
+        logger.info(f"Error extracting summaries: {e}")
+        return ["No summaries found"]
+
+def _extract_text(element: Optional[Tag]) -> Optional[str]:
+    """
+    Extracts text from a BeautifulSoup element.
+
+    Args:
+        element (Tag): A BeautifulSoup element.
+
+    Returns:
+        Optional[str]: Cleaned text or None.
+    """
+    return element.get_text(strip=True) if element else None
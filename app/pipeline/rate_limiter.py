@@ -0,0 +1,167 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+# Statuses that mean the server is asking us to slow down.
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given either as seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): Raw header value.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared token-bucket limiter whose refill rate follows AIMD (additive increase, multiplicative decrease).
+
+    The rate grows while responses are 200 and latency stays near its baseline, and is cut on
+    429/503, errors or latency rising above `latency_factor` times the baseline. A Retry-After
+    header pauses every caller until it expires.
+
+    Attributes:
+        rate (float): Current request rate in requests per second.
+        min_rate (float): Lower bound for the rate.
+        max_rate (float): Upper bound for the rate.
+        burst (float): Bucket capacity, i.e. how many requests may start back to back.
+        increase (float): Requests per second added after each healthy response.
+        decrease_factor (float): Multiplier applied to the rate on backoff.
+        latency_factor (float): Latency over baseline ratio treated as congestion.
+    """
+    def __init__(self, initial_rate: float = 1.0,
+                 min_rate: float = 0.1,
+                 max_rate: float = 10.0,
+                 burst: float = 1.0,
+                 increase: float = 0.05,
+                 decrease_factor: float = 0.5,
+                 latency_factor: float = 2.0) -> None:
+
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+        # Latency tracking: exponentially weighted average and the lowest average seen.
+        self._latency_avg: Optional[float] = None
+        self._latency_baseline: Optional[float] = None
+        self._last_decrease = 0.0
+
+        # Metrics
+        self.started = time.monotonic()
+        self.completed = 0
+        self.backoff_events = 0
+        self.retry_after_events = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.busy_time = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Adds the tokens accumulated since the last refill."""
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """Waits until a request may start, honouring the token bucket and any Retry-After pause."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _back_off(self, reason: str) -> None:
+        """Cuts the rate multiplicatively, at most once per current request interval."""
+        now = time.monotonic()
+        if now - self._last_decrease < 1 / self.rate:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.backoff_events += 1
+        logger.info(f"Rate limiter backing off ({reason}): {self.rate:.2f} req/s")
+
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None) -> None:
+        """
+        Feeds one finished request back into the limiter.
+
+        Args:
+            status (Optional[int]): HTTP status, or None if the request raised.
+            latency (float): Seconds the request took.
+            retry_after (Optional[float]): Parsed Retry-After delay, if the server sent one.
+        """
+        self.in_flight = max(self.in_flight - 1, 0)
+        self.completed += 1
+        self.busy_time += latency
+
+        if retry_after is not None:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.retry_after_events += 1
+        if status is None or status in THROTTLE_STATUSES or status >= 500:
+            self._back_off(f"status {status}")
+            return
+
+        self._latency_avg = latency if self._latency_avg is None else 0.8 * self._latency_avg + 0.2 * latency
+        if self._latency_baseline is None or self._latency_avg < self._latency_baseline:
+            self._latency_baseline = self._latency_avg
+        if self._latency_avg > self.latency_factor * self._latency_baseline:
+            self._back_off(f"latency {self._latency_avg:.2f}s")
+        elif status == 200:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarizes the limiter state.
+
+        Returns:
+            dict: Current target rate, achieved crawl rate, backoff events and effective concurrency
+                  (average number of requests in flight, by Little's law).
+        """
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "target_rate": round(self.rate, 3),
+            "crawl_rate": round(self.completed / elapsed, 3),
+            "backoff_events": self.backoff_events,
+            "retry_after_events": self.retry_after_events,
+            "effective_concurrency": round(self.busy_time / elapsed, 2),
+            "peak_concurrency": self.peak_in_flight
+        }
@@ -0,0 +1,182 @@
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from page_parser import TITLE_FIELDS
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """
+    Hashes the crawled fields of a movie record, ignoring the crawl timestamp.
+
+    Args:
+        record (dict): Movie record.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    values = [str(record.get(field)) for field in TITLE_FIELDS]
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+
+
+def popularity(record: Dict[str, Any], today: Optional[datetime] = None) -> float:
+    """
+    Estimates how actively a title's page is edited, from its release year.
+
+    Recent releases gain votes, ratings and summaries quickly; catalog titles rarely change.
+
+    Args:
+        record (dict): Movie record with a movie_year field.
+        today (Optional[datetime]): Reference date. Defaults to now.
+
+    Returns:
+        float: Score in [0, 1], 1 for titles released this year or last.
+    """
+    try:
+        year = int(str(record.get("movie_year"))[:4])
+    except ValueError:
+        return 0.0
+    age = max((today or datetime.now()).year - year - 1, 0)
+    return 1.0 / (1.0 + age / 2.0)
+
+
+class RecrawlScheduler:
+    """
+    Assigns every crawled title a next-crawl time and picks a budgeted batch of due titles per run.
+
+    Each title keeps its own revisit interval: it is halved when a recrawl finds the record
+    changed and grown when it did not, within [min_interval_days, max_interval_days]. Popular
+    titles are revisited up to twice as often. State lives in SQLite so it survives the pipeline
+    deleting its per-run output folder.
+
+    Attributes:
+        path (Path): Location of the SQLite database.
+        budget (int): Maximum number of titles returned by `due` per run.
+        min_interval_days (float): Shortest revisit interval.
+        max_interval_days (float): Longest revisit interval.
+        initial_interval_days (float): Interval assigned to a newly crawled title.
+        changed (int): Records found new or changed in this run.
+        unchanged (int): Recrawled records found identical in this run.
+    """
+    def __init__(self, path: str,
+                 budget: int = 500,
+                 min_interval_days: float = 1,
+                 max_interval_days: float = 90,
+                 initial_interval_days: float = 7) -> None:
+
+        self.path = Path(path)
+        self.budget = budget
+        self.min_interval_days = min_interval_days
+        self.max_interval_days = max_interval_days
+        self.initial_interval_days = initial_interval_days
+        self.changed = 0
+        self.unchanged = 0
+
+        self._lock = threading.Lock()
+        # Records are observed from the crawler's writer thread
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS schedule ("
+                "tconst TEXT PRIMARY KEY, content_hash TEXT, interval_days REAL NOT NULL, "
+                "popularity REAL NOT NULL, last_crawled TEXT, last_changed TEXT, next_crawl TEXT NOT NULL, "
+                "crawls INTEGER NOT NULL DEFAULT 0, changes INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS schedule_next_crawl ON schedule (next_crawl)")
+
+    def due(self, exclude: Iterable[str] = (), now: Optional[datetime] = None) -> List[str]:
+        """
+        Picks the titles due for a recrawl, most overdue first, up to the budget.
+
+        Args:
+            exclude (Iterable[str]): Titles already scheduled for this run.
+            now (Optional[datetime]): Reference time. Defaults to now.
+
+        Returns:
+            List[str]: IMDb title IDs.
+        """
+        exclude = set(exclude)
+        now = (now or datetime.now()).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tconst FROM schedule WHERE next_crawl <= ? ORDER BY next_crawl LIMIT ?",
+                (now, self.budget + len(exclude))
+            )
+            return [tconst for (tconst,) in rows if tconst not in exclude][:self.budget]
+
+    def is_changed(self, record: Dict[str, Any]) -> bool:
+        """
+        Checks whether a record is new or differs from the last crawl of the title.
+
+        Args:
+            record (dict): Freshly crawled movie record.
+
+        Returns:
+            bool: True if the record should be written downstream.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM schedule WHERE tconst = ?", (record["tconst"],)).fetchone()
+        return row is None or row[0] != content_hash(record)
+
+    def observe(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Updates the schedule after a batch of records has been written.
+
+        Args:
+            records (List[dict]): Freshly crawled movie records.
+        """
+        now = datetime.now()
+        with self._lock, self._conn:
+            for record in records:
+                digest = content_hash(record)
+                row = self._conn.execute(
+                    "SELECT content_hash, interval_days, last_changed FROM schedule WHERE tconst = ?",
+                    (record["tconst"],)
+                ).fetchone()
+                if row is None:
+                    interval, changed, last_changed = self.initial_interval_days, True, now.isoformat()
+                else:
+                    changed = row[0] != digest
+                    # Revisit titles that change more often, back off from static ones
+                    interval = row[1] / 2 if changed else row[1] * 1.5
+                    interval = min(max(interval, self.min_interval_days), self.max_interval_days)
+                    last_changed = now.isoformat() if changed else row[2]
+                if changed:
+                    self.changed += 1
+                else:
+                    self.unchanged += 1
+                score = popularity(record, now)
+                next_crawl = now + timedelta(days=interval * (1 - 0.5 * score))
+                self._conn.execute(
+                    "INSERT INTO schedule (tconst, content_hash, interval_days, popularity, last_crawled, "
+                    "last_changed, next_crawl, crawls, changes) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?) "
+                    "ON CONFLICT(tconst) DO UPDATE SET content_hash = excluded.content_hash, "
+                    "interval_days = excluded.interval_days, popularity = excluded.popularity, "
+                    "last_crawled = excluded.last_crawled, last_changed = excluded.last_changed, "
+                    "next_crawl = excluded.next_crawl, crawls = crawls + 1, changes = changes + excluded.changes",
+                    (record["tconst"], digest, interval, score, now.isoformat(), last_changed,
+                     next_crawl.isoformat(), int(changed))
+                )
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Summarizes this run's recrawl outcome and the size of the schedule.
+
+        Returns:
+            dict: Changed and unchanged records, scheduled titles and titles currently due.
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            scheduled, due = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(next_crawl <= ?), 0) FROM schedule", (now,)
+            ).fetchone()
+        return {"changed": self.changed, "unchanged": self.unchanged, "scheduled": scheduled, "due": due}
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,148 @@
+import gzip
+import json
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+
+class ResponseCache:
+    """
+    On-disk cache of raw crawler responses.
+
+    Bodies are stored gzip-compressed and content-addressed by their SHA-256, so identical pages
+    share one blob. A small JSON entry per URL records the blob digest and the ETag and
+    Last-Modified validators used for conditional recrawls.
+
+    Layout:
+        <cache_dir>/blobs/<2-char prefix>/<sha256>.html.gz
+        <cache_dir>/entries/<2-char prefix>/<sha1 of url>.json
+
+    Attributes:
+        cache_dir (Path): Root directory of the cache.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups with no cached response.
+        revalidated (int): Conditional requests answered with 304 Not Modified.
+    """
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = Path(cache_dir)
+        (self.cache_dir / "blobs").mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / "entries").mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        # The crawler reads and writes from worker threads; guards the counters
+        self._lock = threading.Lock()
+
+    def _entry_path(self, url: str) -> Path:
+        """Returns the metadata entry path for a URL."""
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / "entries" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        """Returns the blob path for a content digest."""
+        return self.cache_dir / "blobs" / digest[:2] / f"{digest}.html.gz"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Writes a file through a temporary sibling so readers never see partial content."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def entry(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the cached metadata for a URL.
+
+        Args:
+            url (str): Requested URL.
+
+        Returns:
+            Optional[dict]: Entry with digest, etag, last_modified and fetched_at, or None.
+        """
+        path = self._entry_path(url)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.info(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Returns the cached body for a URL.
+
+        Args:
+            url (str): Requested URL.
+
+        Returns:
+            Optional[str]: Decoded HTML, or None on a miss.
+        """
+        entry = self.entry(url)
+        blob = self._blob_path(entry["digest"]) if entry else None
+        if blob is None or not blob.exists():
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return gzip.decompress(blob.read_bytes()).decode("utf-8")
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Builds If-None-Match / If-Modified-Since headers from the cached validators.
+
+        Args:
+            url (str): Requested URL.
+
+        Returns:
+            dict: Headers to send; empty if the URL is not cached.
+        """
+        entry = self.entry(url)
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Stores a response body and its validators.
+
+        Args:
+            url (str): Requested URL.
+            body (str): Response HTML.
+            etag (Optional[str]): ETag response header.
+            last_modified (Optional[str]): Last-Modified response header.
+        """
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            self._write_atomic(blob, gzip.compress(data, compresslevel=6))
+        entry = {
+            "url": url,
+            "digest": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().isoformat()
+        }
+        self._write_atomic(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Summarizes cache usage in this run.
+
+        Returns:
+            dict: Hit, miss and revalidation counts.
+        """
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
@@ -1,109 +1,179 @@
 import asyncio
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+import time
+from playwright.async_api import async_playwright, Route, TimeoutError as PlaywrightTimeoutError
 import re
 import csv
-from typing import Set
+from typing import List, Optional
 from pathlib import Path
-from config import URL, TSV_FILENAME, MAX_CLICKS
+from config import URL, TSV_FILENAME, MAX_CLICKS, SCRAPER_HEADLESS
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.utils.logger import logger
 
-async def extract_tt_codes(html: str) -> Set[str]:
+# Selectors for the result list and its "Show More" button.
+ITEM_SELECTOR = "li.ipc-metadata-list-summary-item"
+SHOW_MORE_SELECTOR = "button.ipc-see-more__button"
+
+# Resource types the scraper never needs; aborting them saves most of the page weight.
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# Matches the tt code in a title link.
+TT_CODE_PATTERN = re.compile(r"/title/(tt\d+)/")
+
+# Resolves once the result list holds more items than before the click. The list's live
+# `children` collection is read instead of querying every item again.
+LIST_GROWN_JS = """([selector, count]) => {
+    const first = document.querySelector(selector);
+    return first !== null && first.parentElement.children.length > count;
+}"""
+
+# Returns the title links of the list items from `offset` onwards, plus the new item count,
+# so each click only touches the items it added.
+NEW_LINKS_JS = """([selector, offset]) => {
+    const first = document.querySelector(selector);
+    if (first === null) {
+        return {count: 0, hrefs: []};
+    }
+    const items = first.parentElement.children;
+    const hrefs = [];
+    for (let i = offset; i < items.length; i++) {
+        const link = items[i].querySelector("a.ipc-title-link-wrapper[href]");
+        hrefs.push(link === null ? null : link.getAttribute("href"));
+    }
+    return {count: items.length, hrefs: hrefs};
+}"""
+
+
+async def block_heavy_resources(route: Route) -> None:
     """
-    Extracts IMDb tt codes from the provided HTML content.
+    Aborts image, font and media requests and lets everything else through.
 
     Args:
-        html (str): The HTML content of the IMDb page.
+        route (Route): The intercepted Playwright request route.
+    """
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+def extract_tt_codes(hrefs: List[Optional[str]]) -> List[str]:
+    """
+    Extracts IMDb tt codes from title link hrefs, keeping their order.
+
+    Args:
+        hrefs (list): Link hrefs of result items; None for items without a title link.
 
     Returns:
-        set: A set of unique tt codes extracted from the page.
+        list: The tt codes found.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    movie_list = soup.find_all("li", {"class": "ipc-metadata-list-summary-item"})
-
-    tt_codes = set()
-    for movie in movie_list:
-        link = movie.find("a", {"class": "ipc-title-link-wrapper", "href": True})
-        if link:
-            match = re.search(r"/title/(tt\d+)/", link["href"])
-            if match:
-                tt_codes.add(match.group(1))  # Extract tt_code
+    tt_codes = []
+    for href in hrefs:
+        match = TT_CODE_PATTERN.search(href) if href else None
+        if match:
+            tt_codes.append(match.group(1))  # Extract tt_code
     return tt_codes
 
 
-async def scrape_imdb_movie_codes() -> None:
+async def scrape_imdb_movie_codes(url: str = URL,
+                                  tsv_filename: str = TSV_FILENAME,
+                                  max_clicks: int = MAX_CLICKS,
+                                  headless: bool = SCRAPER_HEADLESS,
+                                  load_timeout: float = 30000) -> None:
     """
     Scrapes IMDb movie tt codes by navigating through the IMDb page and extracting tt codes.
     The extracted tt codes are saved to a TSV file.
 
+    Instead of fixed sleeps, the scraper waits for the result list to appear and, after each
+    click, for its item count to grow. Images, fonts and media are never downloaded. Only the
+    items added since the last click are read from the page, so the time per click stays flat
+    as the list grows, and new codes are flushed to the TSV as they arrive.
+
     Steps:
         1. Opens the IMDb URL using Playwright.
-        2. Extracts tt codes from the current page.
-        3. Saves new tt codes to a TSV file.
+        2. Extracts tt codes of the items added since the last read.
+        3. Appends new tt codes to a TSV file.
         4. Clicks the "Show More" button to load additional movies and repeats the process.
 
+    Args:
+        url (str): Search results URL; a local fixture page can be passed for testing.
+        tsv_filename (str): Output TSV of tt codes.
+        max_clicks (int): Maximum number of "Show More" clicks.
+        headless (bool): Run the browser without a window.
+        load_timeout (float): Milliseconds to wait for results to appear after a load or click.
+
     Raises:
         Exception: If any error occurs during the scraping process.
     """
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)  # Set to True for headless mode
+        browser = await p.chromium.launch(headless=headless)
         page = await browser.new_page()
+        await page.route("**/*", block_heavy_resources)
 
-        # Load IMDb page
-        logger.info(f"Opening {URL}")
-        await page.goto(URL, timeout=120000)
-        await asyncio.sleep(5)  # Wait for initial page load
+        # Load IMDb page and wait for the first results
+        logger.info(f"Opening {url}")
+        start = time.perf_counter()
+        await page.goto(url, wait_until="domcontentloaded", timeout=120000)
+        await page.wait_for_selector(ITEM_SELECTOR, timeout=load_timeout)
+        logger.info(f"Initial page loaded in {time.perf_counter() - start:.2f}s")
 
         saved_codes = set()
 
         # Load existing codes from CSV
-        if Path(TSV_FILENAME).exists():
-            with open(TSV_FILENAME, "r", newline="") as file:
+        if Path(tsv_filename).exists():
+            with open(tsv_filename, "r", newline="") as file:
                 reader = csv.reader(file, delimiter="\t")
                 next(reader, None)
                 saved_codes.update(row[0] for row in reader)
 
-        # Open CSV for writing
-        with open(TSV_FILENAME, "w", newline="") as file:
+        # Open CSV for appending, so codes saved by an interrupted run are kept
+        write_header = not saved_codes
+        with open(tsv_filename, "a" if saved_codes else "w", newline="") as file:
             writer = csv.writer(file, delimiter="\t")
-            writer.writerow(["tconst"])
+            if write_header:
+                writer.writerow(["tconst"])
 
             click_attempts = 0
+            offset = 0
 
-            while click_attempts < MAX_CLICKS:
+            while click_attempts < max_clicks:
                 logger.info(f"Scraping Page {click_attempts + 1}...")
+                page_start = time.perf_counter()
 
-                # Extract tt_codes from the current page
-                html = await page.content()
-                new_tt_codes = await extract_tt_codes(html)
+                # Extract tt_codes of the items added since the last read
+                new_links = await page.evaluate(NEW_LINKS_JS, [ITEM_SELECTOR, offset])
+                offset = new_links["count"]
 
                 # Save only new tt_codes
-                unique_tt_codes = new_tt_codes - saved_codes
+                unique_tt_codes = [code for code in dict.fromkeys(extract_tt_codes(new_links["hrefs"])) if code not in saved_codes]
                 if unique_tt_codes:
                     for code in unique_tt_codes:
                         writer.writerow([code])
                         saved_codes.add(code)
+                    file.flush()
                     logger.info(f"Saved {len(unique_tt_codes)} new tt_codes to CSV.")
 
                 # Try clicking "Show More" button
                 try:
-                    show_more_button = await page.wait_for_selector("button.ipc-see-more__button", timeout=5000)
+                    show_more_button = await page.wait_for_selector(SHOW_MORE_SELECTOR, timeout=5000)
                     if show_more_button:
                         logger.info("Clicking 'Show More' button...")
                         await show_more_button.scroll_into_view_if_needed()
-                        await asyncio.sleep(1)  # Small delay before clicking
                         await show_more_button.click()
-                        await asyncio.sleep(5)  # Wait for more movies to load
+                        # Wait until the new movies are in the DOM rather than for a fixed time
+                        await page.wait_for_function(LIST_GROWN_JS, arg=[ITEM_SELECTOR, offset], timeout=load_timeout)
                     else:
                         logger.info("No more 'Show More' button found. Stopping scrape.")
                         break
-                except:
-                    logger.info("No more 'Show More' button detected.")
+                except PlaywrightTimeoutError:
+                    logger.info("No more 'Show More' button detected or no new movies loaded.")
+                    break
+                except Exception as e:
+                    logger.info(f"Stopping scrape after 'Show More' failed: {e}")
                     break
+                finally:
+                    logger.info(f"Page {click_attempts + 1} took {time.perf_counter() - page_start:.2f}s")
 
                 click_attempts += 1
 
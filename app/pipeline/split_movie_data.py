@@ -1,20 +1,143 @@
+import time
 import pandas as pd
-from config import MOVIE_METADATA_FILE, MOVIE_SYNOPSIS_FILE, CLEANED_OUTPUT_FILE
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Iterator, List, Optional, Tuple
+from config import MOVIE_METADATA_FILE, MOVIE_SYNOPSIS_FILE, CLEANED_OUTPUT_FILE, CLEAN_CHUNK_SIZE, EXCEL_EXPORT
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.utils.logger import logger
 
-def split_movie_xlsx(input_csv=None, output_dir="imdb_data"):
+# Columns of the metadata file
+METADATA_COLUMNS = [
+    'tconst',          # Unique identifier for the movie
+    'movie_title',     # Title of the movie
+    'movie_year',      # Release year of the movie
+    'age_rating',      # Age rating of the movie
+    'duration',        # Duration of the movie
+    'imdb_rating',     # IMDb rating of the movie
+    'top_5_actors',    # List of top 5 actors in the movie
+    'poster_url'       # URL of the movie's poster
+]
+
+# Columns of the synopsis file
+SYNOPSIS_COLUMNS = [
+    'tconst',          # Unique identifier for the movie
+    'genres',          # List of genres associated with the movie
+    'short_synopsis',  # Short synopsis of the movie
+    'summaries',       # List of summaries for the movie
+    'long_synopsis'    # Detailed synopsis of the movie
+]
+
+# Every column is text: year and rating may hold the crawler's "not found" placeholders, and the
+# list columns keep the crawler's Python list notation, which the downstream stages parse.
+METADATA_SCHEMA = pa.schema([(column, pa.string()) for column in METADATA_COLUMNS])
+SYNOPSIS_SCHEMA = pa.schema([(column, pa.string()) for column in SYNOPSIS_COLUMNS])
+
+
+def is_excel(path: str) -> bool:
+    """
+    Checks whether a file name denotes an Excel workbook rather than Parquet.
+
+    Args:
+        path (str): File path or name.
+
+    Returns:
+        bool: True for .xlsx files.
+    """
+    return str(path).lower().endswith(".xlsx")
+
+
+def read_table(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Reads a metadata or synopsis file written by `split_movie_xlsx`.
+
+    Args:
+        path (str): Parquet file, or an .xlsx workbook from an older run or Excel configuration.
+        columns (Optional[list]): Columns to read. Default is all.
+
+    Returns:
+        pd.DataFrame: The file contents.
+    """
+    if is_excel(path):
+        df = pd.read_excel(path, engine='openpyxl')
+        return df[columns] if columns else df
+    return pd.read_parquet(path, columns=columns)
+
+
+def iter_table(path: str, num_rows: int) -> Iterator[pd.DataFrame]:
     """
-    Splits an XLSX file containing movie data into two separate files:
+    Reads a metadata or synopsis file in consecutive slices of `num_rows` rows; the last may be shorter.
+
+    Parquet files are streamed in record batches, so only about one slice is held in memory at a
+    time. An .xlsx workbook is read whole and then sliced.
+
+    Args:
+        path (str): Parquet file or .xlsx workbook.
+        num_rows (int): Rows per slice.
+
+    Yields:
+        pd.DataFrame: The next slice of the file.
+    """
+    if is_excel(path):
+        df = read_table(path)
+        for start in range(0, len(df), num_rows):
+            yield df.iloc[start:start + num_rows]
+        return
+
+    # Record batches stop at row group boundaries, so they are regrouped into exact slices
+    batches: List[pa.RecordBatch] = []
+    buffered = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=num_rows):
+        batches.append(batch)
+        buffered += batch.num_rows
+        while buffered >= num_rows:
+            table = pa.Table.from_batches(batches)
+            yield table.slice(0, num_rows).to_pandas()
+            rest = table.slice(num_rows)
+            batches, buffered = rest.to_batches(), rest.num_rows
+    if buffered:
+        yield pa.Table.from_batches(batches).to_pandas()
+
+
+def _write_file(df: pd.DataFrame, path: str, schema: pa.Schema) -> None:
+    """
+    Writes a DataFrame as Parquet or, for .xlsx paths, as an Excel workbook, through a temporary file.
+
+    Args:
+        df (pd.DataFrame): Data to write.
+        path (str): Output path.
+        schema (pa.Schema): Parquet schema of the data.
+    """
+    # Keep the extension last, pandas picks the Excel writer by it
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+    if is_excel(path):
+        df.to_excel(tmp_path, index=False, engine='openpyxl')
+    else:
+        pq.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def split_movie_xlsx(input_csv: str = None, output_dir: str = "imdb_data",
+                     chunk_size: int = CLEAN_CHUNK_SIZE, excel_export: bool = EXCEL_EXPORT) -> Tuple[str, str]:
+    """
+    Splits the cleaned movie CSV into two separate files:
     one for metadata and another for synopsis.
 
+    Both files are Parquet with the all-text METADATA_SCHEMA and SYNOPSIS_SCHEMA, written in chunks of
+    `chunk_size` rows so memory stays flat. If a configured file name ends in .xlsx it is written as
+    an Excel workbook instead. With `excel_export`, an .xlsx copy of each Parquet file is also written
+    next to it for people to open; nothing in the pipeline reads it.
+
     Args:
         input_csv (str): Path to the input CSV file containing movie data.
         output_dir (str): Directory where the output files will be saved.
                           Defaults to "imdb_data".
+        chunk_size (int): Number of rows read from the CSV at a time. Default is CLEAN_CHUNK_SIZE.
+        excel_export (bool): Also write human-facing .xlsx copies. Default is EXCEL_EXPORT.
 
     Returns:
         tuple: A tuple containing the paths to the metadata and synopsis files.
@@ -22,47 +145,43 @@ def split_movie_xlsx(input_csv=None, output_dir="imdb_data"):
     """
     if input_csv is None:
         input_csv = f"{output_dir}/{CLEANED_OUTPUT_FILE}"
-    # Read the input CSV file into a DataFrame
-    df = pd.read_csv(input_csv)
-
-    # Define the columns to be included in the metadata file
-    metadata_cols = [
-        'tconst',          # Unique identifier for the movie
-        'movie_title',     # Title of the movie
-        'movie_year',      # Release year of the movie
-        'age_rating',      # Age rating of the movie
-        'duration',        # Duration of the movie
-        'imdb_rating',     # IMDb rating of the movie
-        'top_5_actors',    # List of top 5 actors in the movie
-        'poster_url'       # URL of the movie's poster
-    ]
-
-    # Define the columns to be included in the synopsis file
-    synopsis_cols = [
-        'tconst',          # Unique identifier for the movie
-        'genres',          # List of genres associated with the movie
-        'short_synopsis',  # Short synopsis of the movie
-        'summaries',       # List of summaries for the movie
-        'long_synopsis'    # Detailed synopsis of the movie
-    ]
-
-    # Create separate DataFrames for metadata and synopsis
-    metadata_df = df[metadata_cols].copy()
-    synopsis_df = df[synopsis_cols].copy()
 
     # Define the output file paths
     metadata_path = f"{output_dir}/{MOVIE_METADATA_FILE}"
     synopsis_path = f"{output_dir}/{MOVIE_SYNOPSIS_FILE}"
+    outputs = [(metadata_path, METADATA_SCHEMA), (synopsis_path, SYNOPSIS_SCHEMA)]
 
-    # Save the metadata DataFrame to an Excel file
-    metadata_df.to_excel(metadata_path, index=False)
-
-    # Save the synopsis DataFrame to a CSV file
-    synopsis_df.to_excel(synopsis_path, index=False)
+    start = time.perf_counter()
+    if any(is_excel(path) for path, _ in outputs):
+        # Excel cannot be appended to, so the whole file is loaded
+        df = pd.read_csv(input_csv, dtype=str)
+        for path, schema in outputs:
+            _write_file(df[schema.names], path, schema)
+    else:
+        # Stream the CSV into both Parquet files; each is renamed into place once complete
+        writers = [pq.ParquetWriter(f"{path}.tmp", schema) for path, schema in outputs]
+        try:
+            for df in pd.read_csv(input_csv, chunksize=chunk_size, dtype=str):
+                for writer, (_, schema) in zip(writers, outputs):
+                    writer.write_table(pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False))
+        finally:
+            for writer in writers:
+                writer.close()
+        for path, _ in outputs:
+            os.replace(f"{path}.tmp", path)
 
     # Log the paths of the saved files
     logger.info(f"- Saved metadata to: {metadata_path}")
     logger.info(f"- Saved synopsis to: {synopsis_path}")
+    logger.info(f"- Split written in {time.perf_counter() - start:.1f}s")
+
+    if excel_export:
+        for path, schema in outputs:
+            if not is_excel(path):
+                export_path = f"{os.path.splitext(path)[0]}.xlsx"
+                _write_file(read_table(path), export_path, schema)
+                logger.info(f"- Exported {export_path}")
 
     # Return the paths of the saved files
-    return metadata_path, synopsis_path
\ No newline at end of file
+    return metadata_path, synopsis_path
+
@@ -0,0 +1,181 @@
+import time
+import cProfile
+import pstats
+import zipfile
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+# Profilers a stage can be run under; pyinstrument is optional and not in requirements.txt.
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident memory of the current process so far.
+
+    Returns:
+        Optional[float]: Peak RSS in MB, or None where the resource module is unavailable.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def count_rows(path: Path) -> int:
+    """
+    Counts the records in a pipeline file.
+
+    Parquet row counts come from the file footer. CSV and TSV files count their lines minus
+    the header, so a quoted field spanning lines counts more than once. ZIP archives count
+    their files. Other files count as one record.
+
+    Args:
+        path (Path): File to count.
+
+    Returns:
+        int: Number of records.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    if suffix in (".csv", ".tsv"):
+        lines = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                lines += block.count(b"\n")
+        return max(lines - 1, 0)
+    if suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            return sum(not info.is_dir() for info in archive.infolist())
+    return 1
+
+
+def path_stats(paths: Iterable[str]) -> Dict[str, int]:
+    """
+    Totals the records and bytes of files and directories; missing paths count as empty.
+
+    Args:
+        paths (Iterable[str]): Stage inputs or outputs.
+
+    Returns:
+        dict: Number of records and bytes.
+    """
+    rows = size = 0
+    for path in map(Path, paths):
+        if path.is_file():
+            files = [path]
+        elif path.is_dir():
+            files = [p for p in path.rglob("*") if p.is_file()]
+        else:
+            files = []
+        for file in files:
+            try:
+                rows += count_rows(file)
+            except Exception as e:
+                logger.info(f"- Could not count rows of {file}: {e}")
+            size += file.stat().st_size
+    return {"rows": rows, "bytes": size}
+
+
+def run_profiled(run: Callable[..., Any], kwargs: Dict[str, Any], executor: str = "thread",
+                 profiler: Optional[str] = None, profile_base: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Runs a stage function and measures it where it executes.
+
+    CPU time is that of the calling thread for "thread" stages, and of the whole worker process for
+    "process" stages, where it includes threads the stage starts. Peak RSS is the high-water mark
+    of the executing process, which for thread stages is shared with everything else in the run.
+    With a profiler, its output is written next to `profile_base`: a pstats file `.prof` for
+    "cprofile", an HTML report `.html` for "pyinstrument".
+
+    Args:
+        run (Callable): Stage function; module-level so process stages can pickle it.
+        kwargs (dict): Keyword arguments passed to `run`.
+        executor (str): "thread" or "process".
+        profiler (Optional[str]): One of PROFILERS, or None to only time the stage.
+        profile_base (Optional[str]): Path of the profile without its extension.
+
+    Returns:
+        tuple: The stage's return value and its measurements.
+    """
+    cpu_clock = time.process_time if executor == "process" else time.thread_time
+    profile = None
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            profile = Profiler()
+        except ImportError:
+            logger.info("- pyinstrument is not installed, profiling with cProfile instead")
+            profiler = "cprofile"
+    if profiler == "cprofile":
+        profile = cProfile.Profile()
+
+    wall_start, cpu_start = time.perf_counter(), cpu_clock()
+    if profile is not None:
+        try:
+            if profiler == "pyinstrument":
+                profile.start()
+            else:
+                profile.enable()
+        except (RuntimeError, ValueError) as e:
+            # Another profiler is already active in this process, e.g. on a concurrent stage
+            logger.info(f"- Profiling disabled for this stage: {e}")
+            profile = None
+    try:
+        result = run(**kwargs)
+    finally:
+        if profile is not None:
+            if profiler == "pyinstrument":
+                profile.stop()
+            else:
+                profile.disable()
+    metrics: Dict[str, Any] = {
+        "wall_s": round(time.perf_counter() - wall_start, 3),
+        "cpu_s": round(cpu_clock() - cpu_start, 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+    if profile is not None and profile_base:
+        os.makedirs(os.path.dirname(profile_base) or ".", exist_ok=True)
+        if profiler == "pyinstrument":
+            profile_path = f"{profile_base}.html"
+            Path(profile_path).write_text(profile.output_html(), encoding="utf-8")
+        else:
+            profile_path = f"{profile_base}.prof"
+            profile.dump_stats(profile_path)
+        metrics["profile"] = profile_path
+    return result, metrics
+
+
+def top_functions(profile_path: str, limit: int = 5) -> str:
+    """
+    Lists the functions that spent the most time in their own code in a cProfile dump.
+
+    Args:
+        profile_path (str): File written by `run_profiled` with the "cprofile" profiler.
+        limit (int): Number of functions to list.
+
+    Returns:
+        str: One "file:line(function) seconds" entry per function, comma separated.
+    """
+    stats = pstats.Stats(profile_path).sort_stats("tottime")
+    entries = []
+    for func in stats.fcn_list[:limit]:
+        filename, line, name = func
+        own_time = stats.stats[func][2]
+        entries.append(f"{os.path.basename(filename)}:{line}({name}) {own_time:.2f}s")
+    return ", ".join(entries)
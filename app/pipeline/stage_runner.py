@@ -0,0 +1,466 @@
+import json
+import time
+import multiprocessing
+import hashlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from stage_profiler import PROFILERS, path_stats, run_profiled, top_functions
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+# Stage outcomes reported by the runner.
+RAN = "ran"
+SKIPPED = "skipped"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+# Where a stage executes: a thread for I/O-bound work, a process for CPU-bound work.
+EXECUTORS = ("thread", "process")
+
+
+class Stage:
+    """
+    A pipeline step with declared inputs, outputs and parameters.
+
+    Attributes:
+        name (str): Unique stage name, also used on the command line.
+        run (Callable): Function executing the stage; must be a module-level function for "process" stages.
+        kwargs (dict): Keyword arguments passed to `run`.
+        inputs (list): Files or directories the stage reads.
+        outputs (list): Files or directories the stage writes; empty for remote-only effects.
+        params (dict): Settings that change the stage's result.
+        sources (list): Code files whose changes should rerun the stage.
+        after (list): Stages that must run first even without a file dependency.
+        executor (str): "thread" or "process".
+        branch (Optional[str]): Label grouping stages for the timing report.
+        always_run (bool): Run the stage every time, for stages that find their own work in state
+            the runner cannot see, e.g. titles the recrawl scheduler has due.
+    """
+    def __init__(self, name: str,
+                 run: Callable[..., Any],
+                 kwargs: Optional[Dict[str, Any]] = None,
+                 inputs: Iterable[str] = (),
+                 outputs: Iterable[str] = (),
+                 params: Optional[Dict[str, Any]] = None,
+                 sources: Iterable[str] = (),
+                 after: Iterable[str] = (),
+                 executor: str = "thread",
+                 branch: Optional[str] = None,
+                 always_run: bool = False) -> None:
+
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {EXECUTORS}")
+        self.name = name
+        self.run = run
+        self.kwargs = kwargs or {}
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.sources = list(sources)
+        self.after = list(after)
+        self.executor = executor
+        self.branch = branch
+        self.always_run = always_run
+
+
+class StageRunner:
+    """
+    Runs stages as their dependencies complete and skips those whose inputs have not changed.
+
+    A stage's fingerprint covers its parameters and the contents of its inputs and sources.
+    It is skipped when the fingerprint matches the one recorded after its last successful run
+    and all of its outputs still exist. Since an upstream stage that produces new output changes
+    its dependents' inputs, only the affected part of the graph reruns.
+
+    Attributes:
+        stages (dict): Stages by name, in dependency order.
+        deps (dict): Names of the stages each stage depends on.
+        work_dir (Path): Directory holding intermediate artifacts and the runner state.
+        state_path (Path): JSON file recording fingerprints and timings per stage.
+        max_workers (int): Maximum number of thread stages running at once.
+        profiler (Optional[str]): Profiler every executed stage runs under, one of PROFILERS, or None.
+        report_dir (Path): Directory receiving a JSON report, and any profiles, per run.
+        last_summary (dict): Timings of the last run.
+        last_report (dict): Report of the last run.
+    """
+    def __init__(self, stages: List[Stage], work_dir: str, state_file: str = "stages.json", max_workers: int = 4,
+                 profiler: Optional[str] = None, report_dir: Optional[str] = None) -> None:
+        if profiler and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.work_dir / state_file
+        self.deps = self._dependencies(stages)
+        self.stages = {stage.name: stage for stage in self._order(stages, self.deps)}
+        self.state = self._load_state()
+        self.max_workers = max_workers
+        self.profiler = profiler or None
+        self.report_dir = Path(report_dir) if report_dir else self.work_dir / "reports"
+        self.last_summary: Dict[str, Any] = {}
+        self.last_report: Dict[str, Any] = {}
+
+    @staticmethod
+    def _dependencies(stages: List[Stage]) -> Dict[str, set]:
+        """
+        Derives each stage's dependencies from the producers of its inputs and its `after` stages.
+
+        Args:
+            stages (list): Stages in declaration order.
+
+        Returns:
+            dict: Set of dependency names per stage.
+        """
+        producers = {output: stage.name for stage in stages for output in stage.outputs}
+        return {
+            stage.name: {producers[i] for i in stage.inputs if i in producers} | set(stage.after)
+            for stage in stages
+        }
+
+    @staticmethod
+    def _order(stages: List[Stage], deps: Dict[str, set]) -> List[Stage]:
+        """
+        Sorts stages so every stage comes after the producers of its inputs and its `after` stages.
+
+        Args:
+            stages (list): Stages in declaration order.
+            deps (dict): Set of dependency names per stage.
+
+        Returns:
+            list: Stages in dependency order.
+
+        Raises:
+            ValueError: If the dependencies form a cycle.
+        """
+        ordered: List[Stage] = []
+        done = set()
+        while len(ordered) < len(stages):
+            ready = [s for s in stages if s.name not in done and deps[s.name] <= done]
+            if not ready:
+                raise ValueError("Pipeline stages have a dependency cycle")
+            ordered.extend(ready)
+            done.update(s.name for s in ready)
+        return ordered
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Reads the runner state, starting fresh if it is missing or unreadable."""
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"stages": {}, "files": {}}
+
+    def _save_state(self) -> None:
+        """Writes the runner state atomically."""
+        tmp_path = self.state_path.with_name(f"{self.state_path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+    def _file_hash(self, path: Path) -> str:
+        """
+        Hashes a file, reusing the recorded digest while its size and modification time are unchanged.
+
+        Args:
+            path (Path): File to hash.
+
+        Returns:
+            str: SHA-256 hex digest.
+        """
+        stat = path.stat()
+        cached = self.state["files"].get(str(path))
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.state["files"][str(path)] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def _path_hash(self, path: str) -> str:
+        """Hashes a file or every file below a directory; missing paths hash to a marker."""
+        target = Path(path)
+        if target.is_file():
+            return self._file_hash(target)
+        if target.is_dir():
+            digest = hashlib.sha256()
+            for file in sorted(p for p in target.rglob("*") if p.is_file()):
+                digest.update(f"{file.relative_to(target)}:{self._file_hash(file)}".encode("utf-8"))
+            return digest.hexdigest()
+        return "missing"
+
+    def fingerprint(self, stage: Stage) -> str:
+        """
+        Computes a stage's fingerprint from its parameters, inputs and sources.
+
+        Args:
+            stage (Stage): The stage.
+
+        Returns:
+            str: SHA-256 hex digest.
+        """
+        parts = {
+            "params": stage.params,
+            "inputs": {path: self._path_hash(path) for path in stage.inputs},
+            "sources": {path: self._path_hash(path) for path in stage.sources},
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def is_up_to_date(self, stage: Stage) -> bool:
+        """
+        Checks whether a stage's last successful run still matches its inputs.
+
+        Args:
+            stage (Stage): The stage.
+
+        Returns:
+            bool: True if the stage can be skipped.
+        """
+        if stage.always_run:
+            return False
+        recorded = self.state["stages"].get(stage.name, {}).get("fingerprint")
+        outputs_exist = all(Path(path).exists() for path in stage.outputs)
+        return outputs_exist and recorded == self.fingerprint(stage)
+
+    def _summarize(self, timings: Dict[str, tuple], wall_time: float) -> Dict[str, Any]:
+        """
+        Reports per-stage, per-branch and critical-path timings of a run.
+
+        The critical path is the chain of dependent stages with the largest total duration,
+        i.e. the shortest wall-clock time the run could have taken with unlimited parallelism.
+
+        Args:
+            timings (dict): (start, end) offsets in seconds per executed stage.
+            wall_time (float): Total seconds the run took.
+
+        Returns:
+            dict: Stage durations, branch durations and spans, critical path and wall time.
+        """
+        durations = {name: end - start for name, (start, end) in timings.items()}
+        path_time: Dict[str, float] = {}
+        path_prev: Dict[str, Optional[str]] = {}
+        for name in self.stages:
+            prev = max((d for d in self.deps[name] if d in path_time), key=path_time.get, default=None)
+            path_time[name] = durations.get(name, 0.0) + (path_time[prev] if prev else 0.0)
+            path_prev[name] = prev
+        last = max(path_time, key=path_time.get, default=None)
+        critical_path = []
+        while last:
+            critical_path.insert(0, last)
+            last = path_prev[last]
+
+        branches: Dict[str, Dict[str, float]] = {}
+        for name, (start, end) in timings.items():
+            branch = self.stages[name].branch
+            if branch:
+                info = branches.setdefault(branch, {"busy": 0.0, "start": start, "end": end})
+                info["busy"] += end - start
+                info["start"], info["end"] = min(info["start"], start), max(info["end"], end)
+        return {
+            "stages": {name: round(d, 2) for name, d in durations.items()},
+            "branches": {b: {"busy": round(i["busy"], 2), "span": round(i["end"] - i["start"], 2)} for b, i in branches.items()},
+            "critical_path": [name for name in critical_path if name in durations],
+            "critical_path_time": round(max(path_time.values(), default=0.0), 2),
+            "sequential_time": round(sum(durations.values()), 2),
+            "wall_time": round(wall_time, 2)
+        }
+
+    def _measure(self, stage: Stage, metrics: Dict[str, Any], inputs: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Completes the measurements taken inside a stage with its input and output sizes.
+
+        Args:
+            stage (Stage): The stage that ran.
+            metrics (dict): Wall and CPU time, peak RSS and profile path from `run_profiled`.
+            inputs (dict): Records and bytes of the stage's inputs when it started.
+
+        Returns:
+            dict: The stage's entry in the run report.
+        """
+        outputs = path_stats(stage.outputs)
+        # Throughput counts what the stage produced, or what it consumed for remote-only stages
+        items = outputs["rows"] or inputs["rows"]
+        return {
+            **metrics,
+            "rows_in": inputs["rows"],
+            "rows_out": outputs["rows"],
+            "bytes_in": inputs["bytes"],
+            "bytes_out": outputs["bytes"],
+            "items_per_s": round(items / max(metrics["wall_s"], 1e-9), 1),
+            "previous_wall_s": self.state["stages"].get(stage.name, {}).get("wall_s")
+        }
+
+    def _write_report(self, run_id: str, results: Dict[str, str], measurements: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Writes the run report to `report_dir` and logs a line per executed stage.
+
+        Args:
+            run_id (str): Timestamp identifying the run.
+            results (dict): Outcome per stage.
+            measurements (dict): Report entry per executed stage.
+
+        Returns:
+            dict: The report.
+        """
+        report = {
+            "run_id": run_id,
+            "finished_at": datetime.now().isoformat(),
+            "profiler": self.profiler,
+            "results": results,
+            "stages": measurements,
+            "summary": self.last_summary
+        }
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        report_path = self.report_dir / f"run-{run_id}.json"
+        tmp_path = report_path.with_name(f"{report_path.name}.tmp")
+        tmp_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        os.replace(tmp_path, report_path)
+
+        for name, m in measurements.items():
+            if results.get(name) != RAN:
+                continue
+            previous = m["previous_wall_s"]
+            change = f", {(m['wall_s'] / previous - 1) * 100:+.0f}% vs last run" if previous else ""
+            logger.info(f"- {name}: {m['wall_s']:.2f}s wall, {m['cpu_s']:.2f}s CPU, peak RSS {m['peak_rss_mb']} MB, "
+                        f"{m['rows_in']} -> {m['rows_out']} rows, {m['bytes_in']} -> {m['bytes_out']} bytes, "
+                        f"{m['items_per_s']} items/s{change}")
+            if str(m.get("profile", "")).endswith(".prof"):
+                logger.info(f"  {name} hot spots: {top_functions(m['profile'])}")
+        logger.info(f"- Run report written to {report_path}")
+        return report
+
+    def run(self, only: Optional[List[str]] = None, refresh: Iterable[str] = ()) -> Dict[str, str]:
+        """
+        Runs the pipeline, or only the named stages, as soon as their dependencies are done.
+
+        Independent stages run concurrently: "thread" stages on a thread pool, "process" stages
+        (CPU-bound work such as embedding) on a process pool. When a stage fails, its dependents
+        are not started, independent stages still finish, and the first error is re-raised once
+        nothing is running. Timings are kept in `last_summary`.
+
+        Every executed stage is measured (wall and CPU time, peak RSS, records and bytes in and
+        out, throughput) and, if `profiler` is set, profiled. The measurements are written to
+        `report_dir/run-<run_id>.json`, kept in `last_report` and summarized in the log, next to
+        each stage's wall time in its previous run so regressions stand out.
+
+        Stages depending on the outside world (e.g. scraping IMDb) are only rerun when their
+        parameters change or they are listed in `refresh`; their dependents then rerun if the
+        refreshed stage produced different output.
+
+        Args:
+            only (Optional[list]): Names of the stages to run; all stages if None.
+            refresh (Iterable[str]): Names of stages to run even if they are up to date.
+
+        Returns:
+            dict: RAN, SKIPPED or BLOCKED per stage that was considered.
+
+        Raises:
+            KeyError: If a requested stage does not exist.
+            Exception: The first error raised by a stage, after all other work has settled.
+        """
+        refresh = set(refresh)
+        unknown = (set(only or ()) | refresh) - set(self.stages)
+        if unknown:
+            raise KeyError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        selected = [name for name in self.stages if only is None or name in only]
+        waiting = list(selected)
+        results: Dict[str, str] = {}
+        timings: Dict[str, tuple] = {}
+        errors: List[BaseException] = []
+        running: Dict[Future, tuple] = {}
+        measurements: Dict[str, Dict[str, Any]] = {}
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        started = time.perf_counter()
+
+        threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        processes: Optional[ProcessPoolExecutor] = None
+        try:
+            while waiting or running:
+                # Start or skip every stage whose dependencies have settled
+                progress = True
+                while progress:
+                    progress = False
+                    for name in list(waiting):
+                        deps = self.deps[name] & set(selected)
+                        if any(results.get(d) in (FAILED, BLOCKED) for d in deps):
+                            results[name] = BLOCKED
+                        elif not all(results.get(d) in (RAN, SKIPPED) for d in deps):
+                            continue
+                        else:
+                            stage = self.stages[name]
+                            if name not in refresh and self.is_up_to_date(stage):
+                                logger.info(f"- Stage '{name}' is up to date, skipping.")
+                                results[name] = SKIPPED
+                            else:
+                                logger.info(f"- Stage '{name}' running...")
+                                # Fingerprint before running, so inputs changed mid-run are picked up next time
+                                fingerprint = self.fingerprint(stage)
+                                inputs = path_stats(stage.inputs)
+                                profile_base = str(self.report_dir / run_id / name) if self.profiler else None
+                                task = (run_profiled, stage.run, stage.kwargs, stage.executor, self.profiler, profile_base)
+                                if stage.executor == "process":
+                                    # Spawn, so the child does not inherit locks held by running thread stages
+                                    processes = processes or ProcessPoolExecutor(
+                                        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                                    )
+                                    future = processes.submit(*task)
+                                else:
+                                    future = threads.submit(*task)
+                                running[future] = (name, fingerprint, time.perf_counter() - started, inputs)
+                        waiting.remove(name)
+                        progress = True
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, fingerprint, start, inputs = running.pop(future)
+                    end = time.perf_counter() - started
+                    timings[name] = (start, end)
+                    error = future.exception()
+                    if error is not None:
+                        logger.info(f"- Stage '{name}' failed after {end - start:.2f}s: {error}")
+                        results[name] = FAILED
+                        errors.append(error)
+                        measurements[name] = {"wall_s": round(end - start, 3), "error": str(error)}
+                        continue
+                    _, metrics = future.result()
+                    measurements[name] = self._measure(self.stages[name], metrics, inputs)
+                    self.state["stages"][name] = {
+                        "fingerprint": fingerprint,
+                        "finished_at": datetime.now().isoformat(),
+                        "duration": round(end - start, 2),
+                        "wall_s": metrics["wall_s"]
+                    }
+                    self._save_state()
+                    results[name] = RAN
+                    logger.info(f"- Stage '{name}' finished in {end - start:.2f}s")
+        finally:
+            threads.shutdown()
+            if processes:
+                processes.shutdown()
+
+        self.last_summary = self._summarize(timings, time.perf_counter() - started)
+        logger.info(f"- Stage timings: {self.last_summary}")
+        self.last_report = self._write_report(run_id, results, measurements)
+        blocked = [name for name, result in results.items() if result == BLOCKED]
+        if blocked:
+            logger.info(f"- Stage(s) not run because a dependency failed: {', '.join(blocked)}")
+        if errors:
+            raise errors[0]
+        return results
+
+    def status(self) -> Dict[str, str]:
+        """
+        Reports for every stage whether it would run or be skipped.
+
+        Returns:
+            dict: "up to date", "stale" or "always runs" per stage, in dependency order.
+        """
+        return {
+            name: "always runs" if stage.always_run else "up to date" if self.is_up_to_date(stage) else "stale"
+            for name, stage in self.stages.items()
+        }
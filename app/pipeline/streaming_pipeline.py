@@ -0,0 +1,229 @@
+import time
+import queue
+import asyncio
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from config import (STREAM_OUTPUT_DIR, STREAM_PART_SIZE, STREAM_FLUSH_SECONDS, STREAM_BATCH_SIZE, STREAM_QUEUE_SIZE,
+                    PIPELINE_WORK_DIR, DEDUP_SCOPE, DEDUP_THRESHOLD)
+from extract_movie_data import run_crawler
+from clean_synopsis import clean_record
+from split_movie_data import SYNOPSIS_COLUMNS
+from dedup import deduplicate_documents
+from chunk_and_embed import (SentenceTransformer, MANIFEST_DIR, build_documents, build_movie_vectors,
+                             _part_path, _write_shard, _record_shard)
+from chunk_archive import build_archive
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.utils.logger import logger
+
+
+class StreamingIndexer:
+    """
+    Cleans, chunks and embeds crawled movies as they arrive and publishes them as rolling archive parts.
+
+    The crawler puts each written batch on `queue`. Cleaned movies collect into a part that is
+    embedded and published once it holds `part_size` movies or its oldest movie has waited
+    `flush_seconds`. Every part is written atomically like a chunk-and-embed shard, then published
+    as an archive with a manifest under a unique name, so the ETL can index it while the crawl continues.
+    At most `queue_size` crawled batches and one part are held in memory.
+
+    Attributes:
+        output_dir (str): Directory holding the part archives and their manifest entries.
+        publish_dir (str): Directory the ETL loads ZIP archives from.
+        part_size (int): Number of movies per part.
+        flush_seconds (float): Maximum wait before a partially filled part is published.
+        embed_batch_size (int): Batch size passed to the embedding model.
+        queue (queue.Queue): Bounded queue of crawled batches; None marks the end of the stream.
+        run_id (str): Timestamp prefixed to this run's part names.
+    """
+    def __init__(self, publish_dir: str,
+                 output_dir: str = STREAM_OUTPUT_DIR,
+                 part_size: int = STREAM_PART_SIZE,
+                 flush_seconds: float = STREAM_FLUSH_SECONDS,
+                 queue_size: int = STREAM_QUEUE_SIZE,
+                 embed_batch_size: int = 32,
+                 model: Optional[Any] = None) -> None:
+
+        self.output_dir = output_dir
+        self.publish_dir = publish_dir
+        self.part_size = part_size
+        self.flush_seconds = flush_seconds
+        self.embed_batch_size = embed_batch_size
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        os.makedirs(os.path.join(output_dir, MANIFEST_DIR), exist_ok=True)
+        os.makedirs(publish_dir, exist_ok=True)
+
+        # The model is loaded on the first part so an empty stream does not pay for it
+        self._model = model
+        self._pending: List[Dict[str, Any]] = []
+        self._deadline = 0.0
+        self._stats = {"movies": 0, "dropped": 0, "parts": 0, "failed_parts": 0, "documents": 0,
+                       "max_latency_s": 0.0}
+
+    def close(self) -> None:
+        """Signals the end of the stream; `run` publishes what is pending and returns."""
+        self.queue.put(None)
+
+    def run(self) -> None:
+        """
+        Consumes crawled batches until `close` is called.
+
+        A part that fails is logged and dropped rather than stopping the consumer, since a stalled
+        consumer would block the crawler. Its movies are still in the crawl CSV for the batch pipeline.
+        """
+        while True:
+            timeout = max(self._deadline - time.monotonic(), 0) if self._pending else None
+            try:
+                batch = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self._publish()
+                continue
+            if batch is None:
+                break
+            for record in batch:
+                try:
+                    self._add(record)
+                except Exception as e:
+                    logger.info(f"Error streaming {record.get('tconst')}: {e}")
+        if self._pending:
+            self._publish()
+        logger.info(f"Streaming pipeline: {self.summary()}")
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        """Cleans a crawled record and adds it to the current part, publishing the part when full."""
+        cleaned = clean_record(record)
+        if cleaned is None:
+            self._stats["dropped"] += 1
+            return
+        if not self._pending:
+            self._deadline = time.monotonic() + self.flush_seconds
+        self._pending.append(cleaned)
+        if len(self._pending) >= self.part_size:
+            self._publish()
+
+    def _publish(self) -> None:
+        """Embeds the pending movies as one part and publishes it, logging rather than raising on failure."""
+        rows, self._pending = self._pending, []
+        part_name = f"stream-{self.run_id}-part-{self._stats['parts'] + self._stats['failed_parts']:05d}"
+        try:
+            documents = self._embed_part(rows, part_name)
+        except Exception as e:
+            self._stats["failed_parts"] += 1
+            logger.info(f"- {part_name}: failed, {len(rows)} movies left to the batch pipeline: {e}")
+            return
+        if not documents:
+            # No text survived chunking and dedup, so no archive was written
+            self._stats["dropped"] += len(rows)
+            logger.info(f"- {part_name}: no documents, nothing published for {len(rows)} movies")
+            return
+
+        # Time from the oldest crawl in the part until it became loadable
+        oldest = min(datetime.fromisoformat(row['crawl_timestamp']) for row in rows)
+        latency = (datetime.now() - oldest).total_seconds()
+        self._stats["parts"] += 1
+        self._stats["movies"] += len(rows)
+        self._stats["documents"] += documents
+        self._stats["max_latency_s"] = round(max(self._stats["max_latency_s"], latency), 1)
+        logger.info(f"- {part_name}: published {len(rows)} movies, {documents} documents, "
+                    f"{latency:.1f}s after the oldest crawl")
+
+    def _embed_part(self, rows: List[Dict[str, Any]], part_name: str) -> int:
+        """
+        Chunks, deduplicates and embeds a part's movies, then writes and publishes it.
+
+        Args:
+            rows (list): Cleaned movie records.
+            part_name (str): Name of the part.
+
+        Returns:
+            int: Number of chunk documents published.
+        """
+        part = pd.DataFrame(rows, columns=SYNOPSIS_COLUMNS)
+        documents = build_documents(part)
+        documents, removed = deduplicate_documents(documents, scope=DEDUP_SCOPE, threshold=DEDUP_THRESHOLD)
+        if not documents:
+            return 0
+
+        if self._model is None:
+            self._model = SentenceTransformer('bert-base-nli-mean-tokens')
+        vectors = self._model.encode([doc["text"] for doc in documents], batch_size=self.embed_batch_size,
+                                     show_progress_bar=False)
+        for doc, vector in zip(documents, vectors):
+            doc["vector"] = vector.tolist()
+        movie_documents = build_movie_vectors(documents, np.asarray(vectors))
+
+        _write_shard(documents, movie_documents, self.output_dir, part_name)
+        _record_shard(self.output_dir, part_name, {
+            "part": part_name,
+            "movies": len(part),
+            "tconsts": part["tconst"].tolist(),
+            "documents": len(documents),
+            "duplicates_removed": removed,
+            "movie_vectors": len(movie_documents),
+            "completed_at": datetime.now().isoformat()
+        })
+        self._archive(part_name, len(part))
+        return len(documents)
+
+    def _archive(self, part_name: str, movies: int) -> None:
+        """
+        Publishes a part archive into the publish directory, compressed and with a manifest.
+
+        The archive is written under a name the ETL does not match and then renamed, so the ETL
+        never sees a partial ZIP.
+
+        Args:
+            part_name (str): Name of the part.
+            movies (int): Number of movies in the part.
+        """
+        build_archive([_part_path(self.output_dir, part_name)], os.path.join(self.publish_dir, f"{part_name}.zip"),
+                      movies=movies)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarizes the stream so far.
+
+        Returns:
+            dict: Movies published and dropped, parts published and failed, documents and the
+                  worst crawl-to-publish latency in seconds.
+        """
+        return dict(self._stats)
+
+
+def run_streaming_pipeline(publish_dir: str,
+                           work_dir: str = PIPELINE_WORK_DIR,
+                           num_movies: int = 0,
+                           model: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Crawls the scraped tt codes and indexes each movie as soon as it is crawled.
+
+    The crawler writes its CSV and ledger exactly as in the batch pipeline and additionally hands
+    every written batch to a `StreamingIndexer` running in a background thread. Metadata uploads
+    are left to the batch stages, which pick up the same CSV.
+
+    Args:
+        publish_dir (str): Directory the ETL loads ZIP archives from.
+        work_dir (str): Directory for the crawl output and ledger. Default is PIPELINE_WORK_DIR.
+        num_movies (int): Number of movies to crawl (0 = all).
+        model (Optional[Any]): Embedding model; defaults to the SentenceTransformer used in batch mode.
+
+    Returns:
+        dict: The indexer's summary.
+    """
+    indexer = StreamingIndexer(publish_dir, model=model)
+    consumer = threading.Thread(target=indexer.run, name="streaming-indexer", daemon=True)
+    consumer.start()
+    try:
+        asyncio.run(run_crawler(output_dir=work_dir, num_movies=num_movies, batch_size=STREAM_BATCH_SIZE,
+                                sink=indexer.queue))
+    finally:
+        # Publish whatever is still pending, even if the crawl was interrupted
+        indexer.close()
+        consumer.join()
+    return indexer.summary()
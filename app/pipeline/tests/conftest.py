@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Pipeline modules import `config` and each other from app/pipeline, as the stages run from there.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Settings config.py and the logger read at import time; values follow .env.example.
+os.environ.setdefault("MAX_CLICKS", "1")
+os.environ.setdefault("LOG_FILE", "tests.log")
+os.environ.setdefault("TSV_FILENAME", "romance_newbatch.tsv")
+os.environ.setdefault("OUTPUT_FILE", "romance_newbatch.csv")
+os.environ.setdefault("CLEANED_OUTPUT_FILE", "romance_full_cleaned.csv")
+os.environ.setdefault("MOVIE_METADATA_FILE", "romance_metadata.parquet")
+os.environ.setdefault("MOVIE_SYNOPSIS_FILE", "romance_synopsis.parquet")
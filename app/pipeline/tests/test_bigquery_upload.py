@@ -0,0 +1,23 @@
+import pytest
+
+bigquery = pytest.importorskip("google.cloud.bigquery")
+
+from bigquery_upload import METADATA_TABLE_SCHEMA, check_table_schema
+
+
+def test_matching_schema_passes_in_any_column_order():
+    check_table_schema("p.d.t", list(reversed(METADATA_TABLE_SCHEMA)))
+
+
+def test_schema_mismatch_names_every_difference():
+    schema = [field for field in METADATA_TABLE_SCHEMA if field.name != "poster_url"]
+    schema = [bigquery.SchemaField(field.name, "INTEGER") if field.name == "movie_year" else field for field in schema]
+    schema.append(bigquery.SchemaField("crawl_timestamp", "STRING"))
+
+    with pytest.raises(ValueError) as error:
+        check_table_schema("p.d.t", schema)
+    message = str(error.value)
+    assert "p.d.t" in message
+    assert "missing poster_url STRING" in message
+    assert "unexpected crawl_timestamp STRING" in message
+    assert "movie_year is INTEGER, expected STRING" in message
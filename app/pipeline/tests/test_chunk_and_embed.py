@@ -0,0 +1,76 @@
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from chunk_and_embed import build_documents
+from chunking import chunk_text
+
+LONG_TEXT = " ".join(f"Sentence {i} tells how Mr. Smith and Dr. Jones fell in love in St. Louis." for i in range(40))
+
+# Synopsis rows as split_movie_xlsx writes them: list columns in their string form, gaps as NaN.
+SYNOPSIS = pd.DataFrame([
+    {"tconst": "tt0000001", "genres": "['Drama', 'Romance']", "short_synopsis": "  Two people meet.  ",
+     "summaries": "['They meet and fall in love.', 'No summaries found']", "long_synopsis": LONG_TEXT},
+    {"tconst": "tt0000002", "genres": np.nan, "short_synopsis": "No short sum found",
+     "summaries": "[\"It's a love story.\", 'A second summary.']", "long_synopsis": "Synopsis not found"},
+    {"tconst": "tt0000003", "genres": "not a list", "short_synopsis": np.nan,
+     "summaries": np.nan, "long_synopsis": "  A short long synopsis.  "},
+    {"tconst": "tt0000004", "genres": "['Romance']", "short_synopsis": "   ",
+     "summaries": "['No summaries found']", "long_synopsis": np.nan},
+    {"tconst": "tt0000005", "genres": "[]", "short_synopsis": "Only a short one.",
+     "summaries": f"['{LONG_TEXT}']", "long_synopsis": " Synopsis not found "},
+])
+
+
+def _previous_smart_split_summaries(text):
+    """The regex summary splitter used before the columnar rewrite."""
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        text = text[1:-1]
+    cleaned = []
+    for chunk in re.split(r"""(?<!\\)['"]\s*,\s*['"]""", text):
+        chunk = chunk.strip().strip('"').strip("'").strip()
+        if chunk and chunk.lower() != "no summaries found":
+            cleaned.append(chunk)
+    return cleaned
+
+
+def _previous_build_documents(df):
+    """The iterrows loop of run_chunk_and_embed_pipeline, without the embedding; literal_eval stands in for eval."""
+    documents = []
+    for _, row in df.iterrows():
+        movie_id = row["tconst"]
+        try:
+            genres = ast.literal_eval(row["genres"]) if pd.notna(row["genres"]) and isinstance(row["genres"], str) else []
+        except (ValueError, SyntaxError):
+            genres = []
+        short_synopsis = row["short_synopsis"] if pd.notna(row["short_synopsis"]) else ""
+        long_synopsis = row["long_synopsis"] if pd.notna(row["long_synopsis"]) else ""
+        summaries = _previous_smart_split_summaries(row["summaries"]) if isinstance(row["summaries"], str) else []
+
+        if short_synopsis.strip() and short_synopsis.strip() != "No short sum found":
+            documents.append({"movie_id": movie_id, "genres": genres, "type": "short",
+                              "chunk_id": f"{movie_id}-sh-1", "text": short_synopsis.strip()})
+        for j, summary in enumerate(summaries):
+            if summary.strip():
+                for i, chunk in enumerate(chunk_text(summary)):
+                    documents.append({"movie_id": movie_id, "genres": genres, "type": "summary",
+                                      "chunk_id": f"{movie_id}-summary-{j + 1}-{i + 1}", "text": chunk})
+        if long_synopsis.strip() and long_synopsis.strip() != "Synopsis not found":
+            for i, chunk in enumerate(chunk_text(long_synopsis)):
+                documents.append({"movie_id": movie_id, "genres": genres, "type": "long",
+                                  "chunk_id": f"{movie_id}-lon-{i + 1}", "text": chunk})
+    return documents
+
+
+def test_build_documents_matches_previous_row_loop():
+    documents = build_documents(SYNOPSIS)
+    assert documents == _previous_build_documents(SYNOPSIS)
+    # The fixture exercises every document type, including multi-chunk texts
+    assert {doc["type"] for doc in documents} == {"short", "summary", "long"}
+    assert any(doc["chunk_id"].endswith("-2") for doc in documents)
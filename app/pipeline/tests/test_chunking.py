@@ -0,0 +1,50 @@
+import json
+import os
+import random
+import re
+
+import pytest
+
+from chunking import ABBREVIATIONS, chunk_text, smart_split_sentences
+
+# Inputs and the chunks the original chunk_text, defined inside run_chunk_and_embed_pipeline before it
+# moved to chunking.py, returned for them. Regenerating this file would defeat its purpose.
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), "fixtures", "chunk_text_golden.json")
+
+with open(GOLDEN_FILE, encoding="utf-8") as f:
+    GOLDEN = json.load(f)
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=[case["name"] for case in GOLDEN])
+def test_chunk_text_matches_previous_behaviour(case):
+    assert chunk_text(case["text"]) == case["chunks"]
+
+
+def _previous_smart_split_sentences(text):
+    """The sentence splitter as it was before chunking.py, masking abbreviations with str.replace."""
+    abbreviations = {
+        "Dr.": "DR_ABBR", "Mr.": "MR_ABBR", "Mrs.": "MRS_ABBR", "Ms.": "MS_ABBR",
+        "Jr.": "JR_ABBR", "Sr.": "SR_ABBR", "St.": "ST_ABBR", "Prof.": "PROF_ABBR",
+        "Inc.": "INC_ABBR", "Ltd.": "LTD_ABBR", "vs.": "VS_ABBR",
+        "e.g.": "EG_ABBR", "i.e.": "IE_ABBR"
+    }
+    for abbr, token in abbreviations.items():
+        text = text.replace(abbr, token)
+    restored = []
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        for abbr, token in abbreviations.items():
+            sentence = sentence.replace(token, abbr)
+        restored.append(sentence.strip())
+    return restored
+
+
+def test_sentence_splitter_matches_previous_behaviour():
+    # Abbreviations, look-alikes and bare terminators glued together with assorted whitespace
+    pieces = list(ABBREVIATIONS) + ["love", "Paris", "Devs.", "Inst.", "Mrs", "e.", "g.", ".", "!", "?", "..."]
+    separators = [" ", "  ", "\n", "\t", "", " \n "]
+    rng = random.Random(0)
+    texts = [case["text"] for case in GOLDEN]
+    texts += ["".join(rng.choice(pieces) + rng.choice(separators) for _ in range(rng.randint(0, 20)))
+              for _ in range(2000)]
+    for text in texts:
+        assert smart_split_sentences(text) == _previous_smart_split_sentences(text), text
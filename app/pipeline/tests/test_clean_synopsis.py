@@ -0,0 +1,83 @@
+import ast
+import random
+
+import pandas as pd
+import pytest
+
+from clean_synopsis import (clean_romance_synopsis, clean_summaries_value, clean_summary_list, parse_summary_list,
+                            remove_backslashes, NO_SHORT_SYNOPSIS, NO_LONG_SYNOPSIS, NO_SUMMARIES)
+
+
+def _row(tconst, short, long="Synopsis not found", summaries="['No summaries found']"):
+    return {'tconst': tconst, 'movie_title': tconst, 'short_synopsis': short, 'summaries': summaries,
+            'long_synopsis': long}
+
+
+def test_recrawled_titles_keep_their_last_row(tmp_path):
+    rows = [
+        _row('tt1', 'First crawl.'),
+        _row('tt2', 'Only crawl.'),
+        _row('tt3', 'Had a synopsis.'),
+        _row('tt1', 'Recrawl found a change.'),
+        # The latest crawl of tt3 lost its synopsis, so the title is dropped altogether
+        _row('tt3', NO_SHORT_SYNOPSIS, NO_LONG_SYNOPSIS, NO_SUMMARIES),
+    ]
+    input_csv, output_csv = tmp_path / "crawl.csv", tmp_path / "cleaned.csv"
+    pd.DataFrame(rows).to_csv(input_csv, index=False)
+
+    # Chunks smaller than the file, so a title's rows fall into different chunks
+    clean_romance_synopsis(str(input_csv), str(output_csv), chunk_size=2)
+
+    cleaned = pd.read_csv(output_csv, dtype=str)
+    assert cleaned['tconst'].tolist() == ['tt2', 'tt1']
+    assert cleaned['short_synopsis'].tolist() == ['Only crawl.', 'Recrawl found a change.']
+
+
+# Summaries cells that are not quite what str(list) writes, each either a valid literal or not one at all.
+LITERALS = [
+    "['No summaries found']",
+    '["a","b"]',
+    "['a',\n 'b']",
+    "('a', 'b')",
+    "['a' 'b']",
+    "['a', 'b',]",
+    "[r'\\n', 'x']",
+    "[b'x']",
+    "['\\N{EM DASH}', '\\u00e9\\U0001f600']",
+    "['\\q']",
+    "['\\x']",
+    "['unterminated]",
+    "[]",
+    "",
+    "nan",
+    "['a', ['nested']]",
+]
+
+
+def _random_summaries(rng):
+    alphabet = "ab ,'\"\\\n\t\r\x00\x7fé—中😀_x0014_[]"
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        for _ in range(rng.randint(0, 4))
+    ]
+
+
+def _previous_clean(value):
+    """The per-row cleaning before the chunked rewrite, which parsed every cell with ast.literal_eval."""
+    return str(remove_backslashes(clean_summary_list(ast.literal_eval(value))))
+
+
+# '\q' is kept as a backslash and q by both parsers, with a warning about the invalid escape
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_summary_parser_matches_literal_eval():
+    rng = random.Random(0)
+    values = LITERALS + [str(_random_summaries(rng)) for _ in range(2000)]
+    for value in values:
+        try:
+            expected = ast.literal_eval(value)
+        except (ValueError, TypeError, SyntaxError):
+            # Not a literal: kept as the raw string, where the old cleaning raised instead
+            assert parse_summary_list(value) == value
+            continue
+        assert parse_summary_list(value) == expected, value
+        assert clean_summaries_value(value) == _previous_clean(value), value
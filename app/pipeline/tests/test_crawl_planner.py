@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime
+
+import pandas as pd
+
+from config import OUTPUT_FILE
+from crawl_planner import CrawlPlanner, PAGE_FIELDS, TITLE_PAGE, PLOT_PAGE
+from extract_movie_data import IMDbCrawler
+
+# A complete record as the crawler writes it: list fields end up in their string form.
+RECORD = {
+    'tconst': 'tt0000001',
+    'crawl_timestamp': None,
+    'movie_title': 'A Title',
+    'movie_year': '2001',
+    'age_rating': 'PG',
+    'duration': '1h 40m',
+    'imdb_rating': '7.5',
+    'short_synopsis': 'Two people meet.',
+    'top_5_actors': "['Actor One', 'Actor Two']",
+    'genres': "['Romance']",
+    'poster_url': 'https://example.com/poster.jpg',
+    'summaries': "['They meet and fall in love.']",
+    'long_synopsis': 'They meet. They fall in love. The end.',
+}
+
+
+def test_unknown_title_needs_both_pages():
+    assert CrawlPlanner().pages_needed(None) == [TITLE_PAGE, PLOT_PAGE]
+
+
+def test_fresh_complete_record_from_csv_saves_requests(tmp_path):
+    record = dict(RECORD, crawl_timestamp=datetime.now().isoformat())
+    pd.DataFrame([record]).to_csv(tmp_path / OUTPUT_FILE, index=False)
+
+    crawler = IMDbCrawler(output_dir=str(tmp_path), parser_workers=0)
+    try:
+        known = crawler.load_known_records([record['tconst'], 'tt0000002'])
+        assert list(known) == [record['tconst']]
+
+        movie = asyncio.run(crawler.extract_movie_data(record['tconst'], known[record['tconst']]))
+    finally:
+        crawler.ledger.close()
+
+    # Neither page is requested and the known fields are carried over
+    assert crawler.planner.summary() == {"requests_made": 0, "requests_saved": 2}
+    for field in PAGE_FIELDS[TITLE_PAGE] + PAGE_FIELDS[PLOT_PAGE]:
+        assert movie[field] == record[field]
+
+
+def test_stale_record_refetches_title_page_only():
+    planner = CrawlPlanner(title_max_age_days=7, plot_max_age_days=30)
+    record = dict(RECORD, crawl_timestamp=datetime(2000, 1, 1).isoformat())
+    assert planner.pages_needed(record) == [TITLE_PAGE, PLOT_PAGE]
+
+    record['crawl_timestamp'] = (datetime.now() - pd.Timedelta(days=10)).isoformat()
+    assert planner.pages_needed(record) == [TITLE_PAGE]
+
+
+def test_forced_plan_fetches_fresh_record():
+    record = dict(RECORD, crawl_timestamp=datetime.now().isoformat())
+    assert CrawlPlanner().pages_needed(record) == []
+    assert CrawlPlanner().pages_needed(record, force=True) == [TITLE_PAGE, PLOT_PAGE]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pandas as pd
+
+from config import OUTPUT_FILE, TSV_FILENAME
+from extract_movie_data import IMDbCrawler
+from response_cache import ResponseCache
+
+TITLES = ['tt0000001', 'tt0000002']
+
+
+def _crawler(tmp_path, replay):
+    return IMDbCrawler(output_dir=str(tmp_path / "out"), cache_dir=str(tmp_path / "cache"), replay=replay,
+                       parser_workers=0)
+
+
+def _crawl_everything(tmp_path, monkeypatch):
+    """Writes the TSV and caches every page, then marks all titles done as a finished crawl would."""
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({'tconst': TITLES}).to_csv(TSV_FILENAME, sep='\t', index=False)
+    cache = ResponseCache(str(tmp_path / "cache"))
+    for tconst in TITLES:
+        cache.put(f"https://www.imdb.com/title/{tconst}/", f"<html><head><title>{tconst}</title></head></html>")
+        cache.put(f"https://www.imdb.com/title/{tconst}/plotsummary/", "<html></html>")
+    crawler = _crawler(tmp_path, replay=False)
+    crawler.ledger.add(TITLES)
+    crawler.ledger.commit_batch(crawler.output_dir / OUTPUT_FILE, TITLES, {})
+    crawler.ledger.close()
+
+
+def test_done_titles_are_not_crawled_again(tmp_path, monkeypatch):
+    _crawl_everything(tmp_path, monkeypatch)
+    crawler = _crawler(tmp_path, replay=False)
+    try:
+        assert asyncio.run(crawler.get_movies_from_tsv()) == []
+    finally:
+        crawler.ledger.close()
+
+
+def test_replay_re_extracts_done_titles_from_the_cache(tmp_path, monkeypatch):
+    _crawl_everything(tmp_path, monkeypatch)
+    crawler = _crawler(tmp_path, replay=True)
+    try:
+        asyncio.run(crawler.crawl_movies())
+    finally:
+        crawler.ledger.close()
+
+    rows = pd.read_csv(crawler.output_file)
+    assert rows['tconst'].tolist() == TITLES
+    # Both pages of each title come from the cache
+    assert crawler.cache.summary()["hits"] == 4
+    assert crawler.cache.summary()["misses"] == 0
+
+
+def test_replay_leaves_the_crawl_csv_and_ledger_alone(tmp_path, monkeypatch):
+    _crawl_everything(tmp_path, monkeypatch)
+    crawl_csv = tmp_path / "out" / OUTPUT_FILE
+    crawl_csv.write_text("tconst\ntt0000001\n")
+    # Drop one title's cached page, so the replay misses it
+    ResponseCache(str(tmp_path / "cache"))._entry_path("https://www.imdb.com/title/tt0000002/").unlink()
+    for _ in range(2):
+        crawler = _crawler(tmp_path, replay=True)
+        try:
+            asyncio.run(crawler.crawl_movies())
+            counts = crawler.ledger.counts()
+        finally:
+            crawler.ledger.close()
+
+    assert crawl_csv.read_text() == "tconst\ntt0000001\n"
+    # A second replay rewrites its output rather than appending to it
+    assert pd.read_csv(crawler.output_file)['tconst'].tolist() == ['tt0000001']
+    # The title missing from the cache keeps its state from the live crawl
+    assert counts == {"done": 2}
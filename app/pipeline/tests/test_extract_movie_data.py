@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from config import OUTPUT_FILE
+from extract_movie_data import IMDbCrawler, MISSING_PLOT_FIELDS, OUTPUT_COLUMNS
+from recrawl_scheduler import RecrawlScheduler
+from test_crawl_planner import RECORD
+
+
+def _offline_crawler(tmp_path):
+    """A crawler replaying from an empty cache, so every page request fails without network access."""
+    return IMDbCrawler(output_dir=str(tmp_path / "out"), cache_dir=str(tmp_path / "cache"), replay=True,
+                       parser_workers=0)
+
+
+def test_failed_plot_page_keeps_known_fields_and_timestamp(tmp_path):
+    # Fresh title page, but the summaries are missing, so only the plot page is requested
+    crawled_at = (datetime.now() - timedelta(days=1)).isoformat()
+    known = dict(RECORD, crawl_timestamp=crawled_at, summaries="['No summaries found']")
+    crawler = _offline_crawler(tmp_path)
+    try:
+        movie = asyncio.run(crawler.extract_movie_data(known['tconst'], known))
+    finally:
+        crawler.ledger.close()
+
+    assert crawler.planner.summary() == {"requests_made": 1, "requests_saved": 1}
+    assert tuple(movie) == OUTPUT_COLUMNS
+    assert movie['summaries'] == known['summaries']
+    assert movie['long_synopsis'] == known['long_synopsis']
+    assert movie['crawl_timestamp'] == crawled_at
+
+
+def test_failed_title_page_skips_the_plot_page(tmp_path):
+    crawler = _offline_crawler(tmp_path)
+    try:
+        movie = asyncio.run(crawler.extract_movie_data('tt0000009'))
+    finally:
+        crawler.ledger.close()
+
+    assert crawler.planner.summary() == {"requests_made": 1, "requests_saved": 1}
+    assert crawler.cache.summary()["misses"] == 1
+    assert 'movie_title' not in movie
+
+
+def test_batches_are_appended_with_fixed_columns(tmp_path):
+    crawler = _offline_crawler(tmp_path)
+    complete = dict(RECORD, crawl_timestamp=datetime.now().isoformat())
+    # A record whose plot fields are missing and whose keys come in another order
+    partial = {key: complete[key] for key in reversed(OUTPUT_COLUMNS) if key not in MISSING_PLOT_FIELDS}
+    partial['tconst'] = 'tt0000002'
+    try:
+        crawler.write_batch([complete])
+        crawler.write_batch([partial])
+    finally:
+        crawler.ledger.close()
+
+    rows = pd.read_csv(crawler.output_file, dtype=str, keep_default_na=False)
+    assert tuple(rows.columns) == OUTPUT_COLUMNS
+    assert rows['tconst'].tolist() == ['tt0000001', 'tt0000002']
+    assert rows['poster_url'].tolist() == [complete['poster_url']] * 2
+    assert rows['summaries'].tolist() == [complete['summaries'], '']
+
+
+def test_scheduled_refresh_fetches_fresh_titles(tmp_path):
+    known = dict(RECORD, crawl_timestamp=datetime.now().isoformat())
+    crawler = _offline_crawler(tmp_path)
+    try:
+        movie = asyncio.run(crawler.extract_movie_data(known['tconst'], known, refresh=True))
+    finally:
+        crawler.ledger.close()
+
+    # The fresh record does not stop the title page from being requested
+    assert crawler.cache.summary()["misses"] == 1
+    assert 'movie_title' not in movie
+
+
+def test_reused_record_is_neither_written_nor_observed(tmp_path):
+    known = dict(RECORD, crawl_timestamp=datetime.now().isoformat())
+    scheduler = RecrawlScheduler(str(tmp_path / "recrawl.sqlite"), budget=10)
+    crawler = IMDbCrawler(output_dir=str(tmp_path / "out"), parser_workers=0, scheduler=scheduler)
+    try:
+        movie = asyncio.run(crawler.extract_movie_data(known['tconst'], known))
+        crawler.write_batch([movie])
+        assert scheduler.summary() == {"changed": 0, "unchanged": 0, "scheduled": 0, "due": 0}
+    finally:
+        crawler.ledger.close()
+        scheduler.close()
+
+    assert crawler.planner.summary() == {"requests_made": 0, "requests_saved": 2}
+    assert not (crawler.output_dir / OUTPUT_FILE).exists()
+    assert not crawler.unfetched
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from page_parser import parse_plot_page, parse_title_page
+
+pytest.importorskip("lxml")
+
+# Title and plot fields with inline scripts, styles and ruby annotations inside their text.
+PAGE = """<html><head><style>body { color: red; }</style></head><body>
+<h1><span data-testid="hero__primary-text">A <script>track("title")</script>Title</span></h1>
+<span role="presentation" data-testid="plot-l" class="sc-191592d9-1 kBRZRe">Two people <style>.x{}</style>meet
+<!-- tracking pixel --> again.</span>
+<div data-testid="sub-section-summaries"><ul>
+  <li>First <script type="application/ld+json">{"a": 1}</script>summary.</li>
+  <li><ruby>Tokyo<rp>(</rp><rt>to-kyo</rt><rp>)</rp></ruby> story <template><p>hidden</p></template>told.</li>
+</ul></div>
+<div data-testid="sub-section-synopsis">
+  <div class="ipc-html-content-inner-div" role="presentation">Long <script>var x = 1;</script>synopsis.</div>
+</div>
+</body></html>"""
+
+
+def test_lxml_title_page_matches_beautifulsoup():
+    lxml_fields = parse_title_page(PAGE, "tt0000001", backend="lxml")
+    assert lxml_fields == parse_title_page(PAGE, "tt0000001", backend="bs4")
+    assert lxml_fields["movie_title"] == "ATitle"
+    assert lxml_fields["short_synopsis"] == "Two peoplemeetagain."
+
+
+def test_lxml_plot_page_matches_beautifulsoup():
+    lxml_fields = parse_plot_page(PAGE, "tt0000001", backend="lxml")
+    assert lxml_fields == parse_plot_page(PAGE, "tt0000001", backend="bs4")
+    assert lxml_fields["summaries"] == ["Firstsummary.", "Tokyostorytold."]
+    assert lxml_fields["long_synopsis"] == "Longsynopsis."
+
+
+def test_crawler_parser_pool_matches_inline_parsing(tmp_path):
+    from extract_movie_data import IMDbCrawler
+
+    crawler = IMDbCrawler(output_dir=str(tmp_path), parser_backend="lxml", parser_workers=1)
+
+    async def parse_both():
+        try:
+            return (await crawler._parse(parse_title_page, PAGE, "tt0000001"),
+                    await crawler._parse(parse_plot_page, PAGE, "tt0000001"))
+        finally:
+            await crawler.close_session()
+
+    try:
+        title_fields, plot_fields = asyncio.run(parse_both())
+    finally:
+        crawler.ledger.close()
+
+    # Workers are spawned, not forked, and return what the other backend extracts in-process
+    assert title_fields == parse_title_page(PAGE, "tt0000001", backend="bs4")
+    assert plot_fields == parse_plot_page(PAGE, "tt0000001", backend="bs4")
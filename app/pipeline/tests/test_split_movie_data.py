@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from split_movie_data import METADATA_COLUMNS, SYNOPSIS_COLUMNS, iter_table, read_table, split_movie_xlsx
+
+# Cleaned rows as clean_romance_synopsis writes them, with placeholders, gaps and numeric-looking text.
+CLEANED = pd.DataFrame([
+    {"tconst": f"tt{i:07d}", "movie_title": f"Title {i}", "movie_year": str(2000 + i),
+     "age_rating": "PG-13" if i % 3 else np.nan, "duration": "1h 40m",
+     "imdb_rating": "Rating not found" if i == 4 else f"{5 + i / 10:.1f}",
+     "top_5_actors": "['Actor One', \"Actor O'Two\"]", "poster_url": f"https://example.com/{i}.jpg",
+     "genres": "['Drama', 'Romance']", "short_synopsis": f"Two people meet, {i} times.",
+     "summaries": "['They meet.\\nThey—part.']" if i % 2 else np.nan,
+     "long_synopsis": "Synopsis not found" if i == 3 else "Long, \"quoted\" synopsis\nover two lines."}
+    for i in range(1, 8)
+])
+
+
+def _split(tmp_path, chunk_size=3):
+    input_csv = tmp_path / "cleaned.csv"
+    CLEANED.to_csv(input_csv, index=False)
+    return split_movie_xlsx(str(input_csv), str(tmp_path), chunk_size=chunk_size, excel_export=False)
+
+
+def test_parquet_round_trip_keeps_the_cleaned_text(tmp_path):
+    metadata_path, synopsis_path = _split(tmp_path)
+    expected = pd.read_csv(tmp_path / "cleaned.csv", dtype=str)
+    for path, columns in ((metadata_path, METADATA_COLUMNS), (synopsis_path, SYNOPSIS_COLUMNS)):
+        # Every cell reads back as the text in the CSV, across row groups of `chunk_size` rows
+        assert read_table(path).equals(expected[columns])
+        sliced = pd.concat(list(iter_table(path, 2)), ignore_index=True)
+        assert sliced.equals(expected[columns])
+
+
+def test_synopsis_matches_previous_excel_round_trip(tmp_path):
+    pytest.importorskip("openpyxl")
+    _, synopsis_path = _split(tmp_path)
+    # The previous split read the CSV with inferred types and went through Excel
+    previous = tmp_path / "previous.xlsx"
+    pd.read_csv(tmp_path / "cleaned.csv")[SYNOPSIS_COLUMNS].to_excel(previous, index=False)
+    expected = pd.read_excel(previous, engine="openpyxl")
+
+    assert read_table(synopsis_path).equals(expected)